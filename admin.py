@@ -1,34 +1,424 @@
-from database import supabase
-from grafik import tampil_grafik
+import os
+import sys
+import csv
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 
-def menu_admin():
+from database import supabase, paginate
 
-    while True:
-        print("\n=== MENU ADMIN ===")
-        print("1. Lihat Semua User")
-        print("2. Tambah User")
-        print("3. Grafik")
-        print("4. Logout")
+# CLI admin non-interaktif (cocok untuk cron / skrip):
+#
+#   python admin.py list-users [--role user] [--tahun-aktif 2026] [--format jsonl|csv]
+#   python admin.py add-users-from-file users.csv [--dry-run] [--workers 4]
+#   python admin.py export-scores [--tahun-aktif 2026] [--format jsonl|csv|xlsx|parquet] [-o file]
+#   python admin.py import-scores nilai.xlsx [--dry-run]
+#   python admin.py rebuild-stats
+#   python admin.py archive-cohorts --before 2025
+#   python admin.py backfill-legacy-scores [--dry-run] [--restart]
+#
+# Data ditulis ke stdout (JSONL/CSV, per halaman), pesan ringkasan ke stderr.
+# Kode keluar: 0 sukses, 1 sebagian gagal / ada baris tidak valid,
+# 2 argumen / file masukan salah (termasuk baris JSONL bertipe salah),
+# 3 error koneksi / API / konfigurasi Supabase.
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_USAGE = 2
+EXIT_ERROR = 3
 
-        pilih = input("Pilih: ")
+PAGE_SIZE = 1000
+INSERT_BATCH_SIZE = 100
+MALFORMED_ROW = "format baris salah (harus objek dengan nilai teks/angka)"
+USER_COLUMNS = ["id", "nama", "role", "tahun_masuk", "tahun_aktif", "tahun_transmigrasi"]
 
-        if pilih == "1":
-            data = supabase.table("users").select("*").execute()
-            for d in data.data:
-                print(d)
 
-        elif pilih == "2":
-            nama = input("Nama: ")
-            password = input("Password: ")
+class UsageError(Exception):
+    """Argumen atau file masukan salah (kode keluar EXIT_USAGE)."""
 
-            supabase.table("users").insert({
-                "nama": nama,
-                "password": password,
-                "role": "user"
-            }).execute()
 
-        elif pilih == "3":
-            tampil_grafik()
+def _service_errors():
+    """Exception koneksi / API / konfigurasi Supabase (kode keluar EXIT_ERROR)."""
+    import httpx
+    from postgrest.exceptions import APIError
+    from database import ConfigError
 
-        elif pilih == "4":
-            break
+    # OSError mencakup ConnectionError, timeout socket & gagal menulis file arsip
+    return ConfigError, APIError, httpx.HTTPError, OSError
+
+
+def log(message):
+    print(message, file=sys.stderr)
+
+
+def _open_file(path, mode, **kwargs):
+    try:
+        return open(path, mode, **kwargs)
+    except OSError as e:
+        raise UsageError(f"{path}: {e.strerror or e}") from e
+
+
+class RecordWriter:
+    """Tulis record (dict) ke stream sebagai JSONL atau CSV, baris demi baris."""
+
+    def __init__(self, stream, fmt, columns):
+        self.stream = stream
+        self.fmt = fmt
+        self.columns = columns
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.DictWriter(stream, fieldnames=columns, extrasaction="ignore")
+            self._csv.writeheader()
+
+    def write(self, record):
+        if self._csv:
+            self._csv.writerow(record)
+        else:
+            self.stream.write(json.dumps({c: record.get(c) for c in self.columns}, default=str) + "\n")
+
+
+# ======================
+# list-users
+# ======================
+def cmd_list_users(args):
+    def apply(query):
+        if args.role:
+            query = query.eq("role", args.role)
+        if args.tahun_aktif is not None:
+            query = query.eq("tahun_aktif", args.tahun_aktif)
+        return query
+
+    writer = RecordWriter(sys.stdout, args.format, USER_COLUMNS)
+    count = 0
+    # Kolom password tidak pernah ikut ditulis
+    for rows in paginate("users", apply, page_size=args.page_size):
+        for row in rows:
+            writer.write(row)
+        count += len(rows)
+        sys.stdout.flush()
+    log(f"{count} user")
+    return EXIT_OK
+
+
+# ======================
+# add-users-from-file
+# ======================
+def _read_records(path):
+    """Baca CSV atau JSONL menjadi list dict (nama kolom huruf kecil)."""
+    with _open_file(path, "r", newline="", encoding="utf-8-sig") as f:
+        try:
+            if path.lower().endswith((".jsonl", ".json")):
+                records = [json.loads(line) for line in f if line.strip()]
+            else:
+                records = list(csv.DictReader(f))
+        except (ValueError, csv.Error) as e:
+            raise UsageError(f"{path}: {e}") from e
+    # Baris JSONL yang bukan objek dibiarkan apa adanya (dilaporkan oleh validate_new_users)
+    return [{str(k).strip().lower(): v for k, v in r.items()} if isinstance(r, dict) else r for r in records]
+
+
+def _hash_password(password):
+    import bcrypt
+
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+
+def _existing_names(names):
+    found = set()
+    for start in range(0, len(names), 200):
+        batch = names[start:start + 200]
+        response = supabase.table("users").select("nama").in_("nama", batch).execute()
+        found.update(r["nama"] for r in getattr(response, "data", []) or [])
+    return found
+
+
+def _to_year(value):
+    text = "" if value is None else str(value).strip()
+    return int(text) if text else None
+
+
+def _malformed(record):
+    """True jika baris (JSONL) bukan objek atau kolomnya bertipe salah (mis. "role": 1)."""
+    if not isinstance(record, dict):
+        return True
+    if any(not isinstance(record.get(k), (str, type(None))) for k in ("nama", "password", "role")):
+        return True
+    return any(
+        isinstance(record.get(k), bool) or not isinstance(record.get(k), (str, int, type(None)))
+        for k in ("tahun_aktif", "tahun_masuk")
+    )
+
+
+def validate_new_users(records):
+    """Pisahkan baris valid & tidak valid (nama/password kosong, nama ganda, tahun salah, nama sudah ada)."""
+    valid, invalid, seen = [], [], set()
+    for i, r in enumerate(records, start=1):
+        if _malformed(r):
+            nama = str(r.get("nama") or "").strip() if isinstance(r, dict) else ""
+            invalid.append({"baris": i, "nama": nama, "error": MALFORMED_ROW})
+            continue
+        nama = str(r.get("nama") or "").strip()
+        password = str(r.get("password") or "")
+        role = str(r.get("role") or "user").strip()
+        error = None
+        if not nama or not password:
+            error = "nama dan password wajib diisi"
+        elif nama in seen:
+            error = "nama ganda di file"
+        elif role not in ("user", "admin"):
+            error = f"role tidak dikenal: {role}"
+        else:
+            try:
+                tahun_aktif = _to_year(r.get("tahun_aktif"))
+                tahun_masuk = _to_year(r.get("tahun_masuk")) or tahun_aktif
+            except ValueError:
+                error = "tahun_aktif/tahun_masuk harus angka"
+        if error:
+            invalid.append({"baris": i, "nama": nama, "error": error})
+            continue
+        seen.add(nama)
+        valid.append({
+            "baris": i,
+            "nama": nama,
+            "password": password,
+            "role": role,
+            "tahun_aktif": tahun_aktif,
+            "tahun_masuk": tahun_masuk,
+        })
+
+    existing = _existing_names([v["nama"] for v in valid])
+    invalid += [{"baris": v["baris"], "nama": v["nama"], "error": "nama sudah digunakan"} for v in valid if v["nama"] in existing]
+    valid = [v for v in valid if v["nama"] not in existing]
+    return valid, invalid
+
+
+def cmd_add_users(args):
+    records = _read_records(args.file)
+    valid, invalid = validate_new_users(records)
+    for item in invalid:
+        print(json.dumps({"status": "invalid", **item}))
+    log(f"{len(valid)} user valid, {len(invalid)} tidak valid")
+    if any(item["error"] == MALFORMED_ROW for item in invalid):
+        # File rusak (bukan sekadar data tidak lolos validasi): tidak ada yang ditulis
+        log("File masukan berisi baris dengan format salah; tidak ada user yang ditambahkan")
+        return EXIT_USAGE
+    if args.dry_run or not valid:
+        return EXIT_PARTIAL if invalid else EXIT_OK
+
+    # bcrypt sengaja lambat -> hash dibagi ke semua core
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        hashes = list(pool.map(_hash_password, [v["password"] for v in valid], chunksize=8))
+
+    rows = [
+        # Kunci seragam per baris: insert multi-baris PostgREST mensyaratkan kolom yang sama
+        {k: v for k, v in {**u, "password": h}.items() if k != "baris"}
+        for u, h in zip(valid, hashes)
+    ]
+    failed = 0
+    for start in range(0, len(rows), args.batch_size):
+        batch = rows[start:start + args.batch_size]
+        result = {"status": "ok", "batch": start // args.batch_size + 1, "rows": len(batch)}
+        try:
+            supabase.table("users").insert(batch).execute()
+        except Exception as e:
+            result.update(status="error", error=str(e))
+            failed += 1
+        print(json.dumps(result))
+        sys.stdout.flush()
+
+    log(f"{len(rows)} user diproses, {failed} batch gagal")
+    return EXIT_PARTIAL if failed or invalid else EXIT_OK
+
+
+# ======================
+# export-scores / import-scores
+# ======================
+def _cohort_users(tahun_aktif):
+    def apply(query):
+        query = query.eq("role", "user")
+        if tahun_aktif is not None:
+            query = query.eq("tahun_aktif", tahun_aktif)
+        return query
+
+    return [u for rows in paginate("users", apply, page_size=PAGE_SIZE) for u in rows]
+
+
+def cmd_export_scores(args):
+    from export import SCORE_EXPORT_COLUMNS, iter_cohort_scores, write_export
+
+    chunks = iter_cohort_scores(_cohort_users(args.tahun_aktif), page_size=args.page_size)
+    if args.format in ("xlsx", "parquet"):
+        if not args.output:
+            log(f"Format {args.format} membutuhkan --output")
+            return EXIT_USAGE
+        with _open_file(args.output, "wb") as out, write_export(chunks, args.format) as tmp:
+            while block := tmp.read(1024 * 1024):
+                out.write(block)
+        log(f"Ekspor ditulis ke {args.output}")
+        return EXIT_OK
+
+    out = _open_file(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        writer = RecordWriter(out, args.format, SCORE_EXPORT_COLUMNS)
+        count = 0
+        for chunk in chunks:
+            for record in chunk.to_dict("records"):
+                writer.write(record)
+            count += len(chunk)
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    log(f"{count} nilai diekspor")
+    return EXIT_OK
+
+
+def cmd_import_scores(args):
+    from score_import import read_score_file, existing_score_counts, validate_scores, import_rows, insert_scores
+    from stats import refresh_stats_for_users
+
+    with _open_file(args.file, "rb") as f:
+        data = f.read()
+    try:
+        raw = read_score_file(data, args.file)
+    except ValueError as e:
+        raise UsageError(f"{args.file}: {e}") from e
+    users = [u for rows in paginate("users", page_size=PAGE_SIZE) for u in rows]
+    preview = validate_scores(raw, users, existing_score_counts())
+
+    errors = preview[preview["status"] == "Error"]
+    for r in errors.itertuples(index=False):
+        print(json.dumps({"status": "invalid", "baris": int(r.baris), "nama": r.nama, "error": r.keterangan}))
+    rows = import_rows(preview)
+    log(f"{len(rows)} nilai valid, {len(errors)} tidak valid")
+    if args.dry_run or not rows:
+        return EXIT_PARTIAL if len(errors) else EXIT_OK
+
+    results = insert_scores(rows, batch_size=args.batch_size)
+    for result in results:
+        print(json.dumps(result))
+    refresh_stats_for_users([r["user_id"] for r in rows])
+    failed = sum(1 for r in results if r["error"])
+    log(f"{sum(r['ok'] for r in results)} nilai diimpor, {failed} batch gagal")
+    return EXIT_PARTIAL if failed or len(errors) else EXIT_OK
+
+
+# ======================
+# maintenance
+# ======================
+def cmd_rebuild_stats(args):
+    from stats import rebuild_user_stats
+
+    written, removed = rebuild_user_stats()
+    print(json.dumps({"written": written, "removed": removed}))
+    return EXIT_OK
+
+
+def cmd_archive_cohorts(args):
+    import archive
+
+    manifest = archive.pending_reset(kind="angkatan")
+    if manifest:
+        # Arsip yang belum selesai dihapus harus dituntaskan dulu, dengan --before yang sama
+        years = manifest.get("years") or []
+        if manifest.get("before_year", args.before) != args.before or any(y >= args.before for y in years):
+            raise UsageError(
+                f"Arsip {manifest['name']} (angkatan {years}, --before {manifest.get('before_year')}) "
+                f"belum selesai; jalankan ulang dengan --before {manifest.get('before_year')} untuk melanjutkannya"
+            )
+        log(f"Melanjutkan arsip {manifest['name']} (angkatan {years})")
+        manifest = archive.delete_archived(manifest)
+    else:
+        manifest = archive.archive_cohorts(args.before)
+        if manifest is None:
+            log(f"Tidak ada angkatan dengan tahun_aktif < {args.before}")
+            return EXIT_OK
+    print(json.dumps({
+        "archive": manifest["name"],
+        "years": manifest.get("years"),
+        "rows": {t: info["rows"] for t, info in manifest["tables"].items()},
+    }))
+    return EXIT_OK
+
+
+def cmd_backfill_legacy(args):
+    from legacy_scores import backfill_legacy_scores
+
+    def progress(state):
+        log(f"{state['scanned']} user dipindai, {state['migrated']} nilai dimigrasi")
+
+    summary = backfill_legacy_scores(
+        page_size=args.page_size,
+        batch_size=args.batch_size,
+        restart=args.restart,
+        dry_run=args.dry_run,
+        progress=progress,
+    )
+    print(json.dumps(summary))
+    log(f"Selesai dalam {summary['seconds']} detik ({summary['users_per_second']} user/detik)")
+    return EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="admin.py", description="CLI admin SKD (non-interaktif)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list-users", help="Daftar user (tanpa password)")
+    p.add_argument("--role", choices=["user", "admin"])
+    p.add_argument("--tahun-aktif", type=int)
+    p.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    p.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    p.set_defaults(func=cmd_list_users)
+
+    p = sub.add_parser("add-users-from-file", help="Tambah user dari CSV/JSONL (nama,password[,role,tahun_aktif,tahun_masuk])")
+    p.add_argument("file")
+    p.add_argument("--dry-run", action="store_true")
+    p.add_argument("--batch-size", type=int, default=INSERT_BATCH_SIZE)
+    p.add_argument("--workers", type=int, default=os.cpu_count())
+    p.set_defaults(func=cmd_add_users)
+
+    p = sub.add_parser("export-scores", help="Ekspor riwayat nilai (per halaman)")
+    p.add_argument("--tahun-aktif", type=int)
+    p.add_argument("--format", choices=["jsonl", "csv", "xlsx", "parquet"], default="jsonl")
+    p.add_argument("-o", "--output")
+    p.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    p.set_defaults(func=cmd_export_scores)
+
+    p = sub.add_parser("import-scores", help="Impor nilai dari CSV/XLSX (nama,twk,tiu,tkp[,total,tanggal])")
+    p.add_argument("file")
+    p.add_argument("--dry-run", action="store_true")
+    p.add_argument("--batch-size", type=int, default=INSERT_BATCH_SIZE)
+    p.set_defaults(func=cmd_import_scores)
+
+    p = sub.add_parser("rebuild-stats", help="Bangun ulang tabel user_stats")
+    p.set_defaults(func=cmd_rebuild_stats)
+
+    p = sub.add_parser("archive-cohorts", help="Pindahkan angkatan lama ke arsip lokal")
+    p.add_argument("--before", type=int, required=True, help="Arsipkan tahun_aktif < tahun ini")
+    p.set_defaults(func=cmd_archive_cohorts)
+
+    p = sub.add_parser("backfill-legacy-scores", help="Migrasi nilai lama kolom users ke tabel scores (bisa dilanjutkan)")
+    p.add_argument("--dry-run", action="store_true")
+    p.add_argument("--restart", action="store_true", help="Abaikan checkpoint dan pindai ulang dari awal")
+    p.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    p.add_argument("--batch-size", type=int, default=INSERT_BATCH_SIZE)
+    p.set_defaults(func=cmd_backfill_legacy)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except UsageError as e:
+        log(f"Error: {e}")
+        return EXIT_USAGE
+    except Exception as e:
+        # Error lain adalah bug: biarkan traceback-nya terlihat
+        if not isinstance(e, _service_errors()):
+            raise
+        log(f"Error: {e}")
+        return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
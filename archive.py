@@ -0,0 +1,286 @@
+import os
+import json
+import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from database import supabase, paginate
+
+# Arsip sebelum reset: tabel scores & users dialirkan per halaman ke file
+# Parquet (kompresi zstd) di ARCHIVE_DIR/<nama_arsip>/, lalu baris yang sudah
+# diarsipkan dihapus per batch. Kemajuan disimpan di manifest.json sehingga
+# reset yang terputus bisa dilanjutkan, dan arsip bisa dipulihkan kembali.
+#
+# Arsip angkatan (cold storage): user angkatan lama beserta nilainya
+# dipindahkan ke ARCHIVE_DIR/angkatan_<tahun>_.../ dan dihapus dari tabel
+# utama; dashboard hanya membacanya saat filter "Semua" dipilih.
+#
+# Nilai disimpan sebagai teks (null tetap null); Postgres mengonversinya
+# kembali ke tipe kolom saat restore, dan read_cohort_archives() mengubah
+# kolom angka kembali menjadi numerik.
+ARCHIVE_DIR = os.getenv(
+    "SKD_ARCHIVE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "archives"),
+)
+PAGE_SIZE = 1000
+RESTORE_BATCH_SIZE = 500
+# Batas id per filter in_ (baca & hapus): 200 UUID ~ 7-8 KB URL, aman dari 414
+ID_FILTER_BATCH = 200
+NUMERIC_COLUMNS = ("tahun_aktif", "tahun_masuk", "tahun_transmigrasi", "twk", "tiu", "tkp", "total")
+
+# Tabel yang diarsipkan & filter baris yang dihapus saat reset (admin tetap ada).
+# Urutan hapus: scores dulu; urutan restore kebalikannya (users dulu).
+ARCHIVE_TABLES = (
+    ("scores", None),
+    ("users", ("role", "user")),
+)
+
+
+def _manifest_path(name):
+    return os.path.join(ARCHIVE_DIR, name, "manifest.json")
+
+
+def _save_manifest(manifest):
+    path = _manifest_path(manifest["name"])
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def load_manifest(name):
+    with open(_manifest_path(name)) as f:
+        return json.load(f)
+
+
+def list_archives(kind=None):
+    """Manifest semua arsip (opsional per jenis: "reset" / "angkatan"), terbaru lebih dulu."""
+    try:
+        names = sorted(os.listdir(ARCHIVE_DIR), reverse=True)
+    except FileNotFoundError:
+        return []
+    manifests = []
+    for name in names:
+        try:
+            manifest = load_manifest(name)
+        except (OSError, ValueError):
+            continue
+        if kind is None or manifest.get("kind", "reset") == kind:
+            manifests.append(manifest)
+    return manifests
+
+
+def pending_reset(kind="reset"):
+    """Arsip lengkap yang proses hapusnya belum selesai (untuk dilanjutkan), atau None."""
+    return next((m for m in list_archives(kind) if m["status"] in ("diarsipkan", "menghapus")), None)
+
+
+def _to_text(value):
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def _write_parquet(path, pages, on_page=None):
+    """Tulis halaman-halaman baris ke satu file Parquet (memori tetap kecil)."""
+    writer = None
+    columns = None
+    rows_written = 0
+    try:
+        for rows in pages:
+            if writer is None:
+                columns = list(rows[0].keys())
+                schema = pa.schema([(c, pa.string()) for c in columns])
+                writer = pq.ParquetWriter(path, schema, compression="zstd")
+            batch = pa.table({c: [_to_text(r.get(c)) for r in rows] for c in columns}, schema=writer.schema)
+            writer.write_table(batch)
+            rows_written += len(rows)
+            if on_page:
+                on_page(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows_written, columns or []
+
+
+def _new_archive(prefix, kind, **extra):
+    name = datetime.datetime.now().strftime(f"{prefix}_%Y%m%d_%H%M%S_%f")
+    os.makedirs(os.path.join(ARCHIVE_DIR, name))
+    manifest = {
+        "name": name,
+        "kind": kind,
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "status": "mengarsipkan",
+        **extra,
+        "tables": {},
+    }
+    _save_manifest(manifest)
+    return manifest
+
+
+def _archive_table(manifest, table, pages, where=None, progress=None, on_page=None):
+    file_name = f"{table}.parquet"
+    counter = {"rows": 0}
+
+    def page_done(rows):
+        counter["rows"] += len(rows)
+        if on_page:
+            on_page(rows)
+        if progress:
+            progress(table, counter["rows"])
+
+    rows, columns = _write_parquet(os.path.join(ARCHIVE_DIR, manifest["name"], file_name), pages, page_done)
+    manifest["tables"][table] = {
+        "file": file_name if rows else None,
+        "rows": rows,
+        "columns": columns,
+        "where": list(where) if where else None,
+        "deleted": 0,
+    }
+
+
+def archive_tables(progress=None):
+    """Langkah 1 reset: arsipkan semua tabel. Mengembalikan manifest arsip baru."""
+    manifest = _new_archive("reset", "reset")
+    for table, where in ARCHIVE_TABLES:
+        _archive_table(manifest, table, paginate(table, page_size=PAGE_SIZE), where=where, progress=progress)
+    manifest["status"] = "diarsipkan"
+    _save_manifest(manifest)
+    return manifest
+
+
+def archive_cohorts(before_year, progress=None):
+    """
+    Pindahkan angkatan dengan tahun_aktif < before_year (user role 'user' dan
+    seluruh nilainya) ke arsip lalu hapus dari tabel utama per batch.
+    Mengembalikan manifest, atau None jika tidak ada angkatan yang diarsipkan.
+    """
+    def cohort_users(query):
+        return query.eq("role", "user").lt("tahun_aktif", before_year)
+
+    first = next(paginate("users", cohort_users, page_size=PAGE_SIZE), None)
+    if not first:
+        return None
+
+    manifest = _new_archive(f"angkatan_sebelum_{before_year}", "angkatan", before_year=before_year)
+    user_ids = []
+    _archive_table(
+        manifest, "users", paginate("users", cohort_users, page_size=PAGE_SIZE),
+        progress=progress, on_page=lambda rows: user_ids.extend(r["id"] for r in rows),
+    )
+    manifest["years"] = sorted({int(r["tahun_aktif"]) for r in _read_all(manifest, "users", ["tahun_aktif"])})
+
+    def cohort_scores():
+        for start in range(0, len(user_ids), ID_FILTER_BATCH):
+            chunk = user_ids[start:start + ID_FILTER_BATCH]
+            yield from paginate("scores", lambda q: q.in_("user_id", chunk), page_size=PAGE_SIZE)
+
+    _archive_table(manifest, "scores", cohort_scores(), progress=progress)
+    # Urutan hapus: scores dulu, lalu users
+    manifest["tables"] = {t: manifest["tables"][t] for t in ("scores", "users")}
+    manifest["status"] = "diarsipkan"
+    _save_manifest(manifest)
+    return delete_archived(manifest, progress=progress)
+
+
+def _read_rows(manifest, table, columns=None):
+    """Baca baris arsip per batch Parquet (list of dict), difilter sesuai `where` tabel."""
+    info = manifest["tables"].get(table) or {}
+    if not info.get("file"):
+        return
+    # Manifest lama (tanpa kunci "where") memakai filter reset bawaan
+    where = info["where"] if "where" in info else dict(ARCHIVE_TABLES).get(table)
+    if columns and where and where[0] not in columns:
+        columns = columns + [where[0]]
+    parquet = pq.ParquetFile(os.path.join(ARCHIVE_DIR, manifest["name"], info["file"]))
+    for batch in parquet.iter_batches(batch_size=RESTORE_BATCH_SIZE, columns=columns):
+        rows = batch.to_pylist()
+        if where:
+            rows = [r for r in rows if r.get(where[0]) == where[1]]
+        if rows:
+            yield rows
+
+
+def _read_all(manifest, table, columns=None):
+    return [r for rows in _read_rows(manifest, table, columns) for r in rows]
+
+
+def _archived_ids(manifest, table):
+    return [r["id"] for r in _read_all(manifest, table, ["id"])]
+
+
+def delete_archived(manifest, progress=None):
+    """
+    Langkah 2: hapus baris yang sudah diarsipkan, ID_FILTER_BATCH id per
+    permintaan. Kemajuan ditulis ke manifest setiap batch; memanggil ulang
+    fungsi ini melanjutkan dari batch terakhir yang tercatat.
+    """
+    manifest["status"] = "menghapus"
+    _save_manifest(manifest)
+    for table, info in manifest["tables"].items():
+        ids = _archived_ids(manifest, table)
+        info["to_delete"] = len(ids)
+        for start in range(info["deleted"], len(ids), ID_FILTER_BATCH):
+            batch = ids[start:start + ID_FILTER_BATCH]
+            supabase.table(table).delete().in_("id", batch).execute()
+            info["deleted"] = start + len(batch)
+            _save_manifest(manifest)
+            if progress:
+                progress(table, info["deleted"], len(ids))
+    manifest["status"] = "selesai"
+    _save_manifest(manifest)
+    return manifest
+
+
+def restore_archive(manifest, progress=None):
+    """
+    Pulihkan baris yang dihapus (users role 'user' lalu scores) dengan
+    upsert per batch; aman dijalankan ulang.
+    """
+    restored = {}
+    for table in reversed(list(manifest["tables"])):
+        count = 0
+        for rows in _read_rows(manifest, table):
+            supabase.table(table).upsert(rows, on_conflict="id").execute()
+            count += len(rows)
+            if progress:
+                progress(table, count, manifest["tables"][table]["rows"])
+        restored[table] = count
+    if manifest.get("kind") == "angkatan":
+        # Data kembali ke tabel utama -> arsip ini tidak lagi dibaca dashboard
+        manifest["status"] = "dipulihkan"
+        _save_manifest(manifest)
+    return restored
+
+
+def cohort_archive_names():
+    """Nama arsip angkatan yang aktif (datanya hanya ada di arsip)."""
+    return tuple(m["name"] for m in list_archives("angkatan") if m["status"] == "selesai")
+
+
+def read_cohort_archives(names):
+    """
+    Gabungan data arsip angkatan (DataFrame users, DataFrame scores) dari
+    arsip bernama `names`. Kolom angka dikembalikan ke tipe numerik.
+    """
+    import pandas as pd
+
+    frames = {"users": [], "scores": []}
+    for name in names:
+        manifest = load_manifest(name)
+        for table in frames:
+            info = manifest["tables"].get(table) or {}
+            if info.get("file"):
+                frames[table].append(pq.read_table(os.path.join(ARCHIVE_DIR, name, info["file"])).to_pandas())
+
+    result = []
+    for table, parts in frames.items():
+        df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+        for col in NUMERIC_COLUMNS:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+        result.append(df)
+    return tuple(result)
@@ -116,6 +116,9 @@ def login():
                             "tahun_masuk": new_angkatan,
                             "tahun_aktif": new_angkatan
                         }).execute()
+                        # Data user di-cache bersama (dashboard); buang agar akun baru langsung tampil
+                        from dashboard import invalidate_data_cache
+                        invalidate_data_cache(rebuild_weekly=False)
                         st.session_state.toast_msg = "Pendaftaran berhasil! Silakan login."
                         st.rerun()
                     except Exception as e:
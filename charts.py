@@ -0,0 +1,256 @@
+import numpy as np
+
+
+# Palette Modern Emerald & Dark Slate (dipakai grafik browser & laporan matplotlib)
+COLOR_TWK = "#1E293B"  # Dark Slate
+COLOR_TIU = "#64748B"  # Slate
+COLOR_TKP = "#10B981"  # Emerald
+COLOR_PRIMARY = COLOR_TWK
+COLOR_MISSING = "#E2E8F0"
+
+SKD_COMPONENTS = (("twk", "TWK", COLOR_TWK), ("tiu", "TIU", COLOR_TIU), ("tkp", "TKP", COLOR_TKP))
+
+HEATMAP_MAX_NAME_TICKS = 60
+SMALL_MULTIPLES_COLS = 6
+SMALL_MULTIPLES_MAX = 48
+
+
+# ======================
+# DOWNSAMPLING (LTTB)
+# ======================
+# Batas titik default untuk grafik riwayat panjang (dashboard & laporan)
+CHART_MAX_POINTS = 60
+
+
+def lttb_indices(y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: pilih `threshold` indeks yang paling
+    mempertahankan bentuk deret (puncak & penurunan tetap terlihat).
+    Titik pertama dan terakhir selalu dipertahankan.
+    """
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=float)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    # Titik tengah dibagi ke threshold-2 bucket
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(int)
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        # Rata-rata bucket berikutnya (atau titik terakhir untuk bucket akhir)
+        if i + 2 < len(edges):
+            nxt = slice(edges[i + 1], max(edges[i + 2], edges[i + 1] + 1))
+            cx, cy = x[nxt].mean(), y[nxt].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+
+        area = np.abs((x[a] - cx) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (cy - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_scores(df, value_cols, max_points):
+    """
+    Kurangi baris riwayat nilai (urut per percobaan) menjadi paling banyak
+    `max_points` titik. Indeks LTTB tiap kolom digabung agar ekstrem setiap
+    komponen tetap tampil.
+    """
+    if max_points is None or len(df) <= max_points:
+        return df
+    per_col = max(3, max_points // len(value_cols))
+    keep = set()
+    for col in value_cols:
+        keep.update(lttb_indices(df[col].to_numpy(), per_col).tolist())
+    return df.iloc[sorted(keep)]
+
+
+def chart_cols(is_component):
+    return ["twk", "tiu", "tkp"] if is_component else ["total"]
+
+
+# ======================
+# SPEC VEGA-LITE (RENDER DI BROWSER)
+# ======================
+# Server hanya mengirim tabel numerik ringkas + spec; transformasi (fold),
+# layout, tooltip, dan highlight legend dikerjakan Vega-Lite di browser.
+def _series(is_component):
+    if is_component:
+        return list(SKD_COMPONENTS)
+    return [("total", "Total", COLOR_TWK)]
+
+
+def _title(text):
+    return {"text": text, "color": COLOR_TWK, "fontSize": 14, "fontWeight": "bold"}
+
+
+def _color_scale(series):
+    return {
+        "domain": [label for _, label, _ in series],
+        "range": [color for _, _, color in series],
+    }
+
+
+def skd_line_chart(df, title, is_component=True, max_points=None):
+    """
+    Grafik garis SKD (komponen TWK/TIU/TKP atau total) per label percobaan.
+    Mengembalikan (data, spec) untuk st.vega_lite_chart, atau (None, None) jika kosong.
+    """
+    if df.empty:
+        return None, None
+
+    series = _series(is_component)
+    if max_points:
+        df = downsample_scores(df, chart_cols(is_component), max_points)
+
+    data = df[["label"] + [col for col, _, _ in series]].rename(
+        columns={col: label for col, label, _ in series}
+    )
+    data.insert(0, "urutan", np.arange(len(data)))
+
+    spec = {
+        "title": _title(title),
+        "height": 360,
+        "transform": [{"fold": [label for _, label, _ in series], "as": ["Komponen", "Nilai"]}],
+        "params": [{
+            "name": "komponen",
+            "select": {"type": "point", "fields": ["Komponen"]},
+            "bind": "legend",
+        }],
+        "mark": {"type": "line", "point": True, "strokeWidth": 3},
+        "encoding": {
+            "x": {
+                "field": "label",
+                "type": "nominal",
+                "sort": {"field": "urutan", "op": "min"},
+                "title": None,
+                "axis": {"labelAngle": -45},
+            },
+            "y": {"field": "Nilai", "type": "quantitative", "title": "Nilai" if is_component else "Total Nilai"},
+            "color": {
+                "field": "Komponen",
+                "type": "nominal",
+                "scale": _color_scale(series),
+                "legend": {"orient": "right", "title": None},
+            },
+            "opacity": {"condition": {"param": "komponen", "value": 1}, "value": 0.15},
+            "tooltip": [
+                {"field": "label", "title": "Percobaan"},
+                {"field": "Komponen"},
+                {"field": "Nilai", "type": "quantitative"},
+            ],
+        },
+    }
+    return data, spec
+
+
+def skd_heatmap_chart(df, title, is_component=True):
+    """
+    Heatmap user x percobaan (satu panel per komponen, atau satu untuk total).
+    Sel kosong (belum ada percobaan) tampil dengan warna latar abu-abu.
+    """
+    if df.empty:
+        return None, None
+
+    series = _series(is_component)
+    data = df[["nama", "skd_ke"] + [col for col, _, _ in series]]
+    num_users = data["nama"].nunique()
+
+    # Tinggi dibatasi agar tidak tumbuh tanpa batas per user
+    height = min(720, max(160, num_users * 14))
+    y_axis = {"title": None, "labelFontSize": 9}
+    if num_users > HEATMAP_MAX_NAME_TICKS:
+        y_axis = {"title": f"{num_users} user", "labels": False, "ticks": False}
+
+    panels = []
+    for i, (col, label, color) in enumerate(series):
+        panels.append({
+            "title": {"text": label, "color": COLOR_TWK},
+            "width": 260 if is_component else 640,
+            "height": height,
+            "mark": "rect",
+            "encoding": {
+                "x": {
+                    "field": "skd_ke",
+                    "type": "ordinal",
+                    "title": "SKD ke-",
+                    "axis": {"labelAngle": 0, "labelOverlap": True},
+                },
+                "y": {
+                    "field": "nama",
+                    "type": "nominal",
+                    "sort": "ascending",
+                    "axis": y_axis if i == 0 else None,
+                },
+                "color": {
+                    "field": col,
+                    "type": "quantitative",
+                    "title": label,
+                    "scale": {"range": ["#FFFFFF", color]},
+                },
+                "tooltip": [
+                    {"field": "nama", "title": "Nama"},
+                    {"field": "skd_ke", "title": "SKD ke-"},
+                    {"field": col, "title": label, "type": "quantitative"},
+                ],
+            },
+        })
+
+    spec = {
+        "title": _title(title),
+        "hconcat": panels,
+        "resolve": {"scale": {"color": "independent"}},
+        "config": {"view": {"fill": COLOR_MISSING, "stroke": None}},
+    }
+    return data, spec
+
+
+def skd_small_multiples_chart(df, title, is_component=True):
+    """
+    Grid grafik kecil per user (maksimal SMALL_MULTIPLES_MAX panel).
+    Mengembalikan (data, spec, jumlah user yang tidak ditampilkan).
+    """
+    if df.empty:
+        return None, None, 0
+
+    series = _series(is_component)
+    names = sorted(df["nama"].unique().tolist())
+    hidden = max(0, len(names) - SMALL_MULTIPLES_MAX)
+    names = names[:SMALL_MULTIPLES_MAX]
+
+    data = df[df["nama"].isin(names)][["nama", "skd_ke"] + [col for col, _, _ in series]].rename(
+        columns={col: label for col, label, _ in series}
+    )
+
+    spec = {
+        "title": _title(title),
+        "transform": [{"fold": [label for _, label, _ in series], "as": ["Komponen", "Nilai"]}],
+        "facet": {"field": "nama", "type": "nominal", "title": None, "header": {"labelFontSize": 10}},
+        "columns": SMALL_MULTIPLES_COLS,
+        "spec": {
+            "width": 150,
+            "height": 90,
+            "mark": {"type": "line", "point": {"size": 12}, "strokeWidth": 1.2},
+            "encoding": {
+                "x": {"field": "skd_ke", "type": "quantitative", "title": None, "axis": {"tickMinStep": 1, "format": "d"}},
+                "y": {"field": "Nilai", "type": "quantitative", "title": None},
+                "color": {
+                    "field": "Komponen",
+                    "type": "nominal",
+                    "scale": _color_scale(series),
+                    "legend": {"orient": "top", "title": None},
+                },
+                "tooltip": [
+                    {"field": "skd_ke", "title": "SKD ke-"},
+                    {"field": "Komponen"},
+                    {"field": "Nilai", "type": "quantitative"},
+                ],
+            },
+        },
+    }
+    return data, spec, hidden
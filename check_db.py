@@ -1,23 +1,297 @@
+import re
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
 from database import supabase
+from weekly import week_start, to_query_ts
+
+# Pemeriksaan kesehatan database:
+#
+#   python check_db.py [--runs 10] [--json]
+#
+# 1. Kolom & tipe data users / scores / user_stats sesuai yang dipakai aplikasi.
+# 2. Indeks untuk filter yang sering dipakai (HOT_FILTERS).
+# 3. Latensi p50/p95, jumlah baris & ukuran payload setiap query yang
+#    dikirim aplikasi.
+#
+# Tipe data & indeks dibaca lewat fungsi di check_db.sql. Jika fungsi itu
+# belum dipasang, tipe ditebak dari contoh baris dan indeks dilewati.
+# Kode keluar: 0 sehat, 1 ada masalah skema / indeks, 3 error koneksi.
+INTEGER_TYPES = {"smallint", "integer", "bigint"}
+NUMBER_TYPES = INTEGER_TYPES | {"numeric", "real", "double precision"}
+TEXT_TYPES = {"text", "character varying"}
+TIMESTAMP_TYPES = {"timestamp with time zone", "timestamp without time zone"}
+UUID_TYPES = {"uuid"}
+
+EXPECTED_COLUMNS = {
+    "users": {
+        "id": UUID_TYPES,
+        "nama": TEXT_TYPES,
+        "password": TEXT_TYPES,
+        "role": TEXT_TYPES,
+        "tahun_masuk": INTEGER_TYPES,
+        "tahun_aktif": INTEGER_TYPES,
+        "tahun_transmigrasi": INTEGER_TYPES,
+    },
+    "scores": {
+        "id": UUID_TYPES,
+        "user_id": UUID_TYPES,
+        "twk": NUMBER_TYPES,
+        "tiu": NUMBER_TYPES,
+        "tkp": NUMBER_TYPES,
+        "total": NUMBER_TYPES,
+        "created_at": TIMESTAMP_TYPES,
+    },
+    "user_stats": {
+        "user_id": UUID_TYPES,
+        "attempt_count": INTEGER_TYPES,
+        "best_total": NUMBER_TYPES,
+        "last_total": NUMBER_TYPES,
+        "mean_total": NUMBER_TYPES,
+        "first_attempt_at": TIMESTAMP_TYPES,
+        "last_attempt_at": TIMESTAMP_TYPES,
+        "updated_at": TIMESTAMP_TYPES,
+    },
+}
+
+# (tabel, kolom) yang dipakai sebagai filter di query panas aplikasi
+HOT_FILTERS = (
+    ("scores", "user_id"),
+    ("scores", "created_at"),
+    ("users", "nama"),
+    ("users", "tahun_aktif"),
+)
+
+DEFAULT_RUNS = 5
+SLOW_QUERY_MS = 1000
+
+_UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
+_TIMESTAMP_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}")
+
+
+def _kind(types):
+    """Golongan kasar tipe (untuk perbandingan dengan contoh baris JSON)."""
+    if types <= NUMBER_TYPES:
+        return "angka"
+    if types <= TIMESTAMP_TYPES:
+        return "timestamp"
+    if types <= UUID_TYPES:
+        return "uuid"
+    return "teks"
+
 
-def check_schema():
+def _guess_kind(value):
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "angka"
+    if isinstance(value, str):
+        if _UUID_RE.match(value):
+            return "uuid"
+        if _TIMESTAMP_RE.match(value):
+            return "timestamp"
+        return "teks"
+    return None
+
+
+def _rpc_rows(name):
+    """Hasil fungsi diagnostik check_db.sql, atau None jika belum dipasang."""
     try:
-        res = supabase.table("users").select("*").limit(1).execute()
-        if res and hasattr(res, "data") and res.data:
-            print("Columns in 'users':", list(res.data[0].keys()))
+        response = supabase.rpc(name).execute()
+    except Exception:
+        return None
+    return getattr(response, "data", []) or []
+
+
+def check_columns():
+    """Daftar temuan kolom: {"tabel", "kolom", "status", "keterangan"} (status OK / MASALAH / INFO)."""
+    schema = _rpc_rows("skd_schema_report")
+    findings = []
+    for table, expected in EXPECTED_COLUMNS.items():
+        if schema is not None:
+            actual = {r["column_name"]: r["data_type"] for r in schema if r["table_name"] == table}
+            source = "skema"
         else:
-            print("Table 'users' is empty or no data returned.")
-    except Exception as e:
-        print("Error checking 'users':", e)
+            try:
+                response = supabase.table(table).select("*").limit(1).execute()
+            except Exception as e:
+                findings.append({"tabel": table, "kolom": "-", "status": "MASALAH", "keterangan": f"tidak bisa dibaca: {e}"})
+                continue
+            rows = getattr(response, "data", []) or []
+            if not rows:
+                findings.append({"tabel": table, "kolom": "-", "status": "INFO", "keterangan": "tabel kosong, kolom tidak bisa diperiksa"})
+                continue
+            actual = rows[0]
+            source = "contoh baris"
+
+        if not actual:
+            findings.append({"tabel": table, "kolom": "-", "status": "MASALAH", "keterangan": "tabel tidak ada"})
+            continue
+        for column, types in expected.items():
+            if column not in actual:
+                findings.append({"tabel": table, "kolom": column, "status": "MASALAH", "keterangan": "kolom tidak ada"})
+                continue
+            if source == "skema":
+                ok = actual[column] in types
+                found = actual[column]
+            else:
+                found = _guess_kind(actual[column])
+                ok = found is None or found == _kind(types) or (found == "teks" and _kind(types) == "uuid")
+            findings.append({
+                "tabel": table,
+                "kolom": column,
+                "status": "OK" if ok else "MASALAH",
+                "keterangan": f"{found or 'null'} ({source})" if ok else f"tipe {found}, diharapkan {'/'.join(sorted(types))}",
+            })
+    return findings
+
+
+def _leading_column(index_def):
+    match = re.search(r"\((.+)\)", index_def)
+    if not match:
+        return None
+    return match.group(1).split(",")[0].strip().strip('"').split()[0]
+
+
+def check_indexes():
+    """Indeks untuk setiap HOT_FILTERS (kolom pertama indeks), atau None jika tidak bisa diperiksa."""
+    indexes = _rpc_rows("skd_index_report")
+    if indexes is None:
+        return None
+    findings = []
+    for table, column in HOT_FILTERS:
+        names = [
+            r["index_name"] for r in indexes
+            if r["table_name"] == table and _leading_column(r["index_def"]) == column
+        ]
+        findings.append({
+            "tabel": table,
+            "kolom": column,
+            "status": "OK" if names else "MASALAH",
+            "keterangan": ", ".join(names) if names else f"create index on {table} ({column});",
+        })
+    return findings
+
+
+def table_counts():
+    """Jumlah baris per tabel (count exact, tanpa mengambil data)."""
+    counts = {}
+    for table in EXPECTED_COLUMNS:
+        try:
+            response = supabase.table(table).select("*", count="exact").limit(1).execute()
+            counts[table] = response.count
+        except Exception as e:
+            counts[table] = f"error: {e}"
+    return counts
+
+
+def app_queries():
+    """Query baca yang dikirim aplikasi (login, dashboard, ranking, snapshot mingguan)."""
+    sample = getattr(supabase.table("users").select("id,nama,tahun_aktif").eq("role", "user").limit(1).execute(), "data", None)
+    sample = sample[0] if sample else {"id": "00000000-0000-0000-0000-000000000000", "nama": "-", "tahun_aktif": 0}
+    since = to_query_ts(week_start())
+    return [
+        ("login: users eq nama", lambda: supabase.table("users").select("*").eq("nama", sample["nama"])),
+        ("semua users", lambda: supabase.table("users").select("*")),
+        ("semua scores", lambda: supabase.table("scores").select("*")),
+        ("riwayat user: scores eq user_id", lambda: (
+            supabase.table("scores").select("*").eq("user_id", sample["id"]).order("created_at", desc=True)
+        )),
+        ("angkatan: users eq tahun_aktif", lambda: (
+            supabase.table("users").select("*").eq("role", "user").eq("tahun_aktif", sample["tahun_aktif"])
+        )),
+        ("mingguan: scores gte created_at", lambda: (
+            supabase.table("scores").select("*").gte("created_at", since).order("created_at")
+        )),
+        ("mingguan: scores lt created_at", lambda: supabase.table("scores").select("user_id").lt("created_at", since)),
+        ("ranking: users", lambda: supabase.table("users").select("id,role,tahun_aktif")),
+        ("ranking: scores", lambda: supabase.table("scores").select("user_id,twk,tiu,tkp,created_at")),
+        ("statistik: user_stats", lambda: supabase.table("user_stats").select("*")),
+    ]
+
+
+def measure_queries(runs=DEFAULT_RUNS):
+    """Latensi p50/p95 (ms), jumlah baris & ukuran payload JSON setiap query aplikasi."""
+    results = []
+    for label, build in app_queries():
+        times = []
+        data = []
+        try:
+            build().execute()  # pemanasan (koneksi), tidak dihitung
+            for _ in range(runs):
+                t0 = time.perf_counter()
+                data = getattr(build().execute(), "data", []) or []
+                times.append((time.perf_counter() - t0) * 1000)
+        except Exception as e:
+            results.append({"query": label, "error": str(e)})
+            continue
+        p50, p95 = np.percentile(times, [50, 95])
+        results.append({
+            "query": label,
+            "p50_ms": round(float(p50), 1),
+            "p95_ms": round(float(p95), 1),
+            "baris": len(data),
+            "payload_kb": round(len(json.dumps(data, default=str)) / 1024, 1),
+            "lambat": bool(p95 > SLOW_QUERY_MS),
+        })
+    return results
+
+
+def _print_findings(title, findings):
+    print(f"\n== {title} ==")
+    for f in findings:
+        print(f"  [{f['status']:7}] {f['tabel']}.{f['kolom']}: {f['keterangan']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="check_db.py", description="Pemeriksaan skema, indeks & latensi database SKD")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Jumlah pengulangan per query")
+    parser.add_argument("--json", action="store_true", help="Cetak laporan sebagai JSON")
+    args = parser.parse_args(argv)
 
     try:
-        res = supabase.table("scores").select("*").limit(1).execute()
-        if res and hasattr(res, "data") and res.data:
-            print("Columns in 'scores':", list(res.data[0].keys()))
-        else:
-            print("Table 'scores' is empty or no data returned.")
+        report = {
+            "kolom": check_columns(),
+            "indeks": check_indexes(),
+            "jumlah_baris": table_counts(),
+            "query": measure_queries(args.runs),
+        }
     except Exception as e:
-        print("Error checking 'scores':", e)
+        print(f"Error koneksi database: {e}", file=sys.stderr)
+        return 3
+
+    problems = [f for f in report["kolom"] + (report["indeks"] or []) if f["status"] == "MASALAH"]
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        _print_findings("Kolom & tipe data", report["kolom"])
+        if report["indeks"] is None:
+            print("\n== Indeks ==\n  Tidak bisa diperiksa: jalankan check_db.sql di Supabase SQL Editor.")
+        else:
+            _print_findings("Indeks filter utama", report["indeks"])
+
+        print("\n== Jumlah baris ==")
+        for table, count in report["jumlah_baris"].items():
+            print(f"  {table}: {count}")
+
+        print(f"\n== Latensi query aplikasi ({args.runs}x) ==")
+        for q in report["query"]:
+            if "error" in q:
+                print(f"  {q['query']}: ERROR {q['error']}")
+                continue
+            flag = "  <- LAMBAT" if q["lambat"] else ""
+            print(
+                f"  {q['query']}: p50 {q['p50_ms']} ms, p95 {q['p95_ms']} ms, "
+                f"{q['baris']} baris, {q['payload_kb']} KB{flag}"
+            )
+        print(f"\n{len(problems)} masalah ditemukan." if problems else "\nSkema & indeks OK.")
+    return 1 if problems else 0
+
 
 if __name__ == "__main__":
-    check_schema()
+    sys.exit(main())
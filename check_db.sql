@@ -0,0 +1,33 @@
+-- Fungsi diagnostik untuk check_db.py (PostgREST tidak bisa membaca
+-- information_schema / pg_indexes secara langsung). Jalankan sekali di
+-- Supabase SQL Editor.
+create or replace function skd_schema_report()
+returns table (table_name text, column_name text, data_type text)
+language sql stable security definer
+set search_path = public
+as $$
+    select c.table_name::text, c.column_name::text, c.data_type::text
+    from information_schema.columns c
+    where c.table_schema = 'public'
+      and c.table_name in ('users', 'scores', 'user_stats')
+    order by c.table_name, c.ordinal_position;
+$$;
+
+create or replace function skd_index_report()
+returns table (table_name text, index_name text, index_def text)
+language sql stable security definer
+set search_path = public
+as $$
+    select i.tablename::text, i.indexname::text, i.indexdef::text
+    from pg_indexes i
+    where i.schemaname = 'public'
+      and i.tablename in ('users', 'scores', 'user_stats')
+    order by i.tablename, i.indexname;
+$$;
+
+-- Indeks untuk filter yang sering dipakai aplikasi (login per nama, riwayat
+-- per user, snapshot mingguan per tanggal, filter angkatan).
+create index if not exists scores_user_id_created_at_idx on scores (user_id, created_at);
+create index if not exists scores_created_at_idx on scores (created_at);
+create index if not exists users_nama_idx on users (nama);
+create index if not exists users_tahun_aktif_idx on users (tahun_aktif);
@@ -0,0 +1,2102 @@
+import streamlit as st
+import pandas as pd
+import bcrypt
+import datetime
+
+from auth import logout
+from perf import timed, add_timer
+from database import supabase
+from weekly import WeeklySnapshot
+from stats import STATS_TABLE, refresh_user_stats, refresh_stats_for_users, clear_user_stats, rebuild_user_stats, fetch_user_stats
+from ranking import CohortRanking
+from export import EXPORT_FORMATS, ID_FILTER_BATCH, iter_frame, write_export, iter_cohort_scores, iter_archived_scores
+from passing import load_passing_rules, default_passing_rules, evaluate_passing, pass_rates
+from charts import (
+    SMALL_MULTIPLES_MAX,
+    CHART_MAX_POINTS,
+    skd_line_chart,
+    skd_heatmap_chart,
+    skd_small_multiples_chart,
+)
+
+# Halaman aplikasi setelah login. Modul ini (pandas, numpy, Supabase) baru
+# diimpor oleh main.py setelah user terautentikasi, sehingga halaman login
+# tidak ikut menanggung biaya impornya. Renderer laporan (matplotlib) dimuat
+# lebih lambat lagi, saat halaman Cetak Laporan dipakai.
+
+# Opsi khusus di dropdown laporan admin untuk laporan massal per user
+BATCH_REPORT_OPTION = "📦 Laporan Massal (ZIP)"
+
+
+# ======================
+# HELPER FUNCTIONS
+# ======================
+# Data Supabase di-cache bersama untuk semua sesi & halaman (bukan per rerun).
+# Setiap penulisan lewat aplikasi memanggil invalidate_data_cache(); perubahan
+# dari luar aplikasi terlihat paling lambat setelah TTL.
+DATA_CACHE_TTL = 300  # detik
+
+
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
+def _select_all(table: str):
+    response = supabase.table(table).select("*").execute()
+    return getattr(response, "data", []) or []
+
+
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
+def _select_user_scores(user_id: str):
+    response = (
+        supabase.table("scores")
+        .select("*")
+        .eq("user_id", user_id)
+        .order("created_at", desc=True)
+        .execute()
+    )
+    return getattr(response, "data", []) or []
+
+
+def invalidate_data_cache(rebuild_weekly=True):
+    """
+    Buang cache data setelah insert/update/delete agar semua sesi melihat data terbaru.
+    Nilai baru (insert) ikut masuk snapshot mingguan secara inkremental, jadi
+    snapshot hanya dibangun ulang setelah edit/hapus. Hanya cache query tabel
+    yang dibuang; cache turunan (passing grade per df, arsip angkatan per set
+    file) tetap valid.
+    """
+    _select_all.clear()
+    _select_user_scores.clear()
+    _select_user_stats.clear()
+    if rebuild_weekly:
+        get_weekly_snapshot().invalidate()
+
+
+@st.cache_resource
+def get_weekly_snapshot():
+    """Satu snapshot "terakhir minggu ini" per proses server (dipakai bersama semua sesi)."""
+    return WeeklySnapshot()
+
+
+def weekly_latest_scores(df):
+    """
+    Percobaan terakhir per user minggu ini (batas minggu difilter di query),
+    dibatasi ke user yang ada di `df` (filter angkatan / user terpilih).
+    """
+    try:
+        rows = get_weekly_snapshot().refresh()
+    except Exception as e:
+        st.error(f"Error fetching weekly scores: {e}")
+        rows = []
+    if not rows:
+        return df.iloc[0:0].copy()
+
+    user_cols = [c for c in ["nama", "role", "tahun_aktif", "tahun_masuk", "tahun_transmigrasi"] if c in df.columns]
+    users = df.drop_duplicates("user_id")[["user_id"] + user_cols]
+    week = pd.DataFrame(rows)
+    week = week.drop(columns=[c for c in user_cols if c in week.columns])
+    return week.merge(users, on="user_id", how="inner").sort_values("created_at")
+
+
+@st.cache_resource
+def get_cohort_ranking():
+    """Papan peringkat per angkatan, satu per proses server (dipakai bersama semua sesi)."""
+    return CohortRanking()
+
+
+def cohort_ranking():
+    """
+    Papan peringkat yang siap dipakai, atau None jika gagal. Dibangun sekali
+    per proses; setelah TTL data disegarkan di latar belakang (tidak
+    memblokir halaman).
+    """
+    ranking = get_cohort_ranking()
+    try:
+        ranking.ensure_built(max_age=DATA_CACHE_TTL)
+    except Exception as e:
+        st.error(f"Error building ranking: {e}")
+        return None
+    return ranking
+
+
+def sync_user_ranking(user_id):
+    """Perbarui posisi user di papan peringkat setelah nilai / angkatan / role berubah."""
+    ranking = get_cohort_ranking()
+    try:
+        ranking.update_user(user_id)
+    except Exception:
+        # Gagal memperbarui satu user -> bangun ulang penuh saat dibutuhkan
+        ranking.invalidate()
+
+
+def sync_user_stats(user_id):
+    """Perbarui user_stats & peringkat setelah nilai user berubah (gagal = peringatan saja)."""
+    try:
+        refresh_user_stats(user_id)
+    except Exception as e:
+        st.warning(f"Statistik user belum diperbarui ({e}). Jalankan `python stats.py rebuild`.")
+    sync_user_ranking(user_id)
+
+
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
+def _select_user_stats(user_id: str):
+    rows = fetch_user_stats(user_id)
+    return rows[0] if rows else None
+
+
+def fetch_one_user_stats(user_id):
+    """Baris user_stats satu user, atau None jika belum ada / tabel belum tersedia."""
+    try:
+        return _select_user_stats(user_id)
+    except Exception:
+        return None
+
+
+def fetch_all_user_stats():
+    """
+    Ringkasan nilai per user dari tabel user_stats ({user_id: baris}).
+    None jika tabel belum tersedia, agar pemanggil menghitung dari riwayat scores.
+    """
+    try:
+        return {row["user_id"]: row for row in _select_all(STATS_TABLE)}
+    except Exception:
+        return None
+
+
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
+def _evaluate_passing(df, rules):
+    return evaluate_passing(df, rules)
+
+
+def passing_rules():
+    """Aturan passing grade aktif; file rusak -> aturan bawaan + peringatan."""
+    try:
+        return load_passing_rules()
+    except (ValueError, TypeError, AttributeError) as e:
+        st.warning(f"File passing grade tidak valid ({e}), memakai aturan bawaan.")
+        return default_passing_rules()
+
+
+def evaluate_passing_grade(df, rules=None):
+    """Tambahkan kolom lulus/margin passing grade ke `df` (hasil di-cache)."""
+    return _evaluate_passing(df, rules or passing_rules())
+
+
+@st.cache_data(show_spinner="Memuat arsip angkatan...")
+def _load_cohort_archives(names):
+    from archive import read_cohort_archives
+    return read_cohort_archives(names)
+
+
+def fetch_archived_cohorts():
+    """
+    Data angkatan lama dari cold storage: (df_users, df_scores), atau None.
+    Hanya dibaca saat dibutuhkan (filter "Semua"); hasil di-cache per set arsip.
+    """
+    from archive import cohort_archive_names
+
+    names = cohort_archive_names()
+    if not names:
+        return None
+    try:
+        return _load_cohort_archives(names)
+    except Exception as e:
+        st.error(f"Error reading cohort archive: {e}")
+        return None
+
+
+def fetch_all_users():
+    try:
+        return _select_all("users")
+    except Exception as e:
+        st.error(f"Error fetching all users: {e}")
+        return []
+
+
+def fetch_all_scores():
+    """Ambil semua data dari tabel scores."""
+    try:
+        return _select_all("scores")
+    except Exception as e:
+        st.error(f"Error fetching all scores: {e}")
+        return []
+
+
+def fetch_user_scores(user_id: str):
+    """Ambil semua riwayat nilai untuk satu user (scores table)."""
+    try:
+        return _select_user_scores(user_id)
+    except Exception as e:
+        # Jika tabel scores belum ada atau error lain, kembalikan list kosong
+        st.error(f"Error fetching user scores: {e}")
+        return []
+
+
+def fetch_latest_score(user_id: str):
+    """Ambil nilai terbaru user dari tabel scores."""
+    scores = fetch_user_scores(user_id)
+    return scores[0] if scores else None
+
+
+@timed("render_skd_chart")
+def render_skd_chart(df, title, is_component=True, max_points=None):
+    """
+    Tampilkan grafik SKD dengan gaya seragam dan responsif (Modern Theme).
+    Grafik digambar di browser (Vega-Lite); server hanya mengirim deret nilai.
+    """
+    data, spec = skd_line_chart(df, title, is_component=is_component, max_points=max_points)
+    if spec is None:
+        st.warning(f"Data kosong untuk {title}")
+        return
+    st.vega_lite_chart(data, spec, use_container_width=True)
+
+
+def downsample_option(num_points, key):
+    """
+    Checkbox penyederhanaan grafik untuk riwayat panjang.
+    Mengembalikan batas titik (int) atau None jika tidak perlu / dimatikan.
+    """
+    if num_points <= CHART_MAX_POINTS:
+        return None
+    aktif = st.checkbox(
+        f"Sederhanakan grafik (maks. {CHART_MAX_POINTS} titik, puncak & penurunan tetap terlihat)",
+        value=True,
+        key=key
+    )
+    return CHART_MAX_POINTS if aktif else None
+
+
+@st.cache_resource(show_spinner=False)
+def get_report_queue():
+    """
+    Satu antrian render laporan per proses server (dipakai bersama semua sesi).
+    Matplotlib baru dimuat (dan dipanaskan) saat halaman laporan pertama dibuka.
+    """
+    from render import warm_up
+    from report_jobs import ReportJobQueue
+
+    warm_up()
+    return ReportJobQueue()
+
+
+def report_job_ui(key, label, file_name, mime, btn_key):
+    """
+    Tampilkan status job laporan. Tombol download muncul begitu artefak siap;
+    selama masih diproses, hanya bagian status ini yang di-poll ulang.
+    """
+    queue = get_report_queue()
+    data, meta = queue.result(key)
+    if data is not None:
+        st.download_button(
+            label=label,
+            data=data,
+            file_name=file_name,
+            mime=mime,
+            use_container_width=True,
+            key=btn_key
+        )
+        metrics = (meta or {}).get("metrics")
+        if metrics:
+            add_timer(f"render_report_page ({metrics['format']}, worker)", metrics["render_ms"])
+            st.caption(f"{metrics['format'].upper()} · {metrics['ukuran_kb']} KB · render {metrics['render_ms']:.0f} ms")
+        return meta
+
+    status = queue.status(key)
+    if status["state"] == "failed":
+        st.error(f"Gagal membuat laporan: {status['error']}")
+    elif status["state"] == "missing":
+        st.info("Laporan belum tersedia.")
+    else:
+        _poll_report_job(key)
+    return None
+
+
+def report_format_option(key):
+    """Pilihan format file laporan. Mengembalikan kunci format (png/webp/svg/pdf)."""
+    from render import REPORT_FORMATS
+
+    return st.radio(
+        "Format File:",
+        list(REPORT_FORMATS),
+        format_func=lambda f: REPORT_FORMATS[f]["label"],
+        horizontal=True,
+        key=key
+    )
+
+
+def report_download_ui(queue, report_df, report_title, filename_base, fmt, btn_suffix):
+    """Dua tombol download (tabel & grafik) laporan A4 dalam format terpilih."""
+    from render import REPORT_FORMATS
+
+    info = REPORT_FORMATS[fmt]
+    key_table = queue.submit_report_page(report_df, report_title, "table", fmt=fmt)
+    key_charts = queue.submit_report_page(report_df, report_title, "charts", fmt=fmt)
+
+    col_btn1, col_btn2 = st.columns(2)
+    with col_btn1:
+        report_job_ui(
+            key_table,
+            label=f"📄 Download Tabel ({info['ext'].upper()})",
+            file_name=f"{filename_base}_tabel.{info['ext']}",
+            mime=info["mime"],
+            btn_key=f"btn_dl_table_{btn_suffix}"
+        )
+    with col_btn2:
+        report_job_ui(
+            key_charts,
+            label=f"📊 Download Grafik ({info['ext'].upper()})",
+            file_name=f"{filename_base}_grafik.{info['ext']}",
+            mime=info["mime"],
+            btn_key=f"btn_dl_charts_{btn_suffix}"
+        )
+
+
+@st.fragment(run_every=1)
+def _poll_report_job(key):
+    status = get_report_queue().status(key)
+    if status["state"] not in ("queued", "running"):
+        # Selesai / gagal: rerun penuh sekali agar tombol download ditampilkan
+        st.rerun()
+
+    if status["state"] == "queued":
+        st.progress(0.0, text="⏳ Menunggu antrian...")
+    else:
+        frac = status["done"] / status["total"] if status["total"] else 0.0
+        st.progress(frac, text=f"⏳ Memproses laporan... ({status['done']}/{status['total']})")
+
+
+def _export_bytes(make_chunks, fmt):
+    # download_button (data callable) hanya menerima str/bytes/file biner, bukan SpooledTemporaryFile
+    with write_export(make_chunks(), fmt) as out:
+        return out.read()
+
+
+def export_ui(make_chunks, filename_base, key):
+    """
+    Pilihan format + tombol unduh CSV/XLSX/Parquet. File baru ditulis saat
+    tombol diklik (`make_chunks()` menghasilkan potongan DataFrame), tanpa rerun.
+    """
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        fmt = st.selectbox(
+            "Format Ekspor",
+            list(EXPORT_FORMATS),
+            format_func=lambda f: EXPORT_FORMATS[f]["label"],
+            key=f"{key}_fmt",
+            label_visibility="collapsed",
+        )
+    with col2:
+        info = EXPORT_FORMATS[fmt]
+        st.download_button(
+            f"⬇️ Ekspor {info['label']}",
+            data=lambda: _export_bytes(make_chunks, fmt),
+            file_name=f"{filename_base}.{info['ext']}",
+            mime=info["mime"],
+            key=f"{key}_dl",
+            on_click="ignore",
+            use_container_width=True,
+        )
+
+
+def cohort_export_chunks(data):
+    """
+    Sumber ekspor seluruh nilai angkatan terfilter: dibaca per halaman dari
+    tabel scores (ditambah arsip angkatan saat filter "Semua").
+    """
+    df_users = data["df_users"]
+    students = df_users[df_users["role"] == "user"]
+    archived = data["archived"]
+    arsip_ids = set(archived[0]["id"]) if archived is not None and not archived[0].empty else set()
+    hot = [u for u in students.to_dict("records") if u["id"] not in arsip_ids]
+
+    def chunks():
+        yield from iter_cohort_scores(hot)
+        if arsip_ids:
+            yield from iter_archived_scores(archived[0], archived[1])
+
+    return chunks
+
+
+def filter_label():
+    filter_tahun = st.session_state.get("filter_tahun_aktif")
+    return "semua_angkatan" if filter_tahun == "Semua" else f"angkatan_{filter_tahun or datetime.date.today().year}"
+
+
+@st.dialog("Konfirmasi Update")
+def confirm_update_dialog(message, session_key):
+    st.write(message)
+    c1, c2 = st.columns(2)
+    if c1.button("Iya", use_container_width=True, type="primary"):
+        st.session_state[session_key] = True
+        st.rerun()
+    if c2.button("Tidak", use_container_width=True):
+        st.rerun()
+
+
+@st.dialog("Konfirmasi Hapus")
+def confirm_delete_dialog(message, session_key):
+    st.warning(message)
+    c1, c2 = st.columns(2)
+    if c1.button("Iya", use_container_width=True, type="primary"):
+        st.session_state[session_key] = True
+        st.rerun()
+    if c2.button("Tidak", use_container_width=True):
+        st.rerun()
+
+
+def admin_user_management():
+    st.header("👤 Kelola Pengguna")
+
+    tab1, tab2 = st.tabs(["👥 Kelola Akun", "📊 Kelola Nilai"])
+    
+    # Ambil semua user dan filter berdasarkan cohort di sidebar
+    all_users = fetch_all_users()
+    year_now = datetime.date.today().year
+    filter_tahun = st.session_state.get("filter_tahun_aktif")
+    if filter_tahun is None: filter_tahun = year_now
+    
+    if filter_tahun != "Semua":
+        users = [u for u in all_users if u.get("tahun_aktif") == filter_tahun]
+    else:
+        users = all_users
+
+    with tab1:
+        with st.container(border=True):
+            if users:
+                df = pd.DataFrame(users)
+                # Tampilkan nama, role, tahun masuk, dan tahun aktif
+                cols = [c for c in ["nama", "role", "tahun_masuk", "tahun_aktif"] if c in df.columns]
+                
+                # Rename columns for display
+                rename_map = {
+                    "nama": "Nama",
+                    "role": "Role",
+                    "tahun_masuk": "Thn Masuk",
+                    "tahun_aktif": "Thn Aktif"
+                }
+
+                st.subheader("Daftar User")
+                st.dataframe(
+                    df[cols].rename(columns=rename_map), 
+                    use_container_width=True, 
+                    hide_index=True
+                )
+            else:
+                st.info("Belum ada user di database.")
+
+        st.markdown("---")
+
+        # Edit user
+        _user_edit_section(users)
+
+        st.markdown("---")
+
+        # Hapus user
+        _user_delete_section(users)
+
+        st.markdown("---")
+
+        # Transmigrasi User
+        _user_transmigrasi_section(users)
+
+    with tab2:
+        # Input Nilai SKD User (Admin)
+        _score_input_section(users)
+
+        st.markdown("---")
+
+        # Impor Nilai Massal (CSV/XLSX)
+        _score_import_section()
+
+        st.markdown("---")
+
+        # Edit Nilai SKD User (Admin)
+        _score_edit_section(users)
+
+        st.markdown("---")
+
+        # Hapus Nilai SKD User (Admin)
+        _score_delete_section(users)
+
+
+# Setiap bagian form adalah fragment: memilih user/percobaan hanya menjalankan
+# ulang bagian itu (data user dari halaman dipakai ulang). Penyimpanan memanggil
+# st.rerun() penuh agar toast & data seluruh halaman ikut diperbarui.
+@st.fragment
+def _user_edit_section(users):
+    """Edit password/role user."""
+    with st.container(border=True):
+        st.subheader("Edit User")
+        if users:
+            nama_list = [u["nama"] for u in users]
+            nama_pilih = st.selectbox(
+                "Pilih User", 
+                nama_list, 
+                key="edit_user_select",
+                index=None if len(nama_list) > 4 or not nama_list else 0,
+                placeholder="Cari & pilih nama user..." if len(nama_list) > 4 else None
+            )
+
+            if nama_pilih:
+                user_pilih = next(u for u in users if u["nama"] == nama_pilih)
+                current_role = user_pilih.get("role", "user")
+
+                with st.form("edit_user"):
+                    new_password = st.text_input(
+                        "Password baru (kosongkan jika tidak diubah)", type="password"
+                    )
+                    new_role = st.selectbox(
+                        "Role",
+                        ["admin", "user"],
+                        index=0 if current_role == "admin" else 1,
+                    )
+
+                    submitted_edit = st.form_submit_button("Simpan Perubahan")
+
+                if submitted_edit:
+                    update_data = {"role": new_role}
+                    if new_password:
+                        password_hash = bcrypt.hashpw(
+                            new_password.encode("utf-8"), bcrypt.gensalt()
+                        ).decode("utf-8")
+                        update_data["password"] = password_hash
+
+                    st.session_state.pending_user_update = update_data
+                    confirm_update_dialog(f"Simpan perubahan untuk user {user_pilih['nama']}?", "do_update_user")
+
+                if st.session_state.get("do_update_user"):
+                    supabase.table("users").update(st.session_state.pending_user_update).eq(
+                        "id", user_pilih["id"]
+                    ).execute()
+                    sync_user_ranking(user_pilih["id"])
+                    st.session_state.toast_msg = "User berhasil diupdate"
+                    invalidate_data_cache(rebuild_weekly=False)
+                    del st.session_state.do_update_user
+                    del st.session_state.pending_user_update
+                    st.rerun()
+
+
+@st.fragment
+def _user_delete_section(users):
+    """Hapus akun user."""
+    with st.container(border=True):
+        st.subheader("Hapus User")
+        if users:
+            nama_list_hapus = [u["nama"] for u in users]
+            nama_hapus = st.selectbox(
+                "Pilih User untuk dihapus", 
+                nama_list_hapus, 
+                key="delete_user_select",
+                index=None if len(nama_list_hapus) > 4 or not nama_list_hapus else 0,
+                placeholder="Cari & pilih nama user..." if len(nama_list_hapus) > 4 else None
+            )
+
+            if nama_hapus:
+                user_hapus = next(u for u in users if u["nama"] == nama_hapus)
+
+                if st.button("Hapus User"):
+                    confirm_delete_dialog(f"Apakah Anda yakin ingin menghapus user {user_hapus['nama']}?", "do_delete_user")
+
+                if st.session_state.get("do_delete_user"):
+                    supabase.table("users").delete().eq("id", user_hapus["id"]).execute()
+                    sync_user_ranking(user_hapus["id"])
+                    st.session_state.toast_msg = "User berhasil dihapus"
+                    invalidate_data_cache()
+                    del st.session_state.do_delete_user
+                    st.rerun()
+
+
+@st.fragment
+def _user_transmigrasi_section(users):
+    """Pindahkan user (beberapa sekaligus atau satu angkatan penuh) ke angkatan baru."""
+    with st.container(border=True):
+        st.subheader("🚀 Transmigrasi User")
+        st.info("Pindahkan user ke angkatan baru tanpa menghapus data SKD lama.")
+
+        user_list_trans = [u for u in users if u.get("role") == "user"]
+        all_students = [u for u in fetch_all_users() if u.get("role") == "user"]
+
+        if user_list_trans or all_students:
+            mode = st.radio("Pilih Berdasarkan", ["Pilih User", "Satu Angkatan"], horizontal=True, key="trans_mode")
+            year_now = datetime.date.today().year
+
+            col_t1, col_t2 = st.columns(2)
+            with col_t1:
+                if mode == "Pilih User":
+                    nama_trans = st.multiselect(
+                        "Pilih User",
+                        [u["nama"] for u in user_list_trans],
+                        key="trans_user_select",
+                        placeholder="Cari & pilih nama user...",
+                    )
+                    targets = [u for u in user_list_trans if u["nama"] in nama_trans]
+                else:
+                    cohorts = sorted({u.get("tahun_aktif") for u in all_students if u.get("tahun_aktif") is not None})
+                    asal = st.selectbox("Angkatan Asal (tahun_aktif)", cohorts, key="trans_cohort_select")
+                    targets = [u for u in all_students if u.get("tahun_aktif") == asal]
+            with col_t2:
+                year_trans = st.selectbox("Tahun Transmigrasi", [year_now, year_now + 1], key="trans_year_select")
+
+            # Pratinjau: user yang sudah berada di angkatan tujuan tidak ikut diubah
+            targets = [u for u in targets if u.get("tahun_aktif") != year_trans]
+            if targets:
+                st.caption(f"{len(targets)} user akan dipindahkan ke angkatan {year_trans}.")
+                with st.expander("Lihat daftar user"):
+                    st.dataframe(
+                        pd.DataFrame(targets)[["nama", "tahun_aktif"]].rename(columns={"nama": "Nama", "tahun_aktif": "Angkatan Saat Ini"}),
+                        use_container_width=True,
+                        hide_index=True,
+                    )
+
+            if st.button("Transmigrasi User", use_container_width=True, type="primary", disabled=not targets):
+                st.session_state.pending_transmigrasi = {
+                    "ids": [u["id"] for u in targets],
+                    "asal": asal if mode == "Satu Angkatan" else None,
+                    "tahun": year_trans
+                }
+                confirm_update_dialog(
+                    f"Pindahkan {len(targets)} user ke angkatan {year_trans}?",
+                    "do_transmigrasi_user"
+                )
+
+            if st.session_state.get("do_transmigrasi_user"):
+                pt = st.session_state.pending_transmigrasi
+                payload = {"tahun_aktif": pt["tahun"], "tahun_transmigrasi": pt["tahun"]}
+                if pt["asal"] is not None:
+                    # Satu pernyataan UPDATE untuk seluruh angkatan
+                    query = supabase.table("users").update(payload).eq("role", "user").eq("tahun_aktif", pt["asal"])
+                    moved = getattr(query.execute(), "data", None)
+                else:
+                    # Filter id per ID_FILTER_BATCH agar URL tidak terlalu panjang (414)
+                    moved = []
+                    for start in range(0, len(pt["ids"]), ID_FILTER_BATCH):
+                        chunk = pt["ids"][start:start + ID_FILTER_BATCH]
+                        query = supabase.table("users").update(payload).in_("id", chunk)
+                        data = getattr(query.execute(), "data", None)
+                        moved.extend(chunk if data is None else data)
+                # Banyak user pindah angkatan: peringkat dibangun ulang saat dibutuhkan
+                get_cohort_ranking().invalidate()
+
+                jumlah = len(moved) if moved is not None else len(pt["ids"])
+                st.session_state.toast_msg = f"{jumlah} user berhasil dipindahkan ke angkatan {pt['tahun']}"
+                invalidate_data_cache(rebuild_weekly=False)
+                del st.session_state.do_transmigrasi_user
+                del st.session_state.pending_transmigrasi
+                st.rerun()
+        else:
+            st.info("Tidak ada user untuk ditransmigrasi.")
+
+
+@st.fragment
+def _score_input_section(users):
+    """Input nilai SKD untuk user."""
+    with st.container(border=True):
+        st.subheader("Input Nilai SKD User")
+        if users:
+            nama_list_input_score = [u["nama"] for u in users if u["role"] != "admin"]
+            if nama_list_input_score:
+                nama_pilih_input = st.selectbox(
+                    "Pilih User untuk input nilai", 
+                    nama_list_input_score, 
+                    key="admin_input_score_user",
+                    index=None if len(nama_list_input_score) > 4 or not nama_list_input_score else 0,
+                    placeholder="Cari & pilih nama user..." if len(nama_list_input_score) > 4 else None
+                )
+
+                if nama_pilih_input:
+                    user_pilih_input = next(u for u in users if u["nama"] == nama_pilih_input)
+
+                    with st.form("admin_input_nilai_form"):
+                        ai_twk = st.number_input("TWK", min_value=0, value=0)
+                        ai_tiu = st.number_input("TIU", min_value=0, value=0)
+                        ai_tkp = st.number_input("TKP", min_value=0, value=0)
+                        submitted_admin_input_score = st.form_submit_button("Simpan Nilai User")
+
+                    if submitted_admin_input_score:
+                        ai_total = ai_twk + ai_tiu + ai_tkp
+                        st.session_state.pending_admin_score_input = {
+                            "user_id": user_pilih_input["id"],
+                            "twk": ai_twk,
+                            "tiu": ai_tiu,
+                            "tkp": ai_tkp,
+                            "total": ai_total,
+                            "nama": nama_pilih_input
+                        }
+                        confirm_update_dialog(f"Simpan nilai untuk {nama_pilih_input}?", "do_input_admin_score")
+
+                    if st.session_state.get("do_input_admin_score"):
+                        ps_in = st.session_state.pending_admin_score_input
+                        supabase.table("scores").insert({
+                            "user_id": ps_in["user_id"],
+                            "twk": ps_in["twk"],
+                            "tiu": ps_in["tiu"],
+                            "tkp": ps_in["tkp"],
+                            "total": ps_in["total"]
+                        }).execute()
+
+                        sync_user_stats(ps_in["user_id"])
+                        st.session_state.toast_msg = f"Nilai {ps_in['nama']} berhasil disimpan"
+                        invalidate_data_cache(rebuild_weekly=False)
+                        del st.session_state.do_input_admin_score
+                        del st.session_state.pending_admin_score_input
+                        st.rerun()
+            else:
+                st.info("Belum ada user untuk diinput nilainya.")
+        else:
+            st.info("Belum ada user di database.")
+
+
+@st.fragment
+def _score_import_section():
+    """Impor nilai hasil tryout dari CSV/XLSX: pratinjau (dry run) lalu insert per batch."""
+    from score_import import SCORE_MAX, read_score_file, existing_score_counts, validate_scores, import_rows, insert_scores
+
+    with st.container(border=True):
+        st.subheader("📥 Impor Nilai Massal (CSV/XLSX)")
+        st.caption(
+            "Kolom wajib: nama, twk, tiu, tkp. Opsional: total, tanggal. "
+            f"Rentang nilai: TWK 0-{SCORE_MAX['twk']}, TIU 0-{SCORE_MAX['tiu']}, TKP 0-{SCORE_MAX['tkp']}."
+        )
+        st.download_button(
+            "Unduh Template CSV",
+            data="nama,twk,tiu,tkp,tanggal\n",
+            file_name="template_impor_nilai.csv",
+            mime="text/csv",
+            key="dl_import_template",
+        )
+
+        result = st.session_state.pop("score_import_result", None)
+        if result:
+            failed = [r for r in result if r["error"]]
+            st.success(f"{sum(r['ok'] for r in result)} nilai berhasil diimpor dalam {len(result)} batch.")
+            if failed:
+                st.error(f"{len(failed)} batch gagal:")
+                st.dataframe(pd.DataFrame(failed), use_container_width=True, hide_index=True)
+
+        # Key uploader diganti setelah impor agar file yang sama tidak terimpor dua kali
+        upload_key = f"score_import_file_{st.session_state.get('score_import_nonce', 0)}"
+        uploaded = st.file_uploader("Pilih file", type=["csv", "xlsx"], key=upload_key)
+        if not uploaded:
+            return
+
+        try:
+            raw = read_score_file(uploaded.getvalue(), uploaded.name)
+        except ImportError:
+            st.error("Membaca XLSX membutuhkan paket openpyxl (pip install openpyxl).")
+            return
+        except Exception as e:
+            st.error(f"File tidak dapat dibaca: {e}")
+            return
+
+        # Hitung per halaman: fetch_all_scores() terpotong max-rows pada tabel besar
+        preview = validate_scores(raw, fetch_all_users(), existing_score_counts())
+        valid = int((preview["status"] == "Baru").sum())
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Baris File", len(preview))
+        with col2:
+            st.metric("Siap Diimpor", valid)
+        with col3:
+            st.metric("Error", len(preview) - valid)
+
+        st.markdown("**Pratinjau (belum disimpan)**")
+        cols = ["baris", "nama", "angkatan", "skd_ke", "twk", "tiu", "tkp", "total", "status", "keterangan"]
+        st.dataframe(preview[cols], use_container_width=True, hide_index=True)
+
+        if valid and st.button(f"Impor {valid} Nilai", key="btn_score_import"):
+            confirm_update_dialog(f"Impor {valid} nilai? Baris error akan dilewati.", "do_score_import")
+
+        if st.session_state.get("do_score_import"):
+            del st.session_state.do_score_import
+            rows = import_rows(preview)
+            bar = st.progress(0.0, text="Mengimpor nilai...")
+            result = insert_scores(rows, progress=lambda done, total: bar.progress(done / total, text=f"Mengimpor {done}/{total}..."))
+
+            imported = [r["user_id"] for r in rows]
+            try:
+                refresh_stats_for_users(imported)
+            except Exception as e:
+                st.warning(f"Statistik user belum diperbarui ({e}). Jalankan `python stats.py rebuild`.")
+            # Banyak user berubah sekaligus: peringkat dibangun ulang saat dibutuhkan
+            get_cohort_ranking().invalidate()
+
+            st.session_state.score_import_result = result
+            st.session_state.score_import_nonce = st.session_state.get("score_import_nonce", 0) + 1
+            st.session_state.toast_msg = "Impor nilai selesai"
+            # Nilai bertanggal lampau tidak masuk snapshot inkremental -> bangun ulang
+            invalidate_data_cache(rebuild_weekly=any("created_at" in r for r in rows))
+            st.rerun()
+
+
+@st.fragment
+def _score_edit_section(users):
+    """Edit nilai SKD user per percobaan."""
+    with st.container(border=True):
+        st.subheader("Edit Nilai SKD User")
+        if users:
+            nama_list_score = [u["nama"] for u in users if u["role"] != "admin"]
+            if nama_list_score:
+                nama_pilih_score = st.selectbox(
+                    "Pilih User untuk diedit nilainya", 
+                    nama_list_score, 
+                    key="admin_edit_score_user",
+                    index=None if len(nama_list_score) > 4 or not nama_list_score else 0,
+                    placeholder="Cari & pilih nama user..." if len(nama_list_score) > 4 else None
+                )
+
+                if nama_pilih_score:
+                    user_pilih_score = next(u for u in users if u["nama"] == nama_pilih_score)
+                    user_scores = fetch_user_scores(user_pilih_score["id"])
+
+                    if user_scores:
+                        df_user_scores = pd.DataFrame(user_scores)
+                        if "created_at" in df_user_scores.columns:
+                            df_user_scores = df_user_scores.sort_values("created_at")
+                        df_user_scores["skd_ke"] = range(1, len(df_user_scores) + 1)
+
+                        edit_options_admin = [f"SKD ke-{row['skd_ke']}" for _, row in df_user_scores.iterrows()]
+                        pilih_skd_admin = st.selectbox(
+                            "Pilih Percobaan (Minggu)", 
+                            edit_options_admin, 
+                            key="admin_edit_score_week",
+                            index=None if len(edit_options_admin) > 4 else 0,
+                            placeholder="Cari & pilih SKD..." if len(edit_options_admin) > 4 else None
+                        )
+
+                        if pilih_skd_admin:
+                            idx_pilih_admin = int(pilih_skd_admin.split("-")[-1])
+                            data_pilih_admin = df_user_scores[df_user_scores["skd_ke"] == idx_pilih_admin].iloc[0]
+
+                            with st.form("admin_edit_nilai_form"):
+                                ae_twk = st.number_input("Update TWK", min_value=0, value=int(data_pilih_admin["twk"]))
+                                ae_tiu = st.number_input("Update TIU", min_value=0, value=int(data_pilih_admin["tiu"]))
+                                ae_tkp = st.number_input("Update TKP", min_value=0, value=int(data_pilih_admin["tkp"]))
+                                submitted_admin_edit_score = st.form_submit_button("Simpan Perubahan Nilai User")
+
+                            if submitted_admin_edit_score:
+                                ae_total = ae_twk + ae_tiu + ae_tkp
+                                st.session_state.pending_admin_score_edit = {
+                                    "twk": ae_twk,
+                                    "tiu": ae_tiu,
+                                    "tkp": ae_tkp,
+                                    "total": ae_total,
+                                    "id": data_pilih_admin["id"],
+                                    "nama": nama_pilih_score,
+                                    "pilih_skd": pilih_skd_admin
+                                }
+                                confirm_update_dialog(f"Simpan perubahan nilai untuk {nama_pilih_score} ({pilih_skd_admin})?", "do_update_admin_score")
+
+                            if st.session_state.get("do_update_admin_score"):
+                                ps = st.session_state.pending_admin_score_edit
+                                supabase.table("scores").update({
+                                    "twk": ps["twk"],
+                                    "tiu": ps["tiu"],
+                                    "tkp": ps["tkp"],
+                                    "total": ps["total"]
+                                }).eq("id", ps["id"]).execute()
+
+                                sync_user_stats(user_pilih_score["id"])
+                                st.session_state.toast_msg = f"Nilai {ps['nama']} berhasil diperbarui"
+                                invalidate_data_cache()
+                                del st.session_state.do_update_admin_score
+                                del st.session_state.pending_admin_score_edit
+                                st.rerun()
+                    else:
+                        st.info("User ini belum memiliki riwayat nilai.")
+            else:
+                st.info("Belum ada user untuk diedit nilainya.")
+
+
+@st.fragment
+def _score_delete_section(users):
+    """Hapus nilai SKD user per percobaan."""
+    with st.container(border=True):
+        st.subheader("Hapus Nilai SKD User")
+        if users:
+            nama_list_del_score = [u["nama"] for u in users if u["role"] != "admin"]
+            if nama_list_del_score:
+                nama_pilih_del_score = st.selectbox(
+                    "Pilih User untuk dihapus nilainya", 
+                    nama_list_del_score, 
+                    key="admin_delete_score_user",
+                    index=None if len(nama_list_del_score) > 4 or not nama_list_del_score else 0,
+                    placeholder="Cari & pilih nama user..." if len(nama_list_del_score) > 4 else None
+                )
+
+                if nama_pilih_del_score:
+                    user_pilih_del_score = next(u for u in users if u["nama"] == nama_pilih_del_score)
+                    user_scores = fetch_user_scores(user_pilih_del_score["id"])
+
+                    if user_scores:
+                        df_user_scores_del = pd.DataFrame(user_scores)
+                        if "created_at" in df_user_scores_del.columns:
+                            df_user_scores_del = df_user_scores_del.sort_values("created_at")
+                        df_user_scores_del["skd_ke"] = range(1, len(df_user_scores_del) + 1)
+
+                        del_options_admin = [f"SKD ke-{row['skd_ke']}" for _, row in df_user_scores_del.iterrows()]
+                        pilih_skd_del_admin = st.selectbox(
+                            "Pilih Percobaan yang akan dihapus", 
+                            del_options_admin, 
+                            key="admin_delete_score_week",
+                            index=None if len(del_options_admin) > 4 else 0,
+                            placeholder="Cari & pilih SKD..." if len(del_options_admin) > 4 else None
+                        )
+
+                        if pilih_skd_del_admin:
+                            idx_pilih_del_admin = int(pilih_skd_del_admin.split("-")[-1])
+                            data_pilih_del_admin = df_user_scores_del[df_user_scores_del["skd_ke"] == idx_pilih_del_admin].iloc[0]
+
+                            if st.button(f"Hapus {pilih_skd_del_admin} untuk {nama_pilih_del_score}", key="btn_del_score"):
+                                confirm_delete_dialog(f"Hapus {pilih_skd_del_admin} untuk {nama_pilih_del_score}?", "do_delete_admin_score")
+
+                            if st.session_state.get("do_delete_admin_score"):
+                                supabase.table("scores").delete().eq("id", data_pilih_del_admin["id"]).execute()
+                                sync_user_stats(user_pilih_del_score["id"])
+                                st.session_state.toast_msg = f"Nilai {pilih_skd_del_admin} untuk {nama_pilih_del_score} berhasil dihapus"
+                                invalidate_data_cache()
+                                del st.session_state.do_delete_admin_score
+                                st.rerun()
+                    else:
+                        st.info("User ini belum memiliki riwayat nilai.")
+            else:
+                st.info("Belum ada user untuk dihapus nilainya.")
+
+
+def user_self_page(user: dict):
+    st.header("📑 Profil & Nilai Saya")
+    
+    tab1, tab2 = st.tabs(["📊 Kelola Nilai", "👥 Kelola Akun"])
+    
+    with tab1:
+        with st.container(border=True):
+            st.write(f"Nama: **{user.get('nama')}**")
+            st.write(f"Role: **{user.get('role', 'user')}**")
+            # Tampilkan informasi angkatan
+            col1, col2 = st.columns(2)
+            with col1:
+                st.write(f"Tahun Masuk: **{user.get('tahun_masuk', '-')}**")
+            with col2:
+                st.write(f"Tahun Aktif: **{user.get('tahun_aktif', '-')}**")
+
+        st.markdown("---")
+        
+        with st.container(border=True):
+            st.subheader("Input Nilai SKD")
+
+            latest = fetch_latest_score(user["id"])
+            current_twk = (latest or {}).get("twk") or 0
+            current_tiu = (latest or {}).get("tiu") or 0
+            current_tkp = (latest or {}).get("tkp") or 0
+
+            with st.form("update_nilai_saya"):
+                twk = st.number_input("TWK", min_value=0, value=int(current_twk))
+                tiu = st.number_input("TIU", min_value=0, value=int(current_tiu))
+                tkp = st.number_input("TKP", min_value=0, value=int(current_tkp))
+                submitted_nilai = st.form_submit_button("Simpan Nilai")
+
+        if submitted_nilai:
+            total = twk + tiu + tkp
+            try:
+                # Simpan sebagai percobaan baru di tabel scores
+                supabase.table("scores").insert(
+                    {
+                        "user_id": user["id"],
+                        "twk": twk,
+                        "tiu": tiu,
+                        "tkp": tkp,
+                        "total": total,
+                    }
+                ).execute()
+
+                # update juga di session supaya tampilan langsung ikut berubah
+                user.update({"twk": twk, "tiu": tiu, "tkp": tkp, "total": total})
+                st.session_state.user = user
+
+                sync_user_stats(user["id"])
+                st.session_state.toast_msg = "Nilai berhasil disimpan"
+                invalidate_data_cache(rebuild_weekly=False)
+                st.rerun()
+            except Exception as e:
+                error_msg = str(e)
+                if "23502" in error_msg or "violates not-null constraint" in error_msg:
+                    st.error("Gagal menyimpan: Konfigurasi Database (ID Default) belum diset di Supabase. Silakan periksa tabel 'scores'.")
+                else:
+                    st.error(f"Gagal menyimpan nilai: {e}")
+
+        st.markdown("---")
+
+        scores = fetch_user_scores(user["id"])
+        if scores:
+            df_scores = pd.DataFrame(scores)
+            if "created_at" in df_scores.columns:
+                df_scores = df_scores.sort_values("created_at")
+            df_scores["skd_ke"] = range(1, len(df_scores) + 1)
+            
+            with st.container(border=True):
+                # Tampilkan riwayat
+                st.subheader("Riwayat Nilai SKD")
+                cols = [c for c in ["skd_ke", "twk", "tiu", "tkp", "total"] if c in df_scores.columns]
+                st.dataframe(df_scores[cols], use_container_width=True, hide_index=True)
+
+            st.markdown("---")
+            with st.container(border=True):
+                st.subheader("Edit Nilai Percobaan (SKD ke-n)")
+                
+                edit_options = [f"SKD ke-{row['skd_ke']}" for _, row in df_scores.iterrows()]
+                pilih_edit = st.selectbox(
+                    "Pilih Percobaan yang Ingin Diubah", 
+                    edit_options,
+                    index=None if len(edit_options) > 4 else 0,
+                    placeholder="Cari & pilih SKD..." if len(edit_options) > 4 else None
+                )
+                
+                if pilih_edit:
+                    idx_pilih = int(pilih_edit.split("-")[-1])
+                    data_pilih = df_scores[df_scores["skd_ke"] == idx_pilih].iloc[0]
+
+                    with st.form("edit_nilai_user"):
+                        e_twk = st.number_input("Update TWK", min_value=0, value=int(data_pilih["twk"]))
+                        e_tiu = st.number_input("Update TIU", min_value=0, value=int(data_pilih["tiu"]))
+                        e_tkp = st.number_input("Update TKP", min_value=0, value=int(data_pilih["tkp"]))
+                        submitted_edit_score = st.form_submit_button("Simpan Perubahan Nilai")
+
+                    if submitted_edit_score:
+                        e_total = e_twk + e_tiu + e_tkp
+                        st.session_state.pending_user_score_edit = {
+                            "twk": e_twk,
+                            "tiu": e_tiu,
+                            "tkp": e_tkp,
+                            "total": e_total,
+                            "id": data_pilih["id"],
+                            "pilih_edit": pilih_edit
+                        }
+                        confirm_update_dialog(f"Simpan perubahan untuk {pilih_edit}?", "do_update_user_score")
+
+                    if st.session_state.get("do_update_user_score"):
+                        pus = st.session_state.pending_user_score_edit
+                        supabase.table("scores").update({
+                            "twk": pus["twk"],
+                            "tiu": pus["tiu"],
+                            "tkp": pus["tkp"],
+                            "total": pus["total"]
+                        }).eq("id", pus["id"]).execute()
+                        
+                        sync_user_stats(user["id"])
+                        st.session_state.toast_msg = f"Berhasil memperbarui {pus['pilih_edit']}"
+                        invalidate_data_cache()
+                        del st.session_state.do_update_user_score
+                        del st.session_state.pending_user_score_edit
+                        st.rerun()
+
+        else:
+            st.info("Belum ada riwayat nilai. Silakan input nilai pertama Anda.")
+
+    with tab2:
+        with st.container(border=True):
+            st.write(f"Nama: **{user.get('nama')}**")
+            st.write(f"Role: **{user.get('role', 'user')}**")
+            # Tampilkan informasi angkatan
+            col1, col2 = st.columns(2)
+            with col1:
+                st.write(f"Tahun Masuk: **{user.get('tahun_masuk', '-')}**")
+            with col2:
+                st.write(f"Tahun Aktif: **{user.get('tahun_aktif', '-')}**")
+
+        st.markdown("---")
+        
+        # Edit Password
+        with st.container(border=True):
+            st.subheader("Edit Password")
+            with st.form("user_edit_pass"):
+                new_password = st.text_input("Password baru (kosongkan jika tidak diubah)", type="password")
+                submitted_pass = st.form_submit_button("Simpan Perubahan Password")
+            
+            if submitted_pass:
+                if new_password:
+                    password_hash = bcrypt.hashpw(
+                        new_password.encode("utf-8"), bcrypt.gensalt()
+                    ).decode("utf-8")
+                    st.session_state.pending_password_update = password_hash
+                    confirm_update_dialog("Apakah Anda yakin ingin mengubah password?", "do_update_password")
+                else:
+                    st.info("Masukkan password baru jika ingin mengubah.")
+
+            if st.session_state.get("do_update_password"):
+                supabase.table("users").update({"password": st.session_state.pending_password_update}).eq("id", user["id"]).execute()
+                st.session_state.toast_msg = "Password berhasil diupdate"
+                del st.session_state.do_update_password
+                del st.session_state.pending_password_update
+                st.rerun()
+
+
+def prepare_admin_users():
+    """User sesuai filter angkatan + jumlah user/admin (tanpa memuat riwayat nilai)."""
+    users = fetch_all_users()
+    if not users:
+        return None
+
+    df_users = pd.DataFrame(users)
+    if "role" not in df_users.columns:
+        df_users["role"] = "user"
+    
+    # Hitung total admin secara global (sebelum filter tahun)
+    total_admin = len(df_users[df_users["role"] == "admin"])
+    
+    # Apply Global Filter Tahun Aktif
+    year_now = datetime.date.today().year
+    filter_tahun = st.session_state.get("filter_tahun_aktif")
+    if filter_tahun is None: filter_tahun = year_now
+    
+    archived = None
+    if filter_tahun != "Semua":
+        if "tahun_aktif" in df_users.columns:
+            df_users = df_users[df_users["tahun_aktif"] == filter_tahun].copy()
+    else:
+        # "Semua" juga mencakup angkatan lama yang sudah dipindah ke arsip
+        archived = fetch_archived_cohorts()
+        if archived is not None and not archived[0].empty:
+            df_users = pd.concat([df_users, archived[0]], ignore_index=True)
+        
+    total_user = len(df_users[df_users["role"] == "user"])
+    return {
+        "df_users": df_users,
+        "total_user": total_user,
+        "total_admin": total_admin,
+        "archived": archived,
+    }
+
+
+@timed("prepare_admin_data")
+def prepare_admin_data():
+    """Mengambil dan menyiapkan data untuk dashboard admin."""
+    data = prepare_admin_users()
+    if not data:
+        return None
+
+    df_users = data["df_users"]
+    scores = fetch_all_scores()
+    if data["archived"] is not None and not data["archived"][1].empty:
+        scores = scores + data["archived"][1].to_dict("records")
+
+    df = pd.DataFrame()
+    if scores:
+        df_scores = pd.DataFrame(scores)
+        for col in ["twk", "tiu", "tkp"]:
+            if col not in df_scores.columns:
+                df_scores[col] = 0
+            df_scores[col] = pd.to_numeric(df_scores[col], errors="coerce").fillna(0)
+        
+        df_scores["total"] = df_scores["twk"].astype(float) + df_scores["tiu"].astype(float) + df_scores["tkp"].astype(float)
+
+        # Tambahkan kolom tahun ke merge agar data bisa di-filter
+        user_cols = ["id", "nama", "role", "tahun_aktif", "tahun_masuk", "tahun_transmigrasi"]
+        existing_cols = [c for c in user_cols if c in df_users.columns]
+        
+        df = pd.merge(
+            df_scores,
+            df_users[existing_cols],
+            left_on="user_id",
+            right_on="id",
+            how="inner"
+        )
+
+        if "role" in df.columns:
+            df = df[df["role"] != "admin"]
+
+        if not df.empty:
+            if "created_at" in df.columns:
+                df = df.sort_values(["user_id", "created_at"])
+            else:
+                df = df.sort_values(["user_id"])
+            
+            df["skd_ke"] = df.groupby("user_id").cumcount() + 1
+            
+    return {
+        **data,
+        "scores": scores,
+        "df": df
+    }
+
+
+def admin_dashboard_summary():
+    st.header("📈 Beranda")
+    data = prepare_admin_users()
+    if not data:
+        st.info("Belum ada data user.")
+        return
+
+    df_users = data["df_users"]
+    total_user = data["total_user"]
+    total_admin = data["total_admin"]
+
+    # Satu baris ringkas per user dari user_stats; hitung dari riwayat hanya jika belum tersedia
+    stats = fetch_all_user_stats()
+    if stats is not None:
+        score_summary = pd.DataFrame(
+            [{"user_id": uid, "total_skd": s["attempt_count"], "max_score": s["best_total"]} for uid, s in stats.items()],
+            columns=["user_id", "total_skd", "max_score"]
+        )
+        # Angkatan di arsip tidak punya baris user_stats -> ringkas dari nilai arsip
+        archived = data["archived"]
+        if archived is not None and not archived[1].empty:
+            arsip = archived[1].assign(total=archived[1][["twk", "tiu", "tkp"]].fillna(0).sum(axis=1))
+            arsip_summary = arsip.groupby("user_id").agg(
+                total_skd=("total", "size"),
+                max_score=("total", "max")
+            ).reset_index()
+            score_summary = pd.concat([score_summary, arsip_summary], ignore_index=True)
+    else:
+        df = prepare_admin_data()["df"]
+        score_summary = pd.DataFrame(columns=["user_id", "total_skd", "max_score"])
+        if not df.empty:
+            score_summary = df.groupby("user_id").agg(
+                total_skd=("skd_ke", "max"),
+                max_score=("total", "max")
+            ).reset_index()
+
+    # --- Tabel Ringkasan Aktivitas User ---
+    user_summary_df = df_users[df_users["role"] == "user"][["id", "nama"]].merge(
+        score_summary, left_on="id", right_on="user_id", how="left"
+    )
+    user_summary_df["total_skd"] = user_summary_df["total_skd"].fillna(0).astype(int)
+    user_summary_df["max_score"] = user_summary_df["max_score"].fillna(0).astype(int)
+    total_skd_max = int(user_summary_df["total_skd"].max()) if not user_summary_df.empty else 0
+    ranking = cohort_ranking()
+    posisi = [ranking.position(uid) if ranking else None for uid in user_summary_df["id"]]
+    user_summary_df["peringkat"] = [p["peringkat"] if p else None for p in posisi]
+    user_summary_df["persentil"] = [p["persentil"] if p else None for p in posisi]
+    user_summary_df = user_summary_df[["nama", "total_skd", "max_score", "peringkat", "persentil"]].sort_values("max_score", ascending=False)
+    user_summary_df.columns = ["Nama User", "Total SKD", "Nilai Tertinggi", "Peringkat Terakhir", "Persentil"]
+
+    # --- Bagian Metrics Atas ---
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        with st.container(border=True):
+            st.metric("Total User", total_user)
+    with col2:
+        with st.container(border=True):
+            st.metric("Total Admin", total_admin)
+    with col3:
+        with st.container(border=True):
+            st.metric("SKD Terbanyak", total_skd_max)
+    
+    with st.container(border=True):
+        st.subheader("📊 Ringkasan Aktivitas User")
+        st.dataframe(user_summary_df, use_container_width=True, hide_index=True)
+        export_ui(lambda: iter_frame(user_summary_df), f"ringkasan_user_{filter_label()}", key="export_summary")
+
+
+def admin_grafik_nilai():
+    st.header("📊 Visualisasi Data")
+    data = prepare_admin_data()
+    if not data:
+        st.info("Belum ada data user.")
+        return
+    
+    scores = data["scores"]
+    df = data["df"]
+
+    if not scores:
+        st.info("Belum ada data nilai (scores) di database.")
+        return
+
+    if df.empty:
+        st.warning("Tidak ada data nilai dari user (non-admin).")
+        return
+
+    rules = passing_rules()
+    df = evaluate_passing_grade(df, rules)
+    passing_grade_summary(df, rules)
+
+    with st.container(border=True):
+        st.subheader("📤 Ekspor Semua Nilai")
+        st.caption("Seluruh riwayat nilai user pada filter angkatan aktif, dibaca bertahap dari database.")
+        export_ui(cohort_export_chunks(data), f"nilai_{filter_label()}", key="export_cohort")
+
+    _grafik_nilai_section(df)
+
+
+def passing_grade_summary(df, rules):
+    """Ringkasan kelulusan passing grade per angkatan dan per percobaan."""
+    with st.container(border=True):
+        st.subheader("🎯 Passing Grade")
+        default = rules["default"]
+        st.caption(
+            f"Batas minimum: TWK {default['twk']:g}, TIU {default['tiu']:g}, TKP {default['tkp']:g}"
+            + (f", Total {default['total']:g}" if default["total"] else "")
+            + (f" (aturan khusus tahun {', '.join(str(y) for y in rules if y != 'default')})" if len(rules) > 1 else "")
+        )
+
+        latest = df.groupby("user_id").tail(1)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Lulus (Percobaan Terakhir)", f"{int(latest['lulus'].sum())}/{len(latest)}")
+        with col2:
+            st.metric("Tingkat Lulus Terakhir", f"{latest['lulus'].mean() * 100:.1f}%")
+        with col3:
+            st.metric("Tingkat Lulus Semua Percobaan", f"{df['lulus'].mean() * 100:.1f}%")
+
+        col_a, col_b = st.columns(2)
+        with col_a:
+            if "tahun_aktif" in df.columns:
+                per_angkatan = pass_rates(df, "tahun_aktif")
+                per_angkatan.columns = ["Angkatan", "Percobaan", "Lulus", "% Lulus"]
+                st.dataframe(per_angkatan, use_container_width=True, hide_index=True)
+        with col_b:
+            per_skd = pass_rates(df, "skd_ke")
+            per_skd.columns = ["SKD ke-", "Percobaan", "Lulus", "% Lulus"]
+            st.dataframe(per_skd, use_container_width=True, hide_index=True)
+
+
+@st.fragment
+def _grafik_nilai_section(df):
+    """
+    Filter user/percobaan/waktu + tabel & grafik. Fragment: perubahan filter
+    hanya menjalankan ulang bagian ini dengan data yang sudah dimuat.
+    """
+    # Filter Pilihan User
+    user_list = ["Semua User"] + sorted(df["nama"].unique().tolist())
+    pilih_user = st.selectbox(
+        "Pilih User", 
+        user_list,
+        index=None if len(user_list) > 4 else 0,
+        placeholder="Cari & pilih nama user..." if len(user_list) > 4 else None
+    )
+
+    if not pilih_user:
+        st.info("Silakan pilih user untuk melihat grafik.")
+        return
+
+    if pilih_user != "Semua User":
+        max_skd = int(df[df["nama"] == pilih_user]["skd_ke"].max()) if not df.empty else 0
+    else:
+        max_skd = int(df["skd_ke"].max()) if not df.empty else 0
+
+    options = ["Terakhir", "Semua", "Rentang"] + [f"SKD ke-{i}" for i in range(1, max_skd + 1)]
+    
+    default_skd_idx = 1 if pilih_user != "Semua User" else 0
+    pilih_skd = st.selectbox(
+        "Pilih Percobaan SKD (Attempt)", 
+        options, 
+        index=None if len(options) > 4 else default_skd_idx,
+        placeholder="Cari & pilih percobaan..." if len(options) > 4 else None
+    )
+
+    if not pilih_skd:
+        return
+
+    if pilih_user != "Semua User":
+        df = df[df["nama"] == pilih_user]
+
+    # Main Filtering for UI Display
+    if pilih_skd == "Rentang":
+        st.markdown("### 🔍 Filter Rentang")
+        col_r1, col_r2 = st.columns(2)
+        with col_r1:
+            r_dari = st.number_input("Dari SKD ke-", min_value=1, max_value=max_skd, value=1, key="admin_r_dari")
+        with col_r2:
+            r_sampai = st.number_input("Sampai SKD ke-", min_value=r_dari, max_value=max_skd, value=max_skd, key="admin_r_sampai")
+
+        filtered = df[(df["skd_ke"] >= r_dari) & (df["skd_ke"] <= r_sampai)].copy()
+        filtered = filtered.sort_values(["skd_ke", "nama"])
+        st.subheader(f"Data SKD Rentang ke-{r_dari} sampai {r_sampai}")
+    elif pilih_skd == "Terakhir":
+        show_this_week = st.radio("Filter Waktu:", ["Semua", "Minggu Ini"], horizontal=True, key="admin_grafik_time_filter")
+        
+        if show_this_week == "Minggu Ini":
+            filtered = weekly_latest_scores(df)
+        elif "created_at" in df.columns:
+            filtered = df.sort_values("created_at").groupby("user_id").tail(1).copy()
+        else:
+            filtered = df.groupby("user_id").tail(1).copy()
+            
+        st.subheader("Data SKD Terakhir Setiap User" + (" (Minggu Ini)" if show_this_week == "Minggu Ini" else ""))
+    elif pilih_skd == "Semua":
+        filtered = df.copy()
+        filtered = filtered.sort_values(["skd_ke", "nama"])
+        st.subheader("Semua Riwayat Data SKD")
+    else:
+        try:
+            n = int(pilih_skd.split("-")[-1])
+            filtered = df[df["skd_ke"] == n].copy()
+            st.subheader(f"Data SKD Percobaan ke-{n}")
+        except:
+            filtered = df.copy()
+
+    if filtered.empty:
+        st.warning(f"Tidak ada data for filter: {pilih_skd}")
+        return
+
+    # Pastikan filtered adalah copy untuk menghindari SettingWithCopyWarning
+    filtered = filtered.copy()
+
+    # Label for UI Chart
+    if pilih_skd in ["Semua", "Rentang"]:
+        if pilih_user == "Semua User":
+            filtered["label"] = filtered["nama"] + " (SKD " + filtered["skd_ke"].astype(str) + ")"
+        else:
+            filtered["label"] = "SKD ke-" + filtered["skd_ke"].astype(str)
+    else:
+        filtered["label"] = filtered["nama"]
+
+    # Snapshot "Minggu Ini" belum membawa kolom passing grade
+    if "lulus" not in filtered.columns:
+        filtered = evaluate_passing_grade(filtered)
+    filtered["status"] = filtered["lulus"].map({True: "Lulus", False: "Tidak Lulus"})
+
+    # Tampilkan Tabel UI
+    with st.container(border=True):
+        st.subheader("Data Riwayat SKD")
+        cols_to_show = ["nama", "skd_ke", "twk", "tiu", "tkp", "total", "status", "margin"]
+        st.dataframe(filtered[cols_to_show], use_container_width=True, hide_index=True)
+        view = filtered[cols_to_show]
+        export_ui(lambda: iter_frame(view), f"data_skd_{pilih_user}_{pilih_skd}".replace(" ", "_").lower(), key="export_grafik")
+
+    # Riwayat banyak user: default heatmap agar ukuran grafik tidak tumbuh per baris
+    tampilan = "Garis"
+    if pilih_user == "Semua User" and pilih_skd in ["Semua", "Rentang"]:
+        tampilan = st.radio(
+            "Tampilan Grafik:",
+            ["Heatmap", "Small Multiples", "Garis"],
+            horizontal=True,
+            key="admin_grafik_view"
+        )
+
+    # Riwayat satu user berurutan per percobaan -> boleh disederhanakan (LTTB)
+    max_points = None
+    if pilih_user != "Semua User" and pilih_skd in ["Semua", "Rentang"]:
+        max_points = downsample_option(len(filtered), key="admin_grafik_downsample")
+
+    with st.container(border=True):
+        st.subheader("Grafik Komponen Nilai")
+        _render_history_chart(filtered, f"Komponen Nilai SKD ({pilih_skd})", tampilan, is_component=True, max_points=max_points)
+
+    with st.container(border=True):
+        st.subheader("Grafik Total Nilai")
+        _render_history_chart(filtered, f"Total Nilai SKD ({pilih_skd})", tampilan, is_component=False, max_points=max_points)
+
+
+@timed("render_history_chart")
+def _render_history_chart(df, title, tampilan, is_component=True, max_points=None):
+    """Tampilkan grafik riwayat sesuai mode tampilan (Garis / Heatmap / Small Multiples)."""
+    if tampilan == "Heatmap":
+        data, spec = skd_heatmap_chart(df, title, is_component=is_component)
+    elif tampilan == "Small Multiples":
+        data, spec, hidden = skd_small_multiples_chart(df, title, is_component=is_component)
+        if hidden:
+            st.caption(f"Menampilkan {SMALL_MULTIPLES_MAX} user pertama ({hidden} user lainnya tidak ditampilkan).")
+    else:
+        render_skd_chart(df, title, is_component=is_component, max_points=max_points)
+        return
+    if spec is not None:
+        st.vega_lite_chart(data, spec, use_container_width=True)
+
+
+def render_laporan_page(user, role):
+    """Halaman Laporan dan Cetak khusus untuk download file laporan A4."""
+    st.header("🖨️ Cetak Laporan")
+    
+    if role == "admin":
+        data = prepare_admin_data()
+        if not data:
+            st.info("Belum ada data user.")
+            return
+
+        if data["df"].empty:
+            st.warning("Tidak ada data nilai user untuk dibuat laporan.")
+        else:
+            df = data["df"]
+            user_list = ["Semua User", BATCH_REPORT_OPTION] + sorted(df["nama"].unique().tolist())
+            pilih_user_rep = st.selectbox(
+                "Pilih User untuk Laporan", 
+                user_list,
+                index=None if len(user_list) > 4 else 0,
+                placeholder="Cari & pilih nama user..." if len(user_list) > 4 else None
+            )
+            
+            if not pilih_user_rep:
+                st.info("Silakan pilih user untuk membuat laporan.")
+                return
+
+            if pilih_user_rep == "Semua User":
+                _render_all_users_report_ui(df)
+            elif pilih_user_rep == BATCH_REPORT_OPTION:
+                _render_batch_report_ui(df)
+            else:
+                df_target = df[df["nama"] == pilih_user_rep].copy()
+                _render_individual_report_ui(df_target, pilih_user_rep)
+    else:
+        scores = fetch_user_scores(user["id"])
+        if not scores:
+            st.info("Belum ada data nilai. Silakan input nilai terlebih dahulu di menu Profil.")
+            return
+        df_target = pd.DataFrame(scores)
+        if "created_at" in df_target.columns:
+            df_target = df_target.sort_values("created_at")
+        df_target["skd_ke"] = range(1, len(df_target) + 1)
+        pilih_user_rep = user.get("nama")
+        _render_individual_report_ui(df_target, pilih_user_rep)
+
+
+@st.fragment
+def _render_all_users_report_ui(df_all):
+    """Helper untuk menampilkan UI laporan untuk semua user per SKD."""
+    st.subheader("📊 Laporan Semua User")
+    
+    max_skd_global = int(df_all["skd_ke"].max())
+    skd_options = [f"SKD ke-{i}" for i in range(1, max_skd_global + 1)] + ["SKD Terakhir"]
+    
+    pilih_skd = st.selectbox(
+        "Pilih Percobaan SKD", 
+        skd_options, 
+        index=None if len(skd_options) > 4 else len(skd_options)-1,
+        placeholder="Cari & pilih percobaan..." if len(skd_options) > 4 else None
+    )
+    
+    if not pilih_skd:
+        return
+
+    if pilih_skd == "SKD Terakhir":
+        show_this_week_rep = st.radio("Filter Waktu:", ["Semua", "Minggu Ini"], horizontal=True, key="admin_time_filter_rep")
+        
+        time_suffix = ""
+        file_suffix = ""
+        if show_this_week_rep == "Minggu Ini":
+            report_df = weekly_latest_scores(df_all)
+            time_suffix = " (Minggu Ini)"
+            file_suffix = "_minggu_ini"
+        else:
+            # Ambil data terakhir untuk setiap user (berdasarkan skd_ke terbanyak)
+            report_df = df_all.sort_values(["user_id", "skd_ke"]).groupby("user_id").tail(1).copy()
+        report_title = f"Laporan Semua User: SKD Terakhir{time_suffix}"
+        filename_base = f"laporan_skd_semua_user_terakhir{file_suffix}"
+    else:
+        n = int(pilih_skd.split("-")[-1])
+        report_df = df_all[df_all["skd_ke"] == n].copy()
+        report_title = f"Laporan Semua User: SKD ke-{n}"
+        filename_base = f"laporan_skd_semua_user_ke_{n}"
+
+    if report_df.empty:
+        st.warning(f"Tidak ada data untuk {pilih_skd}")
+        return
+
+    # Siapkan label untuk grafik
+    report_df["label"] = report_df["nama"]
+    
+    with st.container(border=True):
+        st.subheader("Pratinjau Data")
+        cols = ["nama", "skd_ke", "twk", "tiu", "tkp", "total"]
+        st.dataframe(report_df[cols].sort_values("total", ascending=False), use_container_width=True, hide_index=True)
+
+        st.markdown("---")
+        # Tombol Download Laporan (PNG / WebP / SVG / PDF)
+        fmt = report_format_option(key="report_format_all")
+        report_download_ui(get_report_queue(), report_df, report_title, filename_base, fmt, "all")
+
+
+def _render_batch_report_ui(df_all):
+    """Helper untuk membuat laporan individu semua user sekaligus dalam satu ZIP."""
+    from render import MAX_SKD_PER_REPORT
+    from report_jobs import batch_zip_key
+
+    st.subheader("📦 Laporan Massal Per User")
+
+    filter_tahun = st.session_state.get("filter_tahun_aktif")
+    label_tahun = "semua angkatan" if filter_tahun == "Semua" else f"angkatan {filter_tahun}"
+    jumlah_user = df_all["nama"].nunique()
+
+    with st.container(border=True):
+        st.info(
+            f"Membuat laporan individu (tabel & grafik, maksimal {MAX_SKD_PER_REPORT} SKD terakhir) "
+            f"untuk {jumlah_user} user di {label_tahun}, lalu dikemas dalam satu file ZIP."
+        )
+
+        queue = get_report_queue()
+        batch_key = batch_zip_key(df_all)
+        if st.button("⚙️ Buat Laporan Massal", use_container_width=True, type="primary", key="btn_batch_report"):
+            # Job berjalan di background; halaman tidak ikut terblokir
+            queue.submit_batch_zip(df_all)
+
+        # Laporan yang sama (data & angkatan sama) langsung dilayani dari cache
+        if queue.status(batch_key)["state"] != "missing":
+            meta = report_job_ui(
+                batch_key,
+                label="🗜️ Download Semua Laporan (ZIP)",
+                file_name=f"laporan_skd_massal_{label_tahun}.zip".replace(" ", "_"),
+                mime="application/zip",
+                btn_key="btn_dl_batch_zip"
+            )
+            if not meta:
+                return
+
+            timings = pd.DataFrame(meta["timings"])
+            st.success(f"{len(timings)} laporan selesai dalam {meta['durasi_s']:.1f} detik.")
+            st.markdown("---")
+            st.subheader("Rincian Waktu Render per User")
+            st.dataframe(timings, use_container_width=True, hide_index=True)
+
+
+@st.fragment
+def _render_individual_report_ui(df_target, pilih_user):
+    """
+    Helper untuk menampilkan UI laporan individu.
+    Fragment: mengubah rentang SKD hanya menjalankan ulang bagian laporan ini.
+    """
+    max_skd = len(df_target)
+    df_target["label"] = "SKD ke-" + df_target["skd_ke"].astype(str)
+    
+    with st.container(border=True):
+        st.subheader("🔍 Tentukan Rentang Data")
+        st.info(f"Jumlah data: {max_skd}. Untuk hasil terbaik (A4), laporan dibatasi maksimal 15 data per halaman.")
+        
+        col_r1, col_r2 = st.columns(2)
+        with col_r1:
+            default_dari = max(1, max_skd - 14)
+            r_dari = st.number_input("Dari SKD ke-", min_value=1, max_value=max_skd, value=default_dari, key=f"rep_r_dari_{pilih_user}")
+        with col_r2:
+            max_val = min(r_dari + 14, max_skd)
+            r_sampai = st.number_input("Sampai SKD ke-", min_value=r_dari, max_value=max_val, value=max_val, key=f"rep_r_sampai_{pilih_user}")
+        
+        st.success(f"💡 Rentang Laporan: SKD ke-{r_dari} sampai ke-{r_sampai}")
+
+    report_df = df_target[(df_target["skd_ke"] >= r_dari) & (df_target["skd_ke"] <= r_sampai)].copy()
+
+    with st.container(border=True):
+        st.subheader(f"Pratinjau Data: {pilih_user}")
+        cols = ["skd_ke", "twk", "tiu", "tkp", "total"]
+        st.dataframe(report_df[cols], use_container_width=True, hide_index=True)
+
+        st.markdown("---")
+        # Tombol Download Laporan (PNG / WebP / SVG / PDF)
+        report_title = f"Laporan Hasil SKD: {pilih_user} (SKD {r_dari}-{r_sampai})"
+        filename_base = f"laporan_skd_{pilih_user}_{r_dari}_{r_sampai}".replace(" ", "_")
+        
+        fmt = report_format_option(key=f"report_format_{pilih_user}")
+        report_download_ui(get_report_queue(), report_df, report_title, filename_base, fmt, pilih_user)
+    
+
+
+def user_personal_dashboard(user: dict):
+    """Dashboard khusus user: hanya lihat nilai miliknya sendiri."""
+    st.header("📊 Beranda Saya")
+
+    with st.container(border=True):
+        st.write(f"Nama: **{user.get('nama')}**")
+        st.write(f"Role: **{user.get('role', 'user')}**")
+        # Tampilkan informasi angkatan
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write(f"Tahun Masuk: **{user.get('tahun_masuk', '-')}**")
+        with col2:
+            st.write(f"Tahun Aktif: **{user.get('tahun_aktif', '-')}**")
+
+    st.markdown("---")
+
+    scores = fetch_user_scores(user["id"])
+    
+    # --- Bagian Metrics Atas (dari user_stats; hitung dari riwayat jika belum tersedia) ---
+    stats = fetch_one_user_stats(user["id"])
+    if stats:
+        total_skd = stats["attempt_count"]
+        max_score = int(float(stats["best_total"]))
+    else:
+        total_skd = len(scores)
+        max_score = max([s.get("total", 0) for s in scores]) if scores else 0
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        with st.container(border=True):
+            st.metric("Total SKD Saya", total_skd)
+    with col2:
+        with st.container(border=True):
+            st.metric("Nilai Tertinggi Saya", max_score)
+
+    if not scores:
+        st.info("Belum ada data nilai. Silakan input nilai terlebih dahulu di menu User.")
+        return
+
+    df = pd.DataFrame(scores)
+
+    # Urutkan berdasarkan waktu (kalau ada), lalu beri nomor percobaan "SKD ke-"
+    if "created_at" in df.columns:
+        df = df.sort_values("created_at")
+    df["skd_ke"] = range(1, len(df) + 1)
+    df["label"] = "SKD ke-" + df["skd_ke"].astype(str)
+
+    # Posisi di angkatan: lookup per percobaan di papan peringkat bersama
+    ranking = cohort_ranking()
+    posisi = ranking.position(user["id"]) if ranking else None
+    if posisi:
+        with st.container(border=True):
+            st.subheader(f"🏆 Posisi di Angkatan {posisi['angkatan']}")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Peringkat (SKD Terakhir)", f"{posisi['peringkat']} dari {posisi['jumlah']}")
+            with col2:
+                st.metric("Persentil", f"{posisi['persentil']:g}")
+            st.caption("Persentil = persentase peserta seangkatan dengan nilai total sama atau di bawah Anda.")
+
+        per_skd = [ranking.position(user["id"], key=n) for n in df["skd_ke"]]
+        df["peringkat"] = [f"{p['peringkat']}/{p['jumlah']}" if p else "-" for p in per_skd]
+        df["persentil"] = [p["persentil"] if p else None for p in per_skd]
+
+    with st.container(border=True):
+        st.subheader("Riwayat Nilai")
+        cols = [c for c in ["skd_ke", "twk", "tiu", "tkp", "total", "peringkat", "persentil"] if c in df.columns]
+        st.dataframe(df[cols], use_container_width=True, hide_index=True)
+        history = df[cols]
+        export_ui(lambda: iter_frame(history), f"riwayat_skd_{user.get('nama', 'user')}".replace(" ", "_").lower(), key="export_user_history")
+
+    max_points = downsample_option(len(df), key="user_grafik_downsample")
+
+    with st.container(border=True):
+        st.subheader("Grafik Komponen Nilai (Per Percobaan)")
+        render_skd_chart(df, "Perkembangan Nilai TWK / TIU / TKP", is_component=True, max_points=max_points)
+
+    with st.container(border=True):
+        st.subheader("Grafik Total Nilai")
+        render_skd_chart(df, "Perkembangan Total Nilai SKD", is_component=False, max_points=max_points)
+
+
+def admin_maintenance():
+    import archive
+
+    st.header("🛠️ Reset Data")
+    st.warning(
+        "**PERINGATAN:** Menu ini akan menghapus data secara permanen. "
+        "Pastikan Anda benar-benar ingin melakukannya."
+    )
+
+    st.markdown("""
+    **Aksi yang akan dilakukan:**
+    1. **Mengarsipkan tabel `scores` dan `users`** ke file Parquet di server.
+    2. **Menghapus semua data nilai SKD** (tabel `scores`) per batch.
+    3. **Menghapus semua akun dengan role 'user'** (tabel `users`) per batch.
+    4. **Menyisakan akun admin** agar sistem tetap dapat dikelola.
+    """)
+
+    st.markdown("---")
+
+    pending = archive.pending_reset()
+    if pending:
+        st.error(
+            f"Reset sebelumnya belum selesai (arsip **{pending['name']}**). "
+            "Lanjutkan untuk menghapus sisa data yang sudah diarsipkan."
+        )
+        if st.button("▶️ Lanjutkan Reset", type="primary"):
+            _run_reset(archive, pending)
+
+    confirm_phrase = "RESET SEMUA DATA"
+    st.write(f"Untuk melanjutkan, silakan ketik kalimat konfirmasi di bawah ini:")
+    st.code(confirm_phrase)
+    
+    input_confirm = st.text_input("Kalimat Konfirmasi", placeholder="Ketik di sini...")
+    
+    # Tombol reset hanya aktif jika input cocok
+    is_confirmed = (input_confirm == confirm_phrase)
+    
+    if st.button("🚀 Jalankan Reset Data Sekarang", disabled=not is_confirmed or bool(pending)):
+        confirm_delete_dialog("Yakin ingin menghapus seluruh data score dan user? Data diarsipkan lebih dulu.", "do_reset_all_data")
+
+    if st.session_state.get("do_reset_all_data"):
+        del st.session_state.do_reset_all_data
+        _run_reset(archive)
+
+    _cohort_archive_section(archive)
+    _restore_archive_section(archive)
+
+
+def _cohort_archive_section(archive):
+    """Pindahkan angkatan lama ke cold storage (file arsip lokal)."""
+    st.markdown("---")
+    with st.container(border=True):
+        st.subheader("🧊 Arsip Angkatan Lama")
+        st.info(
+            "User angkatan lama beserta nilainya dipindahkan ke file arsip dan dihapus dari tabel utama, "
+            "sehingga data harian tetap ringan. Data arsip tetap tampil saat filter angkatan **Semua** dipilih "
+            "(akun yang diarsipkan tidak dapat login sampai dipulihkan)."
+        )
+
+        pending = archive.pending_reset(kind="angkatan")
+        if pending:
+            st.error(f"Arsip angkatan **{pending['name']}** belum selesai dipindahkan.")
+            if st.button("▶️ Lanjutkan Arsip Angkatan"):
+                _run_cohort_archive(archive, manifest=pending)
+
+        year_now = datetime.date.today().year
+        before_year = st.number_input(
+            "Arsipkan angkatan dengan tahun aktif sebelum",
+            min_value=2000, max_value=year_now, value=year_now - 1, step=1,
+            key="archive_before_year",
+        )
+        targets = [
+            u for u in fetch_all_users()
+            if u.get("role") == "user" and u.get("tahun_aktif") is not None and int(u["tahun_aktif"]) < before_year
+        ]
+        years = sorted({int(u["tahun_aktif"]) for u in targets})
+        if targets:
+            st.caption(f"{len(targets)} user dari angkatan {', '.join(map(str, years))} akan diarsipkan.")
+        else:
+            st.caption("Tidak ada angkatan yang perlu diarsipkan.")
+
+        if st.button("Arsipkan Angkatan", disabled=not targets or bool(pending), key="btn_archive_cohorts"):
+            confirm_update_dialog(f"Pindahkan {len(targets)} user angkatan < {before_year} ke arsip?", "do_archive_cohorts")
+
+        if st.session_state.get("do_archive_cohorts"):
+            del st.session_state.do_archive_cohorts
+            _run_cohort_archive(archive, before_year=int(before_year))
+
+
+def _run_cohort_archive(archive, before_year=None, manifest=None):
+    bar = st.progress(0.0, text="Mengarsipkan angkatan...")
+
+    def progress(table, done, total=None):
+        bar.progress(done / total if total else 0.0, text=f"{table}: {done}" + (f"/{total}" if total else ""))
+
+    try:
+        if manifest is None:
+            manifest = archive.archive_cohorts(before_year, progress=progress)
+        else:
+            manifest = archive.delete_archived(manifest, progress=progress)
+    except Exception as e:
+        st.error(f"Arsip angkatan terhenti: {e}. Gunakan Lanjutkan Arsip Angkatan.")
+        invalidate_data_cache()
+        return
+
+    # Baris user_stats ikut terhapus (FK cascade); peringkat dibangun ulang
+    get_cohort_ranking().invalidate()
+    if manifest:
+        users = manifest["tables"]["users"]["rows"]
+        scores = manifest["tables"]["scores"]["rows"]
+        st.session_state.toast_msg = f"{users} user & {scores} nilai dipindahkan ke arsip"
+    invalidate_data_cache()
+    st.rerun()
+
+
+def _run_reset(archive, manifest=None):
+    """Arsipkan (jika belum) lalu hapus per batch dengan progress; bisa dilanjutkan jika terputus."""
+    status = st.status("Memproses reset data...", expanded=True)
+    bar = st.progress(0.0)
+    try:
+        if manifest is None:
+            status.write("1. Mengarsipkan data...")
+            manifest = archive.archive_tables(
+                progress=lambda table, rows: bar.progress(0.0, text=f"Arsip {table}: {rows} baris")
+            )
+            status.write(
+                f"Arsip **{manifest['name']}**: "
+                + ", ".join(f"{t} {info['rows']} baris" for t, info in manifest["tables"].items())
+            )
+
+        status.write("2. Menghapus data per batch...")
+        archive.delete_archived(
+            manifest,
+            progress=lambda table, done, total: bar.progress(done / total, text=f"Hapus {table}: {done}/{total}"),
+        )
+
+        # 3. Kosongkan ringkasan user_stats & peringkat
+        clear_user_stats()
+        get_cohort_ranking().invalidate()
+        status.update(label="Reset selesai", state="complete")
+    except Exception as e:
+        status.update(label="Reset terhenti", state="error")
+        st.error(f"Terjadi kesalahan saat melakukan reset: {e}. Data yang belum terhapus tetap aman; gunakan Lanjutkan Reset.")
+        invalidate_data_cache()
+        return
+
+    st.session_state.toast_msg = "Semua data berhasil direset (arsip tersimpan)"
+    invalidate_data_cache()
+    st.balloons()
+    st.rerun()
+
+
+def _restore_archive_section(archive):
+    """Pulihkan data user & nilai dari arsip reset."""
+    archives = [m for m in archive.list_archives() if m["status"] != "mengarsipkan"]
+    if not archives:
+        return
+
+    st.markdown("---")
+    with st.container(border=True):
+        st.subheader("♻️ Pulihkan dari Arsip")
+        labels = {
+            f"{m['name']} ({m['status']}; "
+            + ", ".join(f"{t} {info['rows']}" for t, info in m["tables"].items()) + ")": m
+            for m in archives
+        }
+        pilih = st.selectbox("Pilih Arsip", list(labels), key="restore_archive_select")
+        if st.button("Pulihkan Data", key="btn_restore_archive"):
+            confirm_update_dialog(f"Pulihkan user & nilai dari arsip {labels[pilih]['name']}?", "do_restore_archive")
+
+        if st.session_state.get("do_restore_archive"):
+            del st.session_state.do_restore_archive
+            bar = st.progress(0.0, text="Memulihkan data...")
+            try:
+                restored = archive.restore_archive(
+                    labels[pilih],
+                    progress=lambda table, done, total: bar.progress(min(1.0, done / max(total, 1)), text=f"Pulihkan {table}: {done}"),
+                )
+                rebuild_user_stats()
+            except Exception as e:
+                st.error(f"Gagal memulihkan arsip: {e}")
+                invalidate_data_cache()
+                return
+            get_cohort_ranking().invalidate()
+            st.session_state.toast_msg = f"Dipulihkan: {restored.get('users', 0)} user, {restored.get('scores', 0)} nilai"
+            invalidate_data_cache()
+            st.rerun()
+
+
+# ======================
+# NAVIGASI (MULTIPAGE)
+# ======================
+# Menu per role; hanya fungsi halaman yang aktif yang dijalankan setiap rerun.
+MENU_ITEMS = {
+    "admin": ["Beranda", "Visualisasi Data", "Kelola Pengguna", "Cetak Laporan", "Reset Data"],
+    "user": ["Beranda Saya", "Profil & Nilai Saya", "Cetak Laporan"],
+}
+
+
+def _session_user():
+    return st.session_state.get("user") or {}
+
+
+def _page_user_dashboard():
+    user_personal_dashboard(_session_user())
+
+
+def _page_user_self():
+    user = st.session_state.get("user")
+    if user is None:
+        st.error("Data user tidak ditemukan di session.")
+    else:
+        user_self_page(user)
+
+
+def _page_laporan():
+    user = _session_user()
+    render_laporan_page(user, user.get("role", "user"))
+
+
+PAGE_FUNCS = {
+    "admin": {
+        "Beranda": admin_dashboard_summary,
+        "Visualisasi Data": admin_grafik_nilai,
+        "Kelola Pengguna": admin_user_management,
+        "Cetak Laporan": _page_laporan,
+        "Reset Data": admin_maintenance,
+    },
+    "user": {
+        "Beranda Saya": _page_user_dashboard,
+        "Profil & Nilai Saya": _page_user_self,
+        "Cetak Laporan": _page_laporan,
+    },
+}
+
+
+def build_pages(role):
+    """Daftar st.Page sesuai role (halaman admin tidak pernah terdaftar untuk user)."""
+    key = "admin" if role == "admin" else "user"
+    return [
+        st.Page(
+            PAGE_FUNCS[key][title],
+            title=title,
+            url_path=title.lower().replace(" & ", "-").replace(" ", "-"),
+            default=(i == 0),
+        )
+        for i, title in enumerate(MENU_ITEMS[key])
+    ]
+
+
+def tahun_aktif_options():
+    """Pilihan filter angkatan (tahun_aktif unik) untuk sidebar admin."""
+    years = {int(u["tahun_aktif"]) for u in fetch_all_users() if u.get("tahun_aktif") is not None}
+    return ["Semua"] + sorted(years)
+
+
+def render_tahun_aktif_filter():
+    st.markdown("---")
+    st.subheader("🔍 Filter Angkatan")
+
+    filter_options = tahun_aktif_options()
+    year_now = datetime.date.today().year
+    try:
+        default_idx = filter_options.index(year_now)
+    except (ValueError, IndexError):
+        default_idx = 0
+
+    st.selectbox(
+        "Tahun Aktif",
+        filter_options,
+        index=default_idx,
+        key="filter_tahun_aktif"
+    )
+
+
+def perf_debug_panel(runs):
+    """Panel debug admin: rincian query & timer halaman beberapa rerun terakhir (lihat perf.py)."""
+    if not runs:
+        return
+    runs = runs[::-1]  # terbaru lebih dulu
+    with st.expander(f"🛠️ Debug Performa ({len(runs)} rerun terakhir)", expanded=True):
+        summary = pd.DataFrame([
+            {
+                "Waktu": r["ts"],
+                "Halaman": r["page"],
+                "Total (ms)": r["total_ms"],
+                "Query": r["query_count"],
+                "Waktu Query (ms)": r["query_ms"],
+                "Payload (KB)": r["query_kb"],
+            }
+            for r in runs
+        ])
+        st.dataframe(summary, use_container_width=True, hide_index=True)
+
+        pilih = st.selectbox(
+            "Rincian rerun:",
+            range(len(runs)),
+            format_func=lambda i: f"#{i + 1} · {runs[i]['ts']} · {runs[i]['page']} · {runs[i]['total_ms']} ms",
+            key="perf_debug_run"
+        )
+        detail = runs[pilih]
+
+        st.markdown("**Query Supabase** (terlama lebih dulu)")
+        if detail["queries"]:
+            df_q = pd.DataFrame(detail["queries"])
+            df_q["filters"] = df_q["filters"].map(lambda f: " · ".join(f))
+            df_q["kb"] = (df_q["bytes"] / 1024).round(1)
+            df_q = df_q.sort_values("ms", ascending=False)[["table", "op", "filters", "rows", "kb", "ms", "error"]]
+            st.dataframe(
+                df_q.rename(columns={
+                    "table": "Tabel", "op": "Operasi", "filters": "Filter", "rows": "Baris",
+                    "kb": "KB", "ms": "Latensi (ms)", "error": "Error",
+                }),
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.caption("Tidak ada query di rerun ini (data dari cache).")
+
+        st.markdown("**Timer halaman**")
+        if detail["timers"]:
+            st.dataframe(
+                pd.DataFrame(detail["timers"]).rename(columns={"name": "Bagian", "ms": "Durasi (ms)"}),
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.caption("Tidak ada timer halaman di rerun ini.")
+
+
+def run(user, role):
+    """Navigasi sidebar + jalankan halaman aktif untuk user yang sudah login."""
+    page = st.navigation(build_pages(role), position="sidebar")
+    st.session_state.active_menu = page.title
+
+    with st.sidebar:
+        # Global Filter for Admin
+        if role == "admin":
+            render_tahun_aktif_filter()
+            st.toggle("🛠️ Debug performa", key="perf_debug", help="Rincian query & waktu render beberapa rerun terakhir")
+        logout()
+
+    page.run()
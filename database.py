@@ -1,13 +1,19 @@
 import os
+import threading
 
 import streamlit as st
-from supabase import create_client
 from dotenv import load_dotenv
 
+from perf import TracedQuery
+
 # Untuk development lokal: baca dari .env
 load_dotenv()
 
 
+class ConfigError(RuntimeError):
+    """Konfigurasi / inisialisasi klien Supabase gagal (URL/KEY kosong atau tidak valid)."""
+
+
 def _get_supabase_credentials():
     """
     Ambil SUPABASE_URL dan SUPABASE_KEY.
@@ -36,7 +42,7 @@ def _get_supabase_credentials():
         missing = []
         if not url: missing.append("SUPABASE_URL")
         if not key: missing.append("SUPABASE_KEY")
-        raise RuntimeError(
+        raise ConfigError(
             f"Missing configuration: {', '.join(missing)}. "
             "Pastikan sudah di-set di Streamlit Secrets (Cloud) atau file .env (Lokal)."
         )
@@ -44,12 +50,66 @@ def _get_supabase_credentials():
     return url, key
 
 
-try:
-    URL, KEY = _get_supabase_credentials()
-    supabase = create_client(URL, KEY)
-    # Catatan: create_client tidak melakukan request jaringan saat inisialisasi.
-    # Error 401 baru akan muncul saat melakukan query pertama kali.
-except Exception as e:
-    st.error(f"Gagal inisialisasi konfigurasi Supabase: {e}")
-    URL, KEY = "", ""
-    supabase = None
+class _LazySupabase:
+    """
+    Klien Supabase yang baru dibuat saat pertama kali dipakai (mis. supabase.table(...)).
+    Impor library supabase & pembuatan klien tidak lagi dibayar oleh setiap
+    sesi baru di halaman login sebelum user menekan tombol apa pun.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    try:
+                        from supabase import create_client
+
+                        url, key = _get_supabase_credentials()
+                        # Catatan: create_client tidak melakukan request jaringan saat inisialisasi.
+                        # Error 401 baru akan muncul saat melakukan query pertama kali.
+                        self._client = create_client(url, key)
+                    except Exception as e:
+                        st.error(f"Gagal inisialisasi konfigurasi Supabase: {e}")
+                        if isinstance(e, ConfigError):
+                            raise
+                        raise ConfigError(str(e)) from e
+        return self._client
+
+    def table(self, name):
+        # Setiap query dicatat (latensi, baris, ukuran) saat run aktif; lihat perf.py
+        return TracedQuery(self.get().table(name), name)
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+supabase = _LazySupabase()
+
+
+def paginate(table, apply=None, order=("id",), page_size=1000, columns="*"):
+    """
+    Baca tabel per halaman (`.range()`), urut sesuai `order` (kolom atau
+    tuple kolom; sertakan kunci unik agar urutan stabil), opsional dengan
+    filter `apply(query)`. Menghasilkan list baris per halaman sehingga data
+    besar tidak perlu dimuat sekaligus (dan tidak terpotong max-rows PostgREST).
+    """
+    if isinstance(order, str):
+        order = (order,)
+    offset = 0
+    while True:
+        query = supabase.table(table).select(columns)
+        if apply:
+            query = apply(query)
+        for column in order:
+            query = query.order(column)
+        response = query.range(offset, offset + page_size - 1).execute()
+        rows = getattr(response, "data", []) or []
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            break
+        offset += page_size
@@ -0,0 +1,135 @@
+import tempfile
+
+import pandas as pd
+
+from database import paginate
+
+# Ekspor tampilan data ke CSV / XLSX / Parquet. Semua writer menerima
+# iterable potongan DataFrame dan menulisnya satu per satu ke file sementara
+# (di memori selama kecil, pindah ke disk jika besar), sehingga data satu
+# angkatan tidak perlu ada dua kali di memori (DataFrame penuh + file).
+EXPORT_FORMATS = {
+    "csv": {"label": "CSV", "ext": "csv", "mime": "text/csv"},
+    "xlsx": {
+        "label": "XLSX",
+        "ext": "xlsx",
+        "mime": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    },
+    "parquet": {"label": "Parquet", "ext": "parquet", "mime": "application/vnd.apache.parquet"},
+}
+EXPORT_CHUNK_ROWS = 5000
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+ID_FILTER_BATCH = 200
+
+SCORE_EXPORT_COLUMNS = ["nama", "tahun_aktif", "skd_ke", "twk", "tiu", "tkp", "total", "created_at"]
+
+
+def iter_frame(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Potongan DataFrame yang sudah ada di memori (tanpa salinan penuh)."""
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _write_csv(chunks, out):
+    first = True
+    for chunk in chunks:
+        out.write(chunk.to_csv(index=False, header=first).encode("utf-8"))
+        first = False
+
+
+def _write_xlsx(chunks, out):
+    # write_only: baris langsung dialirkan ke file, tidak disimpan sebagai sel
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Data")
+    first = True
+    for chunk in chunks:
+        if first:
+            ws.append([str(c) for c in chunk.columns])
+            first = False
+        for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False):
+            ws.append(list(row))
+    wb.save(out)
+
+
+def _write_parquet(chunks, out):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                # Kolom yang seluruhnya kosong di potongan pertama disimpan sebagai teks
+                schema = pa.schema([
+                    pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+                    for f in table.schema
+                ])
+                writer = pq.ParquetWriter(out, schema, compression="zstd")
+            writer.write_table(pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False, safe=False))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+_WRITERS = {"csv": _write_csv, "xlsx": _write_xlsx, "parquet": _write_parquet}
+
+
+def write_export(chunks, fmt="csv"):
+    """Tulis potongan DataFrame ke file sementara berformat `fmt`; kembalikan file (posisi 0)."""
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    _WRITERS[fmt](chunks, out)
+    out.seek(0)
+    return out
+
+
+def _score_frames(pages, by_id):
+    """
+    Ubah halaman baris scores (urut user_id, created_at, id) menjadi potongan
+    DataFrame berkolom SCORE_EXPORT_COLUMNS. Nomor "SKD ke-" dilanjutkan
+    antar halaman.
+    """
+    last_user, count = None, 0
+    for rows in pages:
+        df = pd.DataFrame(rows)
+        for col in ["twk", "tiu", "tkp"]:
+            df[col] = pd.to_numeric(df.get(col), errors="coerce").fillna(0)
+        df["total"] = df["twk"] + df["tiu"] + df["tkp"]
+        df["nama"] = df["user_id"].map(lambda uid: by_id[uid].get("nama"))
+        df["tahun_aktif"] = df["user_id"].map(lambda uid: by_id[uid].get("tahun_aktif"))
+
+        # Lanjutkan hitungan percobaan user terakhir dari halaman sebelumnya
+        df["skd_ke"] = df.groupby("user_id").cumcount() + 1
+        if last_user is not None:
+            df.loc[df["user_id"] == last_user, "skd_ke"] += count
+        last_user = df["user_id"].iloc[-1]
+        count = int(df.loc[df["user_id"] == last_user, "skd_ke"].iloc[-1])
+
+        yield df.reindex(columns=SCORE_EXPORT_COLUMNS)
+
+
+def iter_cohort_scores(users, page_size=1000):
+    """Riwayat nilai user-user `users` (list dict) langsung dari pembaca scores berhalaman."""
+    by_id = {u["id"]: u for u in users}
+    ids = list(by_id)
+    for start in range(0, len(ids), ID_FILTER_BATCH):
+        chunk_ids = ids[start:start + ID_FILTER_BATCH]
+        yield from _score_frames(
+            paginate(
+                "scores",
+                lambda q: q.in_("user_id", chunk_ids),
+                order=("user_id", "created_at", "id"),
+                page_size=page_size,
+            ),
+            by_id,
+        )
+
+
+def iter_archived_scores(df_users, df_scores, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Riwayat nilai angkatan di arsip (DataFrame dari read_cohort_archives) dalam format ekspor yang sama."""
+    by_id = {u["id"]: u for u in df_users.to_dict("records")}
+    ordered = df_scores[df_scores["user_id"].isin(list(by_id))].sort_values(["user_id", "created_at", "id"])
+    pages = (chunk.to_dict("records") for chunk in iter_frame(ordered, chunk_rows))
+    yield from _score_frames(pages, by_id)
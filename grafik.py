@@ -1,28 +1,85 @@
-import matplotlib.pyplot as plt
-from database import supabase
-
-def tampil_grafik():
-
-    data = supabase.table("users").select("*").execute().data
-
-    nama = [d["nama"] for d in data]
-    twk = [d["twk"] for d in data]
-    tiu = [d["tiu"] for d in data]
-    tkp = [d["tkp"] for d in data]
-    total = [d["total"] for d in data]
-
-    # Grafik 1
-    plt.figure()
-    plt.plot(nama, twk, marker='o', label='TWK', color="#1E293B")
-    plt.plot(nama, tiu, marker='o', label='TIU', color="#64748B")
-    plt.plot(nama, tkp, marker='o', label='TKP', color="#10B981")
-
-    plt.title("Nilai SKD")
-    plt.legend()
-    plt.show()
-
-    # Grafik 2
-    plt.figure()
-    plt.plot(nama, total, marker='o', color="#1E293B")
-    plt.title("Total SKD")
-    plt.show()
+import sys
+import time
+import argparse
+
+import pandas as pd
+
+from database import paginate
+from weekly import APP_TIMEZONE
+
+# Ekspor grafik SKD ke file PNG tanpa display (backend Agg), misalnya untuk
+# dibuat semalaman lewat cron:
+#
+#   python grafik.py -o grafik/ [--tahun-aktif 2026] [--dari 2026-01-01] [--sampai 2026-06-30]
+#                    [--tanpa-user] [--workers 4]
+#
+# Per angkatan: rata-rata nilai per percobaan (komponen & total) + heatmap
+# user x percobaan. Per user: grafik komponen & total (gaya & palette sama
+# dengan render_skd_chart di dashboard). Render berjalan paralel di worker
+# process; setiap worker langsung menulis filenya ke direktori output.
+
+
+def load_scores(tahun_aktif=None, dari=None, sampai=None):
+    """
+    Riwayat nilai user (role user) dari tabel scores, dibaca per halaman.
+    "SKD ke-" dihitung dari seluruh riwayat, lalu difilter tanggal
+    (`dari`/`sampai` inklusif, format YYYY-MM-DD, tanggal menurut APP_TIMEZONE).
+    """
+    from export import iter_cohort_scores
+
+    def apply(query):
+        query = query.eq("role", "user")
+        return query.eq("tahun_aktif", tahun_aktif) if tahun_aktif is not None else query
+
+    users = [u for rows in paginate("users", apply) for u in rows]
+    parts = list(iter_cohort_scores(users))
+    if not parts:
+        return pd.DataFrame()
+    df = pd.concat(parts, ignore_index=True)
+    df = df[df["tahun_aktif"].notna()]
+
+    if dari or sampai:
+        tanggal = pd.to_datetime(df["created_at"], errors="coerce", utc=True).dt.tz_convert(APP_TIMEZONE).dt.date
+        if dari:
+            df = df[tanggal >= pd.Timestamp(dari).date()]
+        if sampai:
+            df = df[tanggal <= pd.Timestamp(sampai).date()]
+    return df
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="grafik.py", description="Ekspor grafik SKD ke PNG (tanpa display)")
+    parser.add_argument("-o", "--output", default="grafik", help="Direktori output (default: grafik/)")
+    parser.add_argument("--tahun-aktif", type=int, help="Hanya angkatan ini")
+    parser.add_argument("--dari", help="Tanggal awal percobaan (YYYY-MM-DD)")
+    parser.add_argument("--sampai", help="Tanggal akhir percobaan (YYYY-MM-DD)")
+    parser.add_argument("--tanpa-user", action="store_true", help="Hanya grafik per angkatan")
+    parser.add_argument("--workers", type=int, help="Jumlah worker process (default: jumlah CPU)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    from render import build_chart_jobs, iter_chart_exports
+
+    try:
+        df = load_scores(args.tahun_aktif, args.dari, args.sampai)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    if df.empty:
+        print("Tidak ada nilai yang cocok dengan filter.", file=sys.stderr)
+        return 0
+
+    jobs = build_chart_jobs(df, args.output, per_user=not args.tanpa_user)
+    t0 = time.perf_counter()
+    files = 0
+    for i, result in enumerate(iter_chart_exports(jobs, args.workers), start=1):
+        files += len(result["files"])
+        print(f"[{i}/{len(jobs)}] {result['nama']}: {len(result['files'])} file ({result['durasi_ms']:.0f} ms)", file=sys.stderr)
+    print(f"{files} file grafik ditulis ke {args.output} dalam {time.perf_counter() - t0:.1f} detik", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
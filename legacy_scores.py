@@ -0,0 +1,132 @@
+import os
+import json
+import time
+import datetime
+
+from database import supabase, paginate
+
+# Migrasi satu kali nilai lama di tabel users (kolom twk/tiu/tkp yang dulu
+# ditulis menu CLI user.py) menjadi baris tabel scores, sumber yang dibaca
+# dashboard. User dipindai per halaman (urut id); nilai yang sudah ada di
+# scores (user_id + twk/tiu/tkp sama) dilewati, sehingga migrasi aman
+# dijalankan ulang. Id terakhir yang selesai disimpan di file checkpoint
+# agar proses yang terputus bisa dilanjutkan.
+LEGACY_COLUMNS = ("twk", "tiu", "tkp")
+CHECKPOINT_FILE = os.getenv(
+    "SKD_LEGACY_CHECKPOINT",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "legacy_backfill.json"),
+)
+PAGE_SIZE = 1000
+INSERT_BATCH_SIZE = 100
+ID_FILTER_BATCH = 200
+
+
+def _number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(value) if value.is_integer() else value
+
+
+def legacy_score_row(user, now):
+    """Payload insert scores dari kolom nilai lama seorang user (None jika tidak ada nilai)."""
+    values = {c: _number(user.get(c)) for c in LEGACY_COLUMNS}
+    if not any(values.values()):
+        return None
+    values = {c: v or 0 for c, v in values.items()}
+    return {
+        "user_id": user["id"],
+        **values,
+        "total": sum(values.values()),
+        # Semua baris memakai kunci yang sama (syarat insert multi-baris)
+        "created_at": user.get("updated_at") or user.get("created_at") or now,
+    }
+
+
+def _score_key(row):
+    return (row["user_id"], *(float(row.get(c) or 0) for c in LEGACY_COLUMNS))
+
+
+def _existing_keys(user_ids):
+    keys = set()
+    for start in range(0, len(user_ids), ID_FILTER_BATCH):
+        chunk = user_ids[start:start + ID_FILTER_BATCH]
+        # Per halaman: nilai yang terpotong max-rows akan dianggap belum ada (duplikat)
+        for rows in paginate("scores", lambda q: q.in_("user_id", chunk), order=("id",), columns="user_id,twk,tiu,tkp"):
+            keys.update(_score_key(r) for r in rows)
+    return keys
+
+
+def load_checkpoint(path=CHECKPOINT_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _save_checkpoint(state, path):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def backfill_legacy_scores(
+    page_size=PAGE_SIZE,
+    batch_size=INSERT_BATCH_SIZE,
+    checkpoint=CHECKPOINT_FILE,
+    restart=False,
+    dry_run=False,
+    progress=None,
+):
+    """
+    Salin nilai lama users -> scores. Melanjutkan dari checkpoint kecuali
+    `restart`; `dry_run` hanya menghitung tanpa menulis. Mengembalikan
+    ringkasan (jumlah user dipindai, nilai dimigrasi, duplikat dilewati,
+    lama proses & throughput user/detik).
+    """
+    from stats import refresh_stats_for_users
+
+    state = None if restart or dry_run else load_checkpoint(checkpoint)
+    if state is None:
+        state = {"status": "berjalan", "last_id": None, "scanned": 0, "migrated": 0, "skipped": 0}
+    if state["status"] == "selesai":
+        return {**state, "seconds": 0.0, "users_per_second": 0.0}
+
+    resume_from = state["last_id"]
+
+    def apply(query):
+        query = query.eq("role", "user")
+        return query.gt("id", resume_from) if resume_from else query
+
+    started = time.perf_counter()
+    scanned = 0
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    for users in paginate("users", apply, page_size=page_size):
+        rows = [r for r in (legacy_score_row(u, now) for u in users) if r]
+        if rows:
+            existing = _existing_keys([r["user_id"] for r in rows])
+            new_rows = [r for r in rows if _score_key(r) not in existing]
+            state["skipped"] += len(rows) - len(new_rows)
+            if not dry_run:
+                for start in range(0, len(new_rows), batch_size):
+                    supabase.table("scores").insert(new_rows[start:start + batch_size]).execute()
+                if new_rows:
+                    refresh_stats_for_users([r["user_id"] for r in new_rows])
+            state["migrated"] += len(new_rows)
+
+        scanned += len(users)
+        state["scanned"] += len(users)
+        state["last_id"] = users[-1]["id"]
+        if not dry_run:
+            _save_checkpoint(state, checkpoint)
+        if progress:
+            progress(state)
+
+    state["status"] = "selesai"
+    if not dry_run:
+        _save_checkpoint(state, checkpoint)
+    seconds = time.perf_counter() - started
+    return {**state, "seconds": round(seconds, 2), "users_per_second": round(scanned / seconds, 1) if seconds else 0.0}
@@ -1,18 +1,14 @@
-import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import bcrypt
-import io
-import datetime
+import time
+from collections import deque
+
+# Awal script run (sebelum impor lain) untuk laporan waktu startup
+RUN_START = time.perf_counter()
 
-from auth import login, logout
-from database import supabase
+import streamlit as st
 
-st.set_page_config(
-    page_title="SKD App",
-    layout="wide",
-    initial_sidebar_state="collapsed"
-)
+import startup
+import perf
+from auth import login
 
 
 # ======================
@@ -34,7 +30,11 @@ def show_toast(message: str, type="success"):
 
 
 def inject_global_css():
-    """Menerapkan Modern Light Glassmorphism UI dan memaksa Light Mode."""
+    """
+    Menerapkan Modern Light UI dan memaksa Light Mode.
+    Hanya aturan yang dipakai halaman login; gaya sidebar & navigasi
+    ditambahkan inject_app_css() setelah login.
+    """
     st.markdown(
         """
         <style>
@@ -64,90 +64,6 @@ def inject_global_css():
             padding-right: 5% !important;
         }
 
-        /* Modern Glass Sidebar */
-        [data-testid="stSidebar"] {
-            background-color: rgba(203, 213, 225, 0.5) !important;
-            backdrop-filter: blur(20px) !important;
-            -webkit-backdrop-filter: blur(20px) !important;
-            border-right: 1px solid rgba(255, 255, 255, 0.4) !important;
-            box-shadow: 4px 0 20px rgba(0,0,0,0.05) !important;
-            z-index: 1000001 !important;
-            transition: transform 0.3s ease !important;
-        }
-
-        /* Always show sidebar collapse button (<<) */
-        [data-testid="stSidebar"] [data-testid="stBaseButton-headerNoPadding"] {
-            opacity: 1 !important;
-            visibility: visible !important;
-            color: #1E293B !important;
-        }
-
-        /* Force Sidebar Text Color */
-        [data-testid="stSidebar"] [data-testid="stWidgetLabel"] p,
-        [data-testid="stSidebar"] .stMarkdown p,
-        [data-testid="stSidebar"] label p {
-            color: #1E293B !important;
-            font-weight: 600 !important;
-        }
-
-        /* Prevent content shift */
-        [data-testid="stAppViewContainer"] section[data-testid="stMain"] {
-            width: 100% !important;
-            margin-left: 0 !important;
-            padding-left: 0 !important;
-        }
-        
-        /* Sidebar Expanded State Backdrop */
-        [data-testid="stSidebar"][aria-expanded="true"] ~ section[data-testid="stMain"]::before {
-            content: "";
-            position: fixed;
-            top: 0; left: 0; right: 0; bottom: 0;
-            background: rgba(0,0,0,0.1);
-            z-index: 99999;
-            pointer-events: none;
-        }
-
-        /* Sidebar Navigation Styling (Pills) */
-        [data-testid="stSidebar"] [data-testid="stWidgetLabel"] {
-            display: none;
-        }
-        
-        [data-testid="stSidebar"] div[role="radiogroup"] {
-            padding: 20px 10px;
-            gap: 8px;
-        }
-
-        [data-testid="stSidebar"] div[role="radiogroup"] label {
-            background-color: transparent !important;
-            padding: 10px 20px !important;
-            border-radius: 24px !important;
-            border: none !important;
-            width: 100% !important;
-            cursor: pointer !important;
-            transition: all 0.2s ease !important;
-            margin: 0 !important;
-        }
-
-        /* Hide radio circle */
-        [data-testid="stSidebar"] div[role="radiogroup"] label > div:first-child {
-            display: none !important;
-        }
-
-        [data-testid="stSidebar"] div[role="radiogroup"] label p {
-            font-size: 15px !important;
-            margin: 0 !important;
-        }
-
-        [data-testid="stSidebar"] div[role="radiogroup"] label:hover {
-            background-color: rgba(0, 0, 0, 0.03) !important;
-        }
-        
-        /* Active Sidebar Item (Pill) */
-        [data-testid="stSidebar"] div[role="radiogroup"] label:has(input:checked) {
-            background-color: rgba(0, 0, 0, 0.05) !important;
-            box-shadow: inset 0 0 0 1px rgba(0,0,0,0.05) !important;
-        }
-
         /* Input & Labels Visibility in Light Mode */
         [data-testid="stWidgetLabel"] p, .stMarkdown p, label p {
             color: #1E293B !important;
@@ -244,1368 +160,158 @@ def inject_global_css():
     )
 
 
-inject_global_css()
-
-
-def fetch_all_users():
-    try:
-        response = supabase.table("users").select("*").execute()
-        return getattr(response, "data", []) or []
-    except Exception as e:
-        st.error(f"Error fetching all users: {e}")
-        return []
-
-
-def fetch_all_scores():
-    """Ambil semua data dari tabel scores."""
-    try:
-        response = supabase.table("scores").select("*").execute()
-        return getattr(response, "data", []) or []
-    except Exception as e:
-        st.error(f"Error fetching all scores: {e}")
-        return []
-
-
-def fetch_user_scores(user_id: str):
-    """Ambil semua riwayat nilai untuk satu user (scores table)."""
-    try:
-        response = (
-            supabase.table("scores")
-            .select("*")
-            .eq("user_id", user_id)
-            .order("created_at", desc=True)
-            .execute()
-        )
-        return getattr(response, "data", []) or []
-    except Exception as e:
-        # Jika tabel scores belum ada atau error lain, kembalikan list kosong
-        st.error(f"Error fetching user scores: {e}")
-        return []
-
-
-def fetch_latest_score(user_id: str):
-    """Ambil nilai terbaru user dari tabel scores."""
-    scores = fetch_user_scores(user_id)
-    return scores[0] if scores else None
-
-
-def render_skd_chart(df, title, is_component=True):
-    """
-    Render grafik SKD dengan gaya seragam dan responsif (Modern Theme).
-    """
-    if df.empty:
-        st.warning(f"Data kosong untuk {title}")
-        return None
-
-    # Hitung figsize dinamis berdasarkan jumlah data
-    num_data = len(df)
-    dynamic_width = max(8, num_data * 0.7)
-    
-    fig, ax = plt.subplots(figsize=(dynamic_width, 5), dpi=100)
-    
-    # Palette Modern Emerald & Dark Slate
-    color_twk = "#1E293B"  # Dark Slate
-    color_tiu = "#64748B"  # Slate
-    color_tkp = "#10B981"  # Emerald
-    
-    if is_component:
-        ax.plot(df["label"], df["twk"], marker="o", label="TWK", color=color_twk, linewidth=3)
-        ax.plot(df["label"], df["tiu"], marker="o", label="TIU", color=color_tiu, linewidth=3)
-        ax.plot(df["label"], df["tkp"], marker="o", label="TKP", color=color_tkp, linewidth=3)
-        ax.set_ylabel("Nilai", color=color_twk, fontweight='bold')
-    else:
-        ax.plot(df["label"], df["total"], marker="o", color=color_twk, linewidth=3.5, label="Total")
-        ax.set_ylabel("Total Nilai", color=color_twk, fontweight='bold')
-
-    ax.set_title(title, fontsize=14, fontweight='bold', pad=15, color=color_twk)
-    ax.legend(loc='upper left', bbox_to_anchor=(1, 1))
-    ax.grid(True, linestyle='--', alpha=0.6)
-    
-    ax.tick_params(axis='x', rotation=45, labelsize=9)
-    ax.tick_params(axis='y', labelsize=9)
-    fig.tight_layout()
-    
-    return fig
-
-
-@st.cache_data(show_spinner=False)
-def render_report_page(df, title, content_type="table"):
-    """
-    Render satu halaman laporan (Tabel atau Grafik) dengan ukuran A4 (approx 8.27x11.69 inch).
-    """
-    if df.empty: return None
-    
-    # Ukuran A4 Portrait (inch)
-    figsize_a4 = (8.27, 11.69)
-    fig = plt.figure(figsize=figsize_a4, dpi=100)
-    
-    color_primary = "#1E293B"
-    
-    if content_type == "table":
-        ax = fig.add_subplot(111)
-        ax.axis('off')
-        
-        cols_to_show = ["skd_ke", "twk", "tiu", "tkp", "total"]
-        if "nama" in df.columns and len(df["nama"].unique()) > 1:
-            cols_to_show = ["nama"] + cols_to_show
-        
-        table_data = df[cols_to_show].copy()
-        
-        # Pastikan kolom numerik menjadi integer agar tidak ada .0 di tabel PNG
-        numeric_cols = ["skd_ke", "twk", "tiu", "tkp", "total"]
-        for col in numeric_cols:
-            if col in table_data.columns:
-                table_data[col] = pd.to_numeric(table_data[col], errors='coerce').fillna(0).astype(int)
-
-        rename_map = {"skd_ke": "SKD ke-", "twk": "TWK", "tiu": "TIU", "tkp": "TKP", "total": "Total", "nama": "Nama"}
-        table_data = table_data.rename(columns=rename_map)
-        
-        num_rows = len(table_data)
-        # Dinamis font & scale agar tidak overlap dan pas di A4
-        dyn_font = max(6, min(10, 500 // (num_rows + 20)))
-        dyn_scale = max(1.1, min(2.5, 60 // (num_rows + 15)))
-
-        the_table = ax.table(
-            cellText=table_data.values,
-            colLabels=table_data.columns,
-            cellLoc='center',
-            loc='upper center'
-        )
-        the_table.auto_set_font_size(False)
-        the_table.set_fontsize(dyn_font)
-        the_table.scale(1.2, dyn_scale)
-        
-        for (row, col), cell in the_table.get_celld().items():
-            if row == 0:
-                cell.set_text_props(weight='bold', color='white')
-                cell.set_facecolor(color_primary)
-            elif row > 0:
-                cell.set_facecolor('#F8F9F9')
-        
-        ax.set_title(title + "\n(Halaman 1: Tabel Nilai)", fontsize=16, fontweight='bold', pad=50, color=color_primary)
-        fig.subplots_adjust(top=0.85, bottom=0.05, left=0.1, right=0.9)
-
-    else:
-        # Grafik - 2 grafik ditumpuk vertikal
-        ax_comp = fig.add_subplot(2, 1, 1)
-        ax_total = fig.add_subplot(2, 1, 2)
-        
-        color_twk = "#1E293B"
-        color_tiu = "#64748B"
-        color_tkp = "#10B981"
-
-        # Pastikan data terurut
-        if "skd_ke" in df.columns:
-            df = df.sort_values("skd_ke")
-
-        # Marker size & line width dinamis agar tidak berantakan saat data banyak
-        num_pts = len(df)
-        msize = max(2, min(8, 250 // (num_pts + 10)))
-        lwidth = max(1, min(3, 100 // (num_pts + 10)))
-        tick_size = max(5, min(9, 400 // (num_pts + 10)))
-
-        # Grafik Komponen
-        ax_comp.plot(df["label"], df["twk"], marker="o", label="TWK", color=color_twk, linewidth=lwidth, markersize=msize)
-        ax_comp.plot(df["label"], df["tiu"], marker="o", label="TIU", color=color_tiu, linewidth=lwidth, markersize=msize)
-        ax_comp.plot(df["label"], df["tkp"], marker="o", label="TKP", color=color_tkp, linewidth=lwidth, markersize=msize)
-        ax_comp.set_ylabel("Nilai", color=color_twk, fontweight='bold')
-        ax_comp.set_title("Grafik Komponen Nilai SKD", fontsize=14, fontweight='bold', pad=10, color=color_twk)
-        ax_comp.legend(loc='upper left', bbox_to_anchor=(1, 1))
-        ax_comp.grid(True, linestyle='--', alpha=0.6)
-        ax_comp.tick_params(axis='x', rotation=45, labelsize=tick_size)
-
-        # Grafik Total
-        ax_total.plot(df["label"], df["total"], marker="o", color=color_twk, linewidth=lwidth + 0.5, markersize=msize, label="Total")
-        ax_total.set_ylabel("Total Nilai", color=color_twk, fontweight='bold')
-        ax_total.set_title("Grafik Total Nilai SKD", fontsize=14, fontweight='bold', pad=10, color=color_twk)
-        ax_total.legend(loc='upper left', bbox_to_anchor=(1, 1))
-        ax_total.grid(True, linestyle='--', alpha=0.6)
-        ax_total.tick_params(axis='x', rotation=45, labelsize=tick_size)
-        
-        fig.suptitle(title + "\n(Halaman 2: Grafik Perkembangan)", fontsize=16, fontweight='bold', y=0.98, color=color_twk)
-        fig.subplots_adjust(top=0.88, bottom=0.12, left=0.15, right=0.85, hspace=0.4)
-
-    buf = io.BytesIO()
-    # Gunakan bbox_inches=None agar ukuran tetap A4 murni
-    fig.savefig(buf, format="png", bbox_inches=None)
-    plt.close(fig)
-    return buf.getvalue()
-
-
-@st.dialog("Konfirmasi Update")
-def confirm_update_dialog(message, session_key):
-    st.write(message)
-    c1, c2 = st.columns(2)
-    if c1.button("Iya", use_container_width=True, type="primary"):
-        st.session_state[session_key] = True
-        st.rerun()
-    if c2.button("Tidak", use_container_width=True):
-        st.rerun()
-
-
-@st.dialog("Konfirmasi Hapus")
-def confirm_delete_dialog(message, session_key):
-    st.warning(message)
-    c1, c2 = st.columns(2)
-    if c1.button("Iya", use_container_width=True, type="primary"):
-        st.session_state[session_key] = True
-        st.rerun()
-    if c2.button("Tidak", use_container_width=True):
-        st.rerun()
-
-
-# Cek apakah ada notifikasi tertunda di session state (setelah fungsi didefinisikan)
-if "toast_msg" in st.session_state:
-    show_toast(st.session_state.toast_msg)
-    del st.session_state.toast_msg
-
-
-def admin_user_management():
-    st.header("👤 Kelola Pengguna")
-
-    tab1, tab2 = st.tabs(["👥 Kelola Akun", "📊 Kelola Nilai"])
-    
-    # Ambil semua user dan filter berdasarkan cohort di sidebar
-    all_users = fetch_all_users()
-    year_now = datetime.date.today().year
-    filter_tahun = st.session_state.get("filter_tahun_aktif")
-    if filter_tahun is None: filter_tahun = year_now
-    
-    if filter_tahun != "Semua":
-        users = [u for u in all_users if u.get("tahun_aktif") == filter_tahun]
-    else:
-        users = all_users
-
-    with tab1:
-        with st.container(border=True):
-            if users:
-                df = pd.DataFrame(users)
-                # Tampilkan nama, role, tahun masuk, dan tahun aktif
-                cols = [c for c in ["nama", "role", "tahun_masuk", "tahun_aktif"] if c in df.columns]
-                
-                # Rename columns for display
-                rename_map = {
-                    "nama": "Nama",
-                    "role": "Role",
-                    "tahun_masuk": "Thn Masuk",
-                    "tahun_aktif": "Thn Aktif"
-                }
-
-                st.subheader("Daftar User")
-                st.dataframe(
-                    df[cols].rename(columns=rename_map), 
-                    use_container_width=True, 
-                    hide_index=True
-                )
-            else:
-                st.info("Belum ada user di database.")
-
-        st.markdown("---")
-
-        # Edit user
-        with st.container(border=True):
-            st.subheader("Edit User")
-            if users:
-                nama_list = [u["nama"] for u in users]
-                nama_pilih = st.selectbox(
-                    "Pilih User", 
-                    nama_list, 
-                    key="edit_user_select",
-                    index=None if len(nama_list) > 4 or not nama_list else 0,
-                    placeholder="Cari & pilih nama user..." if len(nama_list) > 4 else None
-                )
-                
-                if nama_pilih:
-                    user_pilih = next(u for u in users if u["nama"] == nama_pilih)
-                    current_role = user_pilih.get("role", "user")
-
-                    with st.form("edit_user"):
-                        new_password = st.text_input(
-                            "Password baru (kosongkan jika tidak diubah)", type="password"
-                        )
-                        new_role = st.selectbox(
-                            "Role",
-                            ["admin", "user"],
-                            index=0 if current_role == "admin" else 1,
-                        )
-
-                        submitted_edit = st.form_submit_button("Simpan Perubahan")
-
-                    if submitted_edit:
-                        update_data = {"role": new_role}
-                        if new_password:
-                            password_hash = bcrypt.hashpw(
-                                new_password.encode("utf-8"), bcrypt.gensalt()
-                            ).decode("utf-8")
-                            update_data["password"] = password_hash
-                        
-                        st.session_state.pending_user_update = update_data
-                        confirm_update_dialog(f"Simpan perubahan untuk user {user_pilih['nama']}?", "do_update_user")
-
-                    if st.session_state.get("do_update_user"):
-                        supabase.table("users").update(st.session_state.pending_user_update).eq(
-                            "id", user_pilih["id"]
-                        ).execute()
-                        st.session_state.toast_msg = "User berhasil diupdate"
-                        del st.session_state.do_update_user
-                        del st.session_state.pending_user_update
-                        st.rerun()
-
-        st.markdown("---")
-
-        # Hapus user
-        with st.container(border=True):
-            st.subheader("Hapus User")
-            if users:
-                nama_list_hapus = [u["nama"] for u in users]
-                nama_hapus = st.selectbox(
-                    "Pilih User untuk dihapus", 
-                    nama_list_hapus, 
-                    key="delete_user_select",
-                    index=None if len(nama_list_hapus) > 4 or not nama_list_hapus else 0,
-                    placeholder="Cari & pilih nama user..." if len(nama_list_hapus) > 4 else None
-                )
-                
-                if nama_hapus:
-                    user_hapus = next(u for u in users if u["nama"] == nama_hapus)
-
-                    if st.button("Hapus User"):
-                        confirm_delete_dialog(f"Apakah Anda yakin ingin menghapus user {user_hapus['nama']}?", "do_delete_user")
-
-                    if st.session_state.get("do_delete_user"):
-                        supabase.table("users").delete().eq("id", user_hapus["id"]).execute()
-                        st.session_state.toast_msg = "User berhasil dihapus"
-                        del st.session_state.do_delete_user
-                        st.rerun()
-
-        st.markdown("---")
-
-        # Transmigrasi User
-        with st.container(border=True):
-            st.subheader("🚀 Transmigrasi User")
-            st.info("Pindahkan user ke angkatan baru tanpa menghapus data SKD lama.")
-            
-            user_list_trans = [u["nama"] for u in users if u.get("role") == "user"]
-            
-            if user_list_trans:
-                col_t1, col_t2 = st.columns(2)
-                with col_t1:
-                    user_nama_trans = st.selectbox(
-                        "Pilih User", 
-                        user_list_trans, 
-                        key="trans_user_select",
-                        index=None if len(user_list_trans) > 4 or not user_list_trans else 0,
-                        placeholder="Cari & pilih nama user..." if len(user_list_trans) > 4 else None
-                    )
-                with col_t2:
-                    year_now = datetime.date.today().year
-                    year_trans = st.selectbox("Tahun Transmigrasi", [year_now, year_now + 1], key="trans_year_select")
-                
-                if st.button("Transmigrasi User", use_container_width=True, type="primary", disabled=not user_nama_trans):
-                    user_to_trans = next(u for u in users if u["nama"] == user_nama_trans)
-                    st.session_state.pending_transmigrasi = {
-                        "id": user_to_trans["id"],
-                        "nama": user_nama_trans,
-                        "tahun": year_trans
-                    }
-                    confirm_update_dialog(
-                        f"Pindahkan {user_nama_trans} ke angkatan {year_trans}?", 
-                        "do_transmigrasi_user"
-                    )
-
-                if st.session_state.get("do_transmigrasi_user"):
-                    pt = st.session_state.pending_transmigrasi
-                    supabase.table("users").update({
-                        "tahun_aktif": pt["tahun"],
-                        "tahun_transmigrasi": pt["tahun"]
-                    }).eq("id", pt["id"]).execute()
-                    
-                    st.session_state.toast_msg = f"User {pt['nama']} berhasil dipindahkan ke angkatan {pt['tahun']}"
-                    del st.session_state.do_transmigrasi_user
-                    del st.session_state.pending_transmigrasi
-                    st.rerun()
-            else:
-                st.info("Tidak ada user untuk ditransmigrasi.")
-
-    with tab2:
-        # Input Nilai SKD User (Admin)
-        with st.container(border=True):
-            st.subheader("Input Nilai SKD User")
-            if users:
-                nama_list_input_score = [u["nama"] for u in users if u["role"] != "admin"]
-                if nama_list_input_score:
-                    nama_pilih_input = st.selectbox(
-                        "Pilih User untuk input nilai", 
-                        nama_list_input_score, 
-                        key="admin_input_score_user",
-                        index=None if len(nama_list_input_score) > 4 or not nama_list_input_score else 0,
-                        placeholder="Cari & pilih nama user..." if len(nama_list_input_score) > 4 else None
-                    )
-                    
-                    if nama_pilih_input:
-                        user_pilih_input = next(u for u in users if u["nama"] == nama_pilih_input)
-                        
-                        with st.form("admin_input_nilai_form"):
-                            ai_twk = st.number_input("TWK", min_value=0, value=0)
-                            ai_tiu = st.number_input("TIU", min_value=0, value=0)
-                            ai_tkp = st.number_input("TKP", min_value=0, value=0)
-                            submitted_admin_input_score = st.form_submit_button("Simpan Nilai User")
-
-                        if submitted_admin_input_score:
-                            ai_total = ai_twk + ai_tiu + ai_tkp
-                            st.session_state.pending_admin_score_input = {
-                                "user_id": user_pilih_input["id"],
-                                "twk": ai_twk,
-                                "tiu": ai_tiu,
-                                "tkp": ai_tkp,
-                                "total": ai_total,
-                                "nama": nama_pilih_input
-                            }
-                            confirm_update_dialog(f"Simpan nilai untuk {nama_pilih_input}?", "do_input_admin_score")
-
-                        if st.session_state.get("do_input_admin_score"):
-                            ps_in = st.session_state.pending_admin_score_input
-                            supabase.table("scores").insert({
-                                "user_id": ps_in["user_id"],
-                                "twk": ps_in["twk"],
-                                "tiu": ps_in["tiu"],
-                                "tkp": ps_in["tkp"],
-                                "total": ps_in["total"]
-                            }).execute()
-                            
-                            st.session_state.toast_msg = f"Nilai {ps_in['nama']} berhasil disimpan"
-                            del st.session_state.do_input_admin_score
-                            del st.session_state.pending_admin_score_input
-                            st.rerun()
-                else:
-                    st.info("Belum ada user untuk diinput nilainya.")
-            else:
-                st.info("Belum ada user di database.")
-
-        st.markdown("---")
-
-        # Edit Nilai SKD User (Admin)
-        with st.container(border=True):
-            st.subheader("Edit Nilai SKD User")
-            if users:
-                nama_list_score = [u["nama"] for u in users if u["role"] != "admin"]
-                if nama_list_score:
-                    nama_pilih_score = st.selectbox(
-                        "Pilih User untuk diedit nilainya", 
-                        nama_list_score, 
-                        key="admin_edit_score_user",
-                        index=None if len(nama_list_score) > 4 or not nama_list_score else 0,
-                        placeholder="Cari & pilih nama user..." if len(nama_list_score) > 4 else None
-                    )
-                    
-                    if nama_pilih_score:
-                        user_pilih_score = next(u for u in users if u["nama"] == nama_pilih_score)
-                        user_scores = fetch_user_scores(user_pilih_score["id"])
-                        
-                        if user_scores:
-                            df_user_scores = pd.DataFrame(user_scores)
-                            if "created_at" in df_user_scores.columns:
-                                df_user_scores = df_user_scores.sort_values("created_at")
-                            df_user_scores["skd_ke"] = range(1, len(df_user_scores) + 1)
-                            
-                            edit_options_admin = [f"SKD ke-{row['skd_ke']}" for _, row in df_user_scores.iterrows()]
-                            pilih_skd_admin = st.selectbox(
-                                "Pilih Percobaan (Minggu)", 
-                                edit_options_admin, 
-                                key="admin_edit_score_week",
-                                index=None if len(edit_options_admin) > 4 else 0,
-                                placeholder="Cari & pilih SKD..." if len(edit_options_admin) > 4 else None
-                            )
-                            
-                            if pilih_skd_admin:
-                                idx_pilih_admin = int(pilih_skd_admin.split("-")[-1])
-                                data_pilih_admin = df_user_scores[df_user_scores["skd_ke"] == idx_pilih_admin].iloc[0]
-
-                                with st.form("admin_edit_nilai_form"):
-                                    ae_twk = st.number_input("Update TWK", min_value=0, value=int(data_pilih_admin["twk"]))
-                                    ae_tiu = st.number_input("Update TIU", min_value=0, value=int(data_pilih_admin["tiu"]))
-                                    ae_tkp = st.number_input("Update TKP", min_value=0, value=int(data_pilih_admin["tkp"]))
-                                    submitted_admin_edit_score = st.form_submit_button("Simpan Perubahan Nilai User")
-
-                                if submitted_admin_edit_score:
-                                    ae_total = ae_twk + ae_tiu + ae_tkp
-                                    st.session_state.pending_admin_score_edit = {
-                                        "twk": ae_twk,
-                                        "tiu": ae_tiu,
-                                        "tkp": ae_tkp,
-                                        "total": ae_total,
-                                        "id": data_pilih_admin["id"],
-                                        "nama": nama_pilih_score,
-                                        "pilih_skd": pilih_skd_admin
-                                    }
-                                    confirm_update_dialog(f"Simpan perubahan nilai untuk {nama_pilih_score} ({pilih_skd_admin})?", "do_update_admin_score")
-
-                                if st.session_state.get("do_update_admin_score"):
-                                    ps = st.session_state.pending_admin_score_edit
-                                    supabase.table("scores").update({
-                                        "twk": ps["twk"],
-                                        "tiu": ps["tiu"],
-                                        "tkp": ps["tkp"],
-                                        "total": ps["total"]
-                                    }).eq("id", ps["id"]).execute()
-                                    
-                                    st.session_state.toast_msg = f"Nilai {ps['nama']} berhasil diperbarui"
-                                    del st.session_state.do_update_admin_score
-                                    del st.session_state.pending_admin_score_edit
-                                    st.rerun()
-                        else:
-                            st.info("User ini belum memiliki riwayat nilai.")
-                else:
-                    st.info("Belum ada user untuk diedit nilainya.")
-
-        st.markdown("---")
-
-        # Hapus Nilai SKD User (Admin)
-        with st.container(border=True):
-            st.subheader("Hapus Nilai SKD User")
-            if users:
-                nama_list_del_score = [u["nama"] for u in users if u["role"] != "admin"]
-                if nama_list_del_score:
-                    nama_pilih_del_score = st.selectbox(
-                        "Pilih User untuk dihapus nilainya", 
-                        nama_list_del_score, 
-                        key="admin_delete_score_user",
-                        index=None if len(nama_list_del_score) > 4 or not nama_list_del_score else 0,
-                        placeholder="Cari & pilih nama user..." if len(nama_list_del_score) > 4 else None
-                    )
-                    
-                    if nama_pilih_del_score:
-                        user_pilih_del_score = next(u for u in users if u["nama"] == nama_pilih_del_score)
-                        user_scores = fetch_user_scores(user_pilih_del_score["id"])
-                        
-                        if user_scores:
-                            df_user_scores_del = pd.DataFrame(user_scores)
-                            if "created_at" in df_user_scores_del.columns:
-                                df_user_scores_del = df_user_scores_del.sort_values("created_at")
-                            df_user_scores_del["skd_ke"] = range(1, len(df_user_scores_del) + 1)
-                            
-                            del_options_admin = [f"SKD ke-{row['skd_ke']}" for _, row in df_user_scores_del.iterrows()]
-                            pilih_skd_del_admin = st.selectbox(
-                                "Pilih Percobaan yang akan dihapus", 
-                                del_options_admin, 
-                                key="admin_delete_score_week",
-                                index=None if len(del_options_admin) > 4 else 0,
-                                placeholder="Cari & pilih SKD..." if len(del_options_admin) > 4 else None
-                            )
-                            
-                            if pilih_skd_del_admin:
-                                idx_pilih_del_admin = int(pilih_skd_del_admin.split("-")[-1])
-                                data_pilih_del_admin = df_user_scores_del[df_user_scores_del["skd_ke"] == idx_pilih_del_admin].iloc[0]
-
-                                if st.button(f"Hapus {pilih_skd_del_admin} untuk {nama_pilih_del_score}", key="btn_del_score"):
-                                    confirm_delete_dialog(f"Hapus {pilih_skd_del_admin} untuk {nama_pilih_del_score}?", "do_delete_admin_score")
-
-                                if st.session_state.get("do_delete_admin_score"):
-                                    supabase.table("scores").delete().eq("id", data_pilih_del_admin["id"]).execute()
-                                    st.session_state.toast_msg = f"Nilai {pilih_skd_del_admin} untuk {nama_pilih_del_score} berhasil dihapus"
-                                    del st.session_state.do_delete_admin_score
-                                    st.rerun()
-                        else:
-                            st.info("User ini belum memiliki riwayat nilai.")
-                else:
-                    st.info("Belum ada user untuk dihapus nilainya.")
-
-
-def user_self_page(user: dict):
-    st.header("📑 Profil & Nilai Saya")
-    
-    tab1, tab2 = st.tabs(["📊 Kelola Nilai", "👥 Kelola Akun"])
-    
-    with tab1:
-        with st.container(border=True):
-            st.write(f"Nama: **{user.get('nama')}**")
-            st.write(f"Role: **{user.get('role', 'user')}**")
-            # Tampilkan informasi angkatan
-            col1, col2 = st.columns(2)
-            with col1:
-                st.write(f"Tahun Masuk: **{user.get('tahun_masuk', '-')}**")
-            with col2:
-                st.write(f"Tahun Aktif: **{user.get('tahun_aktif', '-')}**")
-
-        st.markdown("---")
-        
-        with st.container(border=True):
-            st.subheader("Input Nilai SKD")
-
-            latest = fetch_latest_score(user["id"])
-            current_twk = (latest or {}).get("twk") or 0
-            current_tiu = (latest or {}).get("tiu") or 0
-            current_tkp = (latest or {}).get("tkp") or 0
-
-            with st.form("update_nilai_saya"):
-                twk = st.number_input("TWK", min_value=0, value=int(current_twk))
-                tiu = st.number_input("TIU", min_value=0, value=int(current_tiu))
-                tkp = st.number_input("TKP", min_value=0, value=int(current_tkp))
-                submitted_nilai = st.form_submit_button("Simpan Nilai")
-
-        if submitted_nilai:
-            total = twk + tiu + tkp
-            try:
-                # Simpan sebagai percobaan baru di tabel scores
-                supabase.table("scores").insert(
-                    {
-                        "user_id": user["id"],
-                        "twk": twk,
-                        "tiu": tiu,
-                        "tkp": tkp,
-                        "total": total,
-                    }
-                ).execute()
-
-                # update juga di session supaya tampilan langsung ikut berubah
-                user.update({"twk": twk, "tiu": tiu, "tkp": tkp, "total": total})
-                st.session_state.user = user
-
-                st.session_state.toast_msg = "Nilai berhasil disimpan"
-                st.rerun()
-            except Exception as e:
-                error_msg = str(e)
-                if "23502" in error_msg or "violates not-null constraint" in error_msg:
-                    st.error("Gagal menyimpan: Konfigurasi Database (ID Default) belum diset di Supabase. Silakan periksa tabel 'scores'.")
-                else:
-                    st.error(f"Gagal menyimpan nilai: {e}")
-
-        st.markdown("---")
-
-        scores = fetch_user_scores(user["id"])
-        if scores:
-            df_scores = pd.DataFrame(scores)
-            if "created_at" in df_scores.columns:
-                df_scores = df_scores.sort_values("created_at")
-            df_scores["skd_ke"] = range(1, len(df_scores) + 1)
-            
-            with st.container(border=True):
-                # Tampilkan riwayat
-                st.subheader("Riwayat Nilai SKD")
-                cols = [c for c in ["skd_ke", "twk", "tiu", "tkp", "total"] if c in df_scores.columns]
-                st.dataframe(df_scores[cols], use_container_width=True, hide_index=True)
-
-            st.markdown("---")
-            with st.container(border=True):
-                st.subheader("Edit Nilai Percobaan (SKD ke-n)")
-                
-                edit_options = [f"SKD ke-{row['skd_ke']}" for _, row in df_scores.iterrows()]
-                pilih_edit = st.selectbox(
-                    "Pilih Percobaan yang Ingin Diubah", 
-                    edit_options,
-                    index=None if len(edit_options) > 4 else 0,
-                    placeholder="Cari & pilih SKD..." if len(edit_options) > 4 else None
-                )
-                
-                if pilih_edit:
-                    idx_pilih = int(pilih_edit.split("-")[-1])
-                    data_pilih = df_scores[df_scores["skd_ke"] == idx_pilih].iloc[0]
-
-                    with st.form("edit_nilai_user"):
-                        e_twk = st.number_input("Update TWK", min_value=0, value=int(data_pilih["twk"]))
-                        e_tiu = st.number_input("Update TIU", min_value=0, value=int(data_pilih["tiu"]))
-                        e_tkp = st.number_input("Update TKP", min_value=0, value=int(data_pilih["tkp"]))
-                        submitted_edit_score = st.form_submit_button("Simpan Perubahan Nilai")
-
-                    if submitted_edit_score:
-                        e_total = e_twk + e_tiu + e_tkp
-                        st.session_state.pending_user_score_edit = {
-                            "twk": e_twk,
-                            "tiu": e_tiu,
-                            "tkp": e_tkp,
-                            "total": e_total,
-                            "id": data_pilih["id"],
-                            "pilih_edit": pilih_edit
-                        }
-                        confirm_update_dialog(f"Simpan perubahan untuk {pilih_edit}?", "do_update_user_score")
-
-                    if st.session_state.get("do_update_user_score"):
-                        pus = st.session_state.pending_user_score_edit
-                        supabase.table("scores").update({
-                            "twk": pus["twk"],
-                            "tiu": pus["tiu"],
-                            "tkp": pus["tkp"],
-                            "total": pus["total"]
-                        }).eq("id", pus["id"]).execute()
-                        
-                        st.session_state.toast_msg = f"Berhasil memperbarui {pus['pilih_edit']}"
-                        del st.session_state.do_update_user_score
-                        del st.session_state.pending_user_score_edit
-                        st.rerun()
-
-        else:
-            st.info("Belum ada riwayat nilai. Silakan input nilai pertama Anda.")
-
-    with tab2:
-        with st.container(border=True):
-            st.write(f"Nama: **{user.get('nama')}**")
-            st.write(f"Role: **{user.get('role', 'user')}**")
-            # Tampilkan informasi angkatan
-            col1, col2 = st.columns(2)
-            with col1:
-                st.write(f"Tahun Masuk: **{user.get('tahun_masuk', '-')}**")
-            with col2:
-                st.write(f"Tahun Aktif: **{user.get('tahun_aktif', '-')}**")
-
-        st.markdown("---")
-        
-        # Edit Password
-        with st.container(border=True):
-            st.subheader("Edit Password")
-            with st.form("user_edit_pass"):
-                new_password = st.text_input("Password baru (kosongkan jika tidak diubah)", type="password")
-                submitted_pass = st.form_submit_button("Simpan Perubahan Password")
-            
-            if submitted_pass:
-                if new_password:
-                    password_hash = bcrypt.hashpw(
-                        new_password.encode("utf-8"), bcrypt.gensalt()
-                    ).decode("utf-8")
-                    st.session_state.pending_password_update = password_hash
-                    confirm_update_dialog("Apakah Anda yakin ingin mengubah password?", "do_update_password")
-                else:
-                    st.info("Masukkan password baru jika ingin mengubah.")
-
-            if st.session_state.get("do_update_password"):
-                supabase.table("users").update({"password": st.session_state.pending_password_update}).eq("id", user["id"]).execute()
-                st.session_state.toast_msg = "Password berhasil diupdate"
-                del st.session_state.do_update_password
-                del st.session_state.pending_password_update
-                st.rerun()
-
-
-def prepare_admin_data():
-    """Mengambil dan menyiapkan data untuk dashboard admin."""
-    users = fetch_all_users()
-    scores = fetch_all_scores()
-
-    if not users:
-        return None
-
-    df_users = pd.DataFrame(users)
-    if "role" not in df_users.columns:
-        df_users["role"] = "user"
-    
-    # Hitung total admin secara global (sebelum filter tahun)
-    total_admin = len(df_users[df_users["role"] == "admin"])
-    
-    # Apply Global Filter Tahun Aktif
-    year_now = datetime.date.today().year
-    filter_tahun = st.session_state.get("filter_tahun_aktif")
-    if filter_tahun is None: filter_tahun = year_now
-    
-    if filter_tahun != "Semua":
-        if "tahun_aktif" in df_users.columns:
-            df_users = df_users[df_users["tahun_aktif"] == filter_tahun].copy()
-        
-    total_user = len(df_users[df_users["role"] == "user"])
-    
-    df = pd.DataFrame()
-    if scores:
-        df_scores = pd.DataFrame(scores)
-        for col in ["twk", "tiu", "tkp"]:
-            if col not in df_scores.columns:
-                df_scores[col] = 0
-            df_scores[col] = pd.to_numeric(df_scores[col], errors="coerce").fillna(0)
-        
-        df_scores["total"] = df_scores["twk"].astype(float) + df_scores["tiu"].astype(float) + df_scores["tkp"].astype(float)
-
-        # Tambahkan kolom tahun ke merge agar data bisa di-filter
-        user_cols = ["id", "nama", "role", "tahun_aktif", "tahun_masuk", "tahun_transmigrasi"]
-        existing_cols = [c for c in user_cols if c in df_users.columns]
-        
-        df = pd.merge(
-            df_scores,
-            df_users[existing_cols],
-            left_on="user_id",
-            right_on="id",
-            how="inner"
-        )
-
-        if "role" in df.columns:
-            df = df[df["role"] != "admin"]
-
-        if not df.empty:
-            if "created_at" in df.columns:
-                df = df.sort_values(["user_id", "created_at"])
-            else:
-                df = df.sort_values(["user_id"])
-            
-            df["skd_ke"] = df.groupby("user_id").cumcount() + 1
-            
-    return {
-        "df_users": df_users,
-        "total_user": total_user,
-        "total_admin": total_admin,
-        "scores": scores,
-        "df": df
-    }
-
-
-def admin_dashboard_summary():
-    st.header("📈 Beranda")
-    data = prepare_admin_data()
-    if not data:
-        st.info("Belum ada data user.")
-        return
-
-    df_users = data["df_users"]
-    total_user = data["total_user"]
-    total_admin = data["total_admin"]
-    df = data["df"]
-    
-    total_skd_max = 0
-    score_summary = pd.DataFrame(columns=["user_id", "total_skd", "max_score"])
-
-    if not df.empty:
-        total_skd_max = df["skd_ke"].max()
-        score_summary = df.groupby("user_id").agg(
-            total_skd=("skd_ke", "max"),
-            max_score=("total", "max")
-        ).reset_index()
-
-    # --- Bagian Metrics Atas ---
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        with st.container(border=True):
-            st.metric("Total User", total_user)
-    with col2:
-        with st.container(border=True):
-            st.metric("Total Admin", total_admin)
-    with col3:
-        with st.container(border=True):
-            st.metric("SKD Terbanyak", total_skd_max)
-
-    # --- Tabel Ringkasan Aktivitas User ---
-    user_summary_df = df_users[df_users["role"] == "user"][["id", "nama"]].merge(
-        score_summary, left_on="id", right_on="user_id", how="left"
-    )
-    user_summary_df["total_skd"] = user_summary_df["total_skd"].fillna(0).astype(int)
-    user_summary_df["max_score"] = user_summary_df["max_score"].fillna(0).astype(int)
-    user_summary_df = user_summary_df[["nama", "total_skd", "max_score"]].sort_values("max_score", ascending=False)
-    user_summary_df.columns = ["Nama User", "Total SKD", "Nilai Tertinggi"]
-    
-    with st.container(border=True):
-        st.subheader("📊 Ringkasan Aktivitas User")
-        st.dataframe(user_summary_df, use_container_width=True, hide_index=True)
-
-
-def admin_grafik_nilai():
-    st.header("📊 Visualisasi Data")
-    data = prepare_admin_data()
-    if not data:
-        st.info("Belum ada data user.")
-        return
-    
-    scores = data["scores"]
-    df = data["df"]
-
-    if not scores:
-        st.info("Belum ada data nilai (scores) di database.")
-        return
-
-    if df.empty:
-        st.warning("Tidak ada data nilai dari user (non-admin).")
-        return
-
-    # Filter Pilihan User
-    user_list = ["Semua User"] + sorted(df["nama"].unique().tolist())
-    pilih_user = st.selectbox(
-        "Pilih User", 
-        user_list,
-        index=None if len(user_list) > 4 else 0,
-        placeholder="Cari & pilih nama user..." if len(user_list) > 4 else None
-    )
-
-    if not pilih_user:
-        st.info("Silakan pilih user untuk melihat grafik.")
-        return
-
-    if pilih_user != "Semua User":
-        max_skd = int(df[df["nama"] == pilih_user]["skd_ke"].max()) if not df.empty else 0
-    else:
-        max_skd = int(df["skd_ke"].max()) if not df.empty else 0
-
-    options = ["Terakhir", "Semua", "Rentang"] + [f"SKD ke-{i}" for i in range(1, max_skd + 1)]
-    
-    default_skd_idx = 1 if pilih_user != "Semua User" else 0
-    pilih_skd = st.selectbox(
-        "Pilih Percobaan SKD (Attempt)", 
-        options, 
-        index=None if len(options) > 4 else default_skd_idx,
-        placeholder="Cari & pilih percobaan..." if len(options) > 4 else None
-    )
-
-    if not pilih_skd:
-        return
-
-    if pilih_user != "Semua User":
-        df = df[df["nama"] == pilih_user]
-
-    # Main Filtering for UI Display
-    if pilih_skd == "Rentang":
-        st.markdown("### 🔍 Filter Rentang")
-        col_r1, col_r2 = st.columns(2)
-        with col_r1:
-            r_dari = st.number_input("Dari SKD ke-", min_value=1, max_value=max_skd, value=1, key="admin_r_dari")
-        with col_r2:
-            r_sampai = st.number_input("Sampai SKD ke-", min_value=r_dari, max_value=max_skd, value=max_skd, key="admin_r_sampai")
-
-        filtered = df[(df["skd_ke"] >= r_dari) & (df["skd_ke"] <= r_sampai)].copy()
-        filtered = filtered.sort_values(["skd_ke", "nama"])
-        st.subheader(f"Data SKD Rentang ke-{r_dari} sampai {r_sampai}")
-    elif pilih_skd == "Terakhir":
-        show_this_week = st.radio("Filter Waktu:", ["Semua", "Minggu Ini"], horizontal=True, key="admin_grafik_time_filter")
-        
-        target_df = df.copy()
-        if show_this_week == "Minggu Ini" and "created_at" in target_df.columns:
-            target_df['created_at_dt'] = pd.to_datetime(target_df['created_at'])
-            today = datetime.date.today()
-            monday = today - datetime.timedelta(days=today.weekday())
-            target_df = target_df[target_df['created_at_dt'].dt.date >= monday]
-
-        if "created_at" in target_df.columns:
-            filtered = target_df.sort_values("created_at").groupby("user_id").tail(1).copy()
-        else:
-            filtered = target_df.groupby("user_id").tail(1).copy()
-            
-        st.subheader("Data SKD Terakhir Setiap User" + (" (Minggu Ini)" if show_this_week == "Minggu Ini" else ""))
-    elif pilih_skd == "Semua":
-        filtered = df.copy()
-        filtered = filtered.sort_values(["skd_ke", "nama"])
-        st.subheader("Semua Riwayat Data SKD")
-    else:
-        try:
-            n = int(pilih_skd.split("-")[-1])
-            filtered = df[df["skd_ke"] == n].copy()
-            st.subheader(f"Data SKD Percobaan ke-{n}")
-        except:
-            filtered = df.copy()
-
-    if filtered.empty:
-        st.warning(f"Tidak ada data for filter: {pilih_skd}")
-        return
-
-    # Pastikan filtered adalah copy untuk menghindari SettingWithCopyWarning
-    filtered = filtered.copy()
-
-    # Label for UI Chart
-    if pilih_skd in ["Semua", "Rentang"]:
-        if pilih_user == "Semua User":
-            filtered["label"] = filtered["nama"] + " (SKD " + filtered["skd_ke"].astype(str) + ")"
-        else:
-            filtered["label"] = "SKD ke-" + filtered["skd_ke"].astype(str)
-    else:
-        filtered["label"] = filtered["nama"]
-
-    # Tampilkan Tabel UI
-    with st.container(border=True):
-        st.subheader("Data Riwayat SKD")
-        cols_to_show = ["nama", "skd_ke", "twk", "tiu", "tkp", "total"]
-        st.dataframe(filtered[cols_to_show], use_container_width=True, hide_index=True)
-
-    with st.container(border=True):
-        st.subheader("Grafik Komponen Nilai")
-        fig1 = render_skd_chart(filtered, f"Komponen Nilai SKD ({pilih_skd})", is_component=True)
-        if fig1:
-            st.pyplot(fig1)
-
-    with st.container(border=True):
-        st.subheader("Grafik Total Nilai")
-        fig2 = render_skd_chart(filtered, f"Total Nilai SKD ({pilih_skd})", is_component=False)
-        if fig2:
-            st.pyplot(fig2)
-
-
-def render_laporan_page(user, role):
-    """Halaman Laporan dan Cetak khusus untuk download file laporan A4."""
-    st.header("🖨️ Cetak Laporan")
-    
-    if role == "admin":
-        data = prepare_admin_data()
-        if not data:
-            st.info("Belum ada data user.")
-            return
-
-        if data["df"].empty:
-            st.warning("Tidak ada data nilai user untuk dibuat laporan.")
-        else:
-            df = data["df"]
-            user_list = ["Semua User"] + sorted(df["nama"].unique().tolist())
-            pilih_user_rep = st.selectbox(
-                "Pilih User untuk Laporan", 
-                user_list,
-                index=None if len(user_list) > 4 else 0,
-                placeholder="Cari & pilih nama user..." if len(user_list) > 4 else None
-            )
-            
-            if not pilih_user_rep:
-                st.info("Silakan pilih user untuk membuat laporan.")
-                return
-
-            if pilih_user_rep == "Semua User":
-                _render_all_users_report_ui(df)
-            else:
-                df_target = df[df["nama"] == pilih_user_rep].copy()
-                _render_individual_report_ui(df_target, pilih_user_rep)
-    else:
-        scores = fetch_user_scores(user["id"])
-        if not scores:
-            st.info("Belum ada data nilai. Silakan input nilai terlebih dahulu di menu Profil.")
-            return
-        df_target = pd.DataFrame(scores)
-        if "created_at" in df_target.columns:
-            df_target = df_target.sort_values("created_at")
-        df_target["skd_ke"] = range(1, len(df_target) + 1)
-        pilih_user_rep = user.get("nama")
-        _render_individual_report_ui(df_target, pilih_user_rep)
+def inject_app_css():
+    """Glass sidebar & navigasi pill (hanya untuk halaman setelah login)."""
+    st.markdown(
+        """
+        <style>
+        /* Modern Glass Sidebar */
+        [data-testid="stSidebar"] {
+            background-color: rgba(203, 213, 225, 0.5) !important;
+            backdrop-filter: blur(20px) !important;
+            -webkit-backdrop-filter: blur(20px) !important;
+            border-right: 1px solid rgba(255, 255, 255, 0.4) !important;
+            box-shadow: 4px 0 20px rgba(0,0,0,0.05) !important;
+            z-index: 1000001 !important;
+            transition: transform 0.3s ease !important;
+        }
 
+        /* Always show sidebar collapse button (<<) */
+        [data-testid="stSidebar"] [data-testid="stBaseButton-headerNoPadding"] {
+            opacity: 1 !important;
+            visibility: visible !important;
+            color: #1E293B !important;
+        }
 
-def _render_all_users_report_ui(df_all):
-    """Helper untuk menampilkan UI laporan untuk semua user per SKD."""
-    st.subheader("📊 Laporan Semua User")
-    
-    max_skd_global = int(df_all["skd_ke"].max())
-    skd_options = [f"SKD ke-{i}" for i in range(1, max_skd_global + 1)] + ["SKD Terakhir"]
-    
-    pilih_skd = st.selectbox(
-        "Pilih Percobaan SKD", 
-        skd_options, 
-        index=None if len(skd_options) > 4 else len(skd_options)-1,
-        placeholder="Cari & pilih percobaan..." if len(skd_options) > 4 else None
-    )
-    
-    if not pilih_skd:
-        return
+        /* Force Sidebar Text Color */
+        [data-testid="stSidebar"] [data-testid="stWidgetLabel"] p,
+        [data-testid="stSidebar"] .stMarkdown p,
+        [data-testid="stSidebar"] label p {
+            color: #1E293B !important;
+            font-weight: 600 !important;
+        }
 
-    if pilih_skd == "SKD Terakhir":
-        show_this_week_rep = st.radio("Filter Waktu:", ["Semua", "Minggu Ini"], horizontal=True, key="admin_time_filter_rep")
+        /* Prevent content shift */
+        [data-testid="stAppViewContainer"] section[data-testid="stMain"] {
+            width: 100% !important;
+            margin-left: 0 !important;
+            padding-left: 0 !important;
+        }
         
-        target_df = df_all.copy()
-        time_suffix = ""
-        file_suffix = ""
-        if show_this_week_rep == "Minggu Ini" and "created_at" in target_df.columns:
-            target_df['created_at_dt'] = pd.to_datetime(target_df['created_at'])
-            today = datetime.date.today()
-            monday = today - datetime.timedelta(days=today.weekday())
-            target_df = target_df[target_df['created_at_dt'].dt.date >= monday]
-            time_suffix = " (Minggu Ini)"
-            file_suffix = "_minggu_ini"
-
-        # Ambil data terakhir untuk setiap user (berdasarkan skd_ke terbanyak)
-        report_df = target_df.sort_values(["user_id", "skd_ke"]).groupby("user_id").tail(1).copy()
-        report_title = f"Laporan Semua User: SKD Terakhir{time_suffix}"
-        filename_base = f"laporan_skd_semua_user_terakhir{file_suffix}"
-    else:
-        n = int(pilih_skd.split("-")[-1])
-        report_df = df_all[df_all["skd_ke"] == n].copy()
-        report_title = f"Laporan Semua User: SKD ke-{n}"
-        filename_base = f"laporan_skd_semua_user_ke_{n}"
-
-    if report_df.empty:
-        st.warning(f"Tidak ada data untuk {pilih_skd}")
-        return
-
-    # Siapkan label untuk grafik
-    report_df["label"] = report_df["nama"]
-    
-    with st.container(border=True):
-        st.subheader("Pratinjau Data")
-        cols = ["nama", "skd_ke", "twk", "tiu", "tkp", "total"]
-        st.dataframe(report_df[cols].sort_values("total", ascending=False), use_container_width=True, hide_index=True)
-
-        st.markdown("---")
-        # Tombol Download Laporan PNG
-        col_btn1, col_btn2 = st.columns(2)
-        with col_btn1:
-            report_table = render_report_page(report_df, report_title, "table")
-            if report_table:
-                st.download_button(
-                    label="📄 Download Tabel (PNG)",
-                    data=report_table,
-                    file_name=f"{filename_base}_tabel.png",
-                    mime="image/png",
-                    use_container_width=True,
-                    key="btn_dl_table_all"
-                )
-        with col_btn2:
-            report_charts = render_report_page(report_df, report_title, "charts")
-            if report_charts:
-                st.download_button(
-                    label="📊 Download Grafik (PNG)",
-                    data=report_charts,
-                    file_name=f"{filename_base}_grafik.png",
-                    mime="image/png",
-                    use_container_width=True,
-                    key="btn_dl_charts_all"
-                )
-
+        /* Sidebar Expanded State Backdrop */
+        [data-testid="stSidebar"][aria-expanded="true"] ~ section[data-testid="stMain"]::before {
+            content: "";
+            position: fixed;
+            top: 0; left: 0; right: 0; bottom: 0;
+            background: rgba(0,0,0,0.1);
+            z-index: 99999;
+            pointer-events: none;
+        }
 
-def _render_individual_report_ui(df_target, pilih_user):
-    """Helper untuk menampilkan UI laporan individu."""
-    max_skd = len(df_target)
-    df_target["label"] = "SKD ke-" + df_target["skd_ke"].astype(str)
-    
-    with st.container(border=True):
-        st.subheader("🔍 Tentukan Rentang Data")
-        st.info(f"Jumlah data: {max_skd}. Untuk hasil terbaik (A4), laporan dibatasi maksimal 15 data per halaman.")
-        
-        col_r1, col_r2 = st.columns(2)
-        with col_r1:
-            default_dari = max(1, max_skd - 14)
-            r_dari = st.number_input("Dari SKD ke-", min_value=1, max_value=max_skd, value=default_dari, key=f"rep_r_dari_{pilih_user}")
-        with col_r2:
-            max_val = min(r_dari + 14, max_skd)
-            r_sampai = st.number_input("Sampai SKD ke-", min_value=r_dari, max_value=max_val, value=max_val, key=f"rep_r_sampai_{pilih_user}")
+        /* Sidebar Navigation Styling (Pills) */
+        [data-testid="stSidebar"] [data-testid="stWidgetLabel"] {
+            display: none;
+        }
         
-        st.success(f"💡 Rentang Laporan: SKD ke-{r_dari} sampai ke-{r_sampai}")
+        [data-testid="stSidebarNav"] {
+            padding: 20px 10px;
+        }
 
-    report_df = df_target[(df_target["skd_ke"] >= r_dari) & (df_target["skd_ke"] <= r_sampai)].copy()
+        [data-testid="stSidebarNavLink"] {
+            background-color: transparent !important;
+            padding: 10px 20px !important;
+            border-radius: 24px !important;
+            margin-bottom: 8px !important;
+            transition: all 0.2s ease !important;
+        }
 
-    with st.container(border=True):
-        st.subheader(f"Pratinjau Data: {pilih_user}")
-        cols = ["skd_ke", "twk", "tiu", "tkp", "total"]
-        st.dataframe(report_df[cols], use_container_width=True, hide_index=True)
+        [data-testid="stSidebarNavLink"] span {
+            font-size: 15px !important;
+            font-weight: 600 !important;
+            color: #1E293B !important;
+        }
 
-        st.markdown("---")
-        # Tombol Download Laporan PNG
-        report_title = f"Laporan Hasil SKD: {pilih_user} (SKD {r_dari}-{r_sampai})"
-        filename_base = f"laporan_skd_{pilih_user}_{r_dari}_{r_sampai}".replace(" ", "_")
+        [data-testid="stSidebarNavLink"]:hover {
+            background-color: rgba(0, 0, 0, 0.03) !important;
+        }
         
-        col_btn1, col_btn2 = st.columns(2)
-        with col_btn1:
-            report_table = render_report_page(report_df, report_title, "table")
-            if report_table:
-                st.download_button(
-                    label="📄 Download Tabel (PNG)",
-                    data=report_table,
-                    file_name=f"{filename_base}_tabel.png",
-                    mime="image/png",
-                    use_container_width=True,
-                    key=f"btn_dl_table_{pilih_user}"
-                )
-        with col_btn2:
-            report_charts = render_report_page(report_df, report_title, "charts")
-            if report_charts:
-                st.download_button(
-                    label="📊 Download Grafik (PNG)",
-                    data=report_charts,
-                    file_name=f"{filename_base}_grafik.png",
-                    mime="image/png",
-                    use_container_width=True,
-                    key=f"btn_dl_charts_{pilih_user}"
-                )
-    
-
-
-def user_personal_dashboard(user: dict):
-    """Dashboard khusus user: hanya lihat nilai miliknya sendiri."""
-    st.header("📊 Beranda Saya")
-
-    with st.container(border=True):
-        st.write(f"Nama: **{user.get('nama')}**")
-        st.write(f"Role: **{user.get('role', 'user')}**")
-        # Tampilkan informasi angkatan
-        col1, col2 = st.columns(2)
-        with col1:
-            st.write(f"Tahun Masuk: **{user.get('tahun_masuk', '-')}**")
-        with col2:
-            st.write(f"Tahun Aktif: **{user.get('tahun_aktif', '-')}**")
-
-    st.markdown("---")
-
-    scores = fetch_user_scores(user["id"])
-    
-    # --- Bagian Metrics Atas ---
-    total_skd = len(scores)
-    max_score = max([s.get("total", 0) for s in scores]) if scores else 0
-    
-    col1, col2 = st.columns(2)
-    with col1:
-        with st.container(border=True):
-            st.metric("Total SKD Saya", total_skd)
-    with col2:
-        with st.container(border=True):
-            st.metric("Nilai Tertinggi Saya", max_score)
-
-    if not scores:
-        st.info("Belum ada data nilai. Silakan input nilai terlebih dahulu di menu User.")
-        return
-
-    df = pd.DataFrame(scores)
-
-    # Urutkan berdasarkan waktu (kalau ada), lalu beri nomor percobaan "SKD ke-"
-    if "created_at" in df.columns:
-        df = df.sort_values("created_at")
-    df["skd_ke"] = range(1, len(df) + 1)
-    df["label"] = "SKD ke-" + df["skd_ke"].astype(str)
-
-    with st.container(border=True):
-        st.subheader("Riwayat Nilai")
-        cols = [c for c in ["skd_ke", "twk", "tiu", "tkp", "total"] if c in df.columns]
-        st.dataframe(df[cols], use_container_width=True, hide_index=True)
-
-    with st.container(border=True):
-        st.subheader("Grafik Komponen Nilai (Per Percobaan)")
-        fig1 = render_skd_chart(df, "Perkembangan Nilai TWK / TIU / TKP", is_component=True)
-        if fig1:
-            st.pyplot(fig1)
-
-    with st.container(border=True):
-        st.subheader("Grafik Total Nilai")
-        fig2 = render_skd_chart(df, "Perkembangan Total Nilai SKD", is_component=False)
-        if fig2:
-            st.pyplot(fig2)
-
-
-def admin_maintenance():
-    st.header("🛠️ Reset Data")
-    st.warning(
-        "**PERINGATAN:** Menu ini akan menghapus data secara permanen. "
-        "Pastikan Anda benar-benar ingin melakukannya."
+        /* Active Sidebar Item (Pill) */
+        [data-testid="stSidebarNavLink"][aria-current="page"] {
+            background-color: rgba(0, 0, 0, 0.05) !important;
+            box-shadow: inset 0 0 0 1px rgba(0,0,0,0.05) !important;
+        }
+        </style>
+        """,
+        unsafe_allow_html=True,
     )
 
-    st.markdown("""
-    **Aksi yang akan dilakukan:**
-    1. **Menghapus semua data nilai SKD** (tabel `scores`).
-    2. **Menghapus semua akun dengan role 'user'** (tabel `users`).
-    3. **Menyisakan akun admin** agar sistem tetap dapat dikelola.
-    """)
-
-    st.markdown("---")
-    
-    confirm_phrase = "RESET SEMUA DATA"
-    st.write(f"Untuk melanjutkan, silakan ketik kalimat konfirmasi di bawah ini:")
-    st.code(confirm_phrase)
-    
-    input_confirm = st.text_input("Kalimat Konfirmasi", placeholder="Ketik di sini...")
-    
-    # Tombol reset hanya aktif jika input cocok
-    is_confirmed = (input_confirm == confirm_phrase)
-    
-    if st.button("🚀 Jalankan Reset Data Sekarang", disabled=not is_confirmed):
-        confirm_delete_dialog("Yakin ingin menghapus seluruh data score dan user? Tindakan ini permanen!", "do_reset_all_data")
-
-    if st.session_state.get("do_reset_all_data"):
-        with st.spinner("Sedang memproses reset data..."):
-            try:
-                # 1. Hapus semua data scores
-                supabase.table("scores").delete().neq("twk", -1).execute()
-                
-                # 2. Hapus semua user dengan role 'user'
-                supabase.table("users").delete().eq("role", "user").execute()
-                
-                st.session_state.toast_msg = "Semua data berhasil direset"
-                st.balloons()
-                
-                del st.session_state.do_reset_all_data
-                st.rerun()
-            except Exception as e:
-                st.error(f"Terjadi kesalahan saat melakukan reset: {e}")
-
-
-# ======================
-# LOGIN CHECK
-# ======================
-if not login():
-    st.stop()
-
-user = st.session_state.get("user")
-role = user.get("role", "user") if user else "user"
-
-
-# ======================
-# APP UTAMA
-# ======================
-
-# Menu items based on role
-if role == "admin":
-    items = ["Beranda", "Visualisasi Data", "Kelola Pengguna", "Cetak Laporan", "Reset Data"]
-else:
-    items = ["Beranda Saya", "Profil & Nilai Saya", "Cetak Laporan"]
 
-with st.sidebar:
-    menu = st.radio(
-        "Navigation",
-        items,
-        key="menu_radio",
-        label_visibility="collapsed"
+def main():
+    timer = startup.RunTimer(RUN_START)
+    perf.start_run()
+    try:
+        _run_page(timer)
+    finally:
+        # Juga untuk run yang berhenti lewat st.stop() / st.rerun()
+        record = perf.finish_run(st.session_state.get("active_menu") or "login")
+        if record is not None:
+            runs = st.session_state.setdefault("_perf_runs", deque(maxlen=perf.HISTORY_RUNS))
+            runs.append(record)
+
+    # Panel debug (admin) ditampilkan setelah run dicatat, termasuk run ini
+    if st.session_state.get("perf_debug") and (st.session_state.get("user") or {}).get("role") == "admin":
+        import dashboard
+        dashboard.perf_debug_panel(list(st.session_state._perf_runs))
+
+
+def _run_page(timer):
+    # Run pertama sebuah sesi = yang dialami user saat membuka aplikasi
+    first_run = not st.session_state.get("_startup_seen")
+    st.session_state._startup_seen = True
+
+    st.set_page_config(
+        page_title="SKD App",
+        layout="wide",
+        initial_sidebar_state="collapsed"
     )
-    st.session_state.active_menu = menu
-    
-    # Global Filter for Admin
-    if role == "admin":
-        st.markdown("---")
-        st.subheader("🔍 Filter Angkatan")
-        
-        # Ambil semua user untuk mendapatkan daftar tahun_aktif yang unik
-        users_for_filter = fetch_all_users()
-        filter_options = ["Semua"]
-        
-        if users_for_filter:
-            df_u_filter = pd.DataFrame(users_for_filter)
-            if "tahun_aktif" in df_u_filter.columns:
-                # Ambil tahun unik, hilangkan null, urutkan
-                unique_years = df_u_filter["tahun_aktif"].dropna().unique()
-                unique_years = sorted([int(y) for y in unique_years])
-                filter_options.extend(unique_years)
-        
-        year_now = datetime.date.today().year
-        try:
-            default_idx = filter_options.index(year_now)
-        except (ValueError, IndexError):
-            default_idx = 0
-            
-        st.selectbox(
-            "Tahun Aktif",
-            filter_options,
-            index=default_idx,
-            key="filter_tahun_aktif"
-        )
-        
-    logout()
-
-# ======================
-# HALAMAN BERANDA
-# ======================
-if menu in ["Beranda", "Beranda Saya"]:
-    if role == "admin":
-        admin_dashboard_summary()
-    else:
-        user_personal_dashboard(user)
-
-# ======================
-# HALAMAN VISUALISASI DATA
-# ======================
-elif menu == "Visualisasi Data":
-    if role == "admin":
-        admin_grafik_nilai()
-    else:
-        st.error("Hanya Admin yang dapat mengakses halaman ini.")
-
-# ======================
-# HALAMAN KELOLA PENGGUNA / PROFIL & NILAI
-# ======================
-elif menu in ["Kelola Pengguna", "Profil & Nilai Saya"]:
-    if role == "admin":
-        admin_user_management()
-    else:
-        if user is None:
-            st.error("Data user tidak ditemukan di session.")
-        else:
-            user_self_page(user)
-
-# ======================
-# HALAMAN CETAK LAPORAN
-# ======================
-elif menu == "Cetak Laporan":
-    render_laporan_page(user, role)
-
-# ======================
-# HALAMAN RESET DATA
-# ======================
-elif menu == "Reset Data":
-    if role == "admin":
-        admin_maintenance()
-    else:
-        st.error("Hanya Admin yang dapat mengakses halaman ini.")
+    inject_global_css()
+    timer.mark("css")
+
+    # Cek apakah ada notifikasi tertunda di session state
+    if "toast_msg" in st.session_state:
+        show_toast(st.session_state.toast_msg)
+        del st.session_state.toast_msg
+
+    # ======================
+    # LOGIN CHECK
+    # ======================
+    if not login():
+        timer.mark("login_form")
+        if first_run:
+            timer.finish("first_paint", "login")
+        st.stop()
+
+    # Halaman aplikasi (pandas, numpy, Supabase) baru diimpor setelah login
+    first_dashboard = not st.session_state.get("_startup_dashboard_seen")
+    st.session_state._startup_dashboard_seen = True
+    import dashboard
+    timer.mark("import_dashboard")
+
+    user = st.session_state.get("user")
+    role = user.get("role", "user") if user else "user"
+
+    inject_app_css()
+
+    # ======================
+    # APP UTAMA
+    # ======================
+    dashboard.run(user, role)
+    timer.mark("page")
+    if first_dashboard:
+        timer.finish("first_dashboard", st.session_state.get("active_menu"))
+
+
+# Worker process laporan (multiprocessing "spawn") mengimpor ulang file ini
+# sebagai __mp_main__; UI hanya dijalankan saat dieksekusi oleh Streamlit.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+# Passing grade SKD: nilai minimum per komponen (dan opsional total).
+# Aturan bawaan bisa ditimpa / ditambah per tahun lewat file JSON
+# (default passing_grade.json di folder aplikasi, atau env SKD_PASSING_GRADE_FILE):
+#
+#   {
+#     "default": {"twk": 65, "tiu": 80, "tkp": 166},
+#     "2026": {"twk": 65, "tiu": 80, "tkp": 166, "total": 311}
+#   }
+#
+# Kunci tahun dicocokkan dengan kolom tahun_aktif user (angkatan).
+COMPONENTS = ("twk", "tiu", "tkp")
+DEFAULT_PASSING_GRADE = {"twk": 65, "tiu": 80, "tkp": 166, "total": 0}
+
+PASSING_GRADE_FILE = os.getenv(
+    "SKD_PASSING_GRADE_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "passing_grade.json"),
+)
+
+
+def _normalize(rule, base):
+    out = dict(base)
+    for key in (*COMPONENTS, "total"):
+        if rule.get(key) is not None:
+            out[key] = float(rule[key])
+    return out
+
+
+def default_passing_rules():
+    return {"default": _normalize({}, DEFAULT_PASSING_GRADE)}
+
+
+def load_passing_rules(path=PASSING_GRADE_FILE):
+    """
+    Baca aturan passing grade: {"default": {...}, tahun(int): {...}}.
+    Tanpa file, hanya aturan bawaan yang dipakai.
+    """
+    raw = {}
+    try:
+        with open(path) as f:
+            raw = json.load(f)
+    except FileNotFoundError:
+        pass
+
+    default = _normalize(raw.get("default", {}), DEFAULT_PASSING_GRADE)
+    rules = {"default": default}
+    for key, rule in raw.items():
+        if key != "default":
+            rules[int(key)] = _normalize(rule, default)
+    return rules
+
+
+def _thresholds(years, rules):
+    """Array batas per baris untuk setiap komponen, sesuai aturan tahunnya."""
+    n = len(years)
+    default = rules["default"]
+    out = {key: np.full(n, default[key], dtype=float) for key in (*COMPONENTS, "total")}
+    for year, rule in rules.items():
+        if year == "default":
+            continue
+        mask = years == year
+        if mask.any():
+            for key in out:
+                out[key][mask] = rule[key]
+    return out
+
+
+def evaluate_passing(df, rules=None, year_col="tahun_aktif"):
+    """
+    Evaluasi lulus/tidak setiap percobaan (operasi array, tanpa loop per baris).
+    Menambahkan kolom margin_<komponen> (nilai - batas), margin (selisih
+    terkecil; negatif = kurang dari batas) dan lulus (bool).
+    """
+    rules = rules or default_passing_rules()
+    out = df.copy()
+    if out.empty:
+        for key in COMPONENTS:
+            out[f"margin_{key}"] = pd.Series(dtype=float)
+        out["margin"] = pd.Series(dtype=float)
+        out["lulus"] = pd.Series(dtype=bool)
+        return out
+
+    if year_col in out.columns:
+        years = pd.to_numeric(out[year_col], errors="coerce").fillna(-1).to_numpy()
+    else:
+        years = np.full(len(out), -1)
+    limits = _thresholds(years, rules)
+
+    values = {key: pd.to_numeric(out[key], errors="coerce").fillna(0).to_numpy(dtype=float) for key in COMPONENTS}
+    total = values["twk"] + values["tiu"] + values["tkp"]
+
+    # Batas total 0 = tidak dipakai (tidak ikut menentukan margin)
+    total_margin = np.where(limits["total"] > 0, total - limits["total"], np.inf)
+    margins = np.column_stack([values[key] - limits[key] for key in COMPONENTS] + [total_margin])
+    for i, key in enumerate(COMPONENTS):
+        out[f"margin_{key}"] = margins[:, i]
+    out["margin"] = margins.min(axis=1)
+    out["lulus"] = out["margin"].to_numpy() >= 0
+    return out
+
+
+def pass_rates(df_eval, by):
+    """Jumlah percobaan, jumlah lulus, dan persentase kelulusan per kelompok `by`."""
+    if df_eval.empty:
+        return pd.DataFrame(columns=[by, "percobaan", "lulus", "persen_lulus"])
+    grouped = df_eval.groupby(by, sort=True)["lulus"].agg(percobaan="size", lulus="sum").reset_index()
+    grouped["lulus"] = grouped["lulus"].astype(int)
+    grouped["persen_lulus"] = (grouped["lulus"] / grouped["percobaan"] * 100).round(1)
+    return grouped
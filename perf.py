@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import threading
+import datetime
+from contextlib import contextmanager
+from functools import wraps
+
+# Instrumentasi per script run (hanya stdlib, seperti startup.py):
+# - setiap query Supabase (lewat database.supabase.table(...)) dicatat:
+#   tabel, operasi, filter, jumlah baris, perkiraan ukuran payload & latensi;
+# - timer halaman (`timed` / `timer`) untuk fungsi berat seperti
+#   prepare_admin_data dan renderer grafik.
+#
+# main.py memanggil start_run() di awal run dan finish_run() di akhir; satu
+# baris JSON per run ditulis ke LOG_PATH. Di luar run Streamlit (CLI, worker
+# process) pencatatan tidak aktif dan biayanya hanya satu lookup thread-local.
+LOG_PATH = os.getenv(
+    "SKD_PERF_LOG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "perf.jsonl"),
+)
+HISTORY_RUNS = 20
+MAX_FILTER_CHARS = 40
+
+_lock = threading.Lock()
+_local = threading.local()
+
+_OPERATIONS = {"select", "insert", "upsert", "update", "delete"}
+_FILTERS = {
+    "eq", "neq", "gt", "gte", "lt", "lte", "like", "ilike", "is_", "in_",
+    "contains", "order", "range", "limit", "single", "maybe_single",
+}
+
+
+class RunTrace:
+    """Catatan satu script run: daftar query & timer."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = []
+        self.timers = []
+
+    def to_record(self, page):
+        return {
+            "ts": datetime.datetime.now().isoformat(timespec="seconds"),
+            "page": page,
+            "total_ms": round((time.perf_counter() - self.start) * 1000, 1),
+            "query_count": len(self.queries),
+            "query_ms": round(sum(q["ms"] for q in self.queries), 1),
+            "query_kb": round(sum(q["bytes"] for q in self.queries) / 1024, 1),
+            "queries": self.queries,
+            "timers": self.timers,
+        }
+
+
+def current():
+    return getattr(_local, "trace", None)
+
+
+def start_run():
+    """Mulai pencatatan untuk run di thread ini."""
+    _local.trace = RunTrace()
+    return _local.trace
+
+
+def finish_run(page):
+    """Akhiri pencatatan run, tulis satu baris JSON ke LOG_PATH; mengembalikan record (atau None)."""
+    trace = current()
+    if trace is None:
+        return None
+    _local.trace = None
+    record = trace.to_record(page)
+    try:
+        os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+        with _lock, open(LOG_PATH, "a") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+    except OSError:
+        # Log performa tidak boleh mengganggu aplikasi
+        pass
+    return record
+
+
+def add_timer(name, ms):
+    """Catat durasi (ms) yang diukur di tempat lain, mis. metrik render dari worker."""
+    trace = current()
+    if trace is not None:
+        trace.timers.append({"name": name, "ms": round(ms, 1)})
+
+
+@contextmanager
+def timer(name):
+    trace = current()
+    if trace is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.timers.append({"name": name, "ms": round((time.perf_counter() - t0) * 1000, 1)})
+
+
+def timed(name=None):
+    """Decorator timer halaman: `@timed()` memakai nama fungsi."""
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _short(value):
+    if isinstance(value, (list, tuple, set)):
+        return f"[{len(value)} nilai]"
+    text = str(value)
+    return text if len(text) <= MAX_FILTER_CHARS else text[:MAX_FILTER_CHARS] + "…"
+
+
+def _describe(method, args, kwargs):
+    parts = [_short(a) for a in args] + [f"{k}={_short(v)}" for k, v in kwargs.items()]
+    return f"{method}({', '.join(parts)})"
+
+
+class TracedQuery:
+    """
+    Pembungkus query builder Supabase: memanggil builder asli apa adanya,
+    sambil mencatat operasi & filter. `execute()` diukur dan dicatat ke run
+    yang sedang aktif. Payload insert/update (mis. password) tidak dicatat.
+    """
+
+    def __init__(self, builder, table, op="select", filters=()):
+        self._builder = builder
+        self._table = table
+        self._op = op
+        self._filters = filters
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            # mis. `.not_` (property yang mengembalikan builder)
+            if hasattr(attr, "execute"):
+                return TracedQuery(attr, self._table, self._op, self._filters + (name,))
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if not hasattr(result, "execute"):
+                return result
+            op = name if name in _OPERATIONS else self._op
+            filters = self._filters + (_describe(name, args, kwargs),) if name in _FILTERS else self._filters
+            return TracedQuery(result, self._table, op, filters)
+        return call
+
+    def execute(self):
+        trace = current()
+        if trace is None:
+            return self._builder.execute()
+
+        entry = {"table": self._table, "op": self._op, "filters": list(self._filters), "rows": 0, "bytes": 0, "ms": 0.0, "error": None}
+        t0 = time.perf_counter()
+        try:
+            response = self._builder.execute()
+        except Exception as e:
+            entry["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            entry["error"] = str(e)[:200]
+            trace.queries.append(entry)
+            raise
+        entry["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+        data = getattr(response, "data", None)
+        if isinstance(data, list):
+            entry["rows"] = len(data)
+        elif data:
+            entry["rows"] = 1
+        if data:
+            # Perkiraan ukuran payload: JSON baris pertama x jumlah baris, agar
+            # halaman besar tidak diserialisasi ulang hanya untuk dicatat
+            first = data[0] if isinstance(data, list) else data
+            entry["bytes"] = len(json.dumps(first, default=str)) * entry["rows"]
+        trace.queries.append(entry)
+        return response
@@ -0,0 +1,204 @@
+import time
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+
+from database import supabase, paginate
+
+# Peringkat per angkatan (tahun_aktif): satu papan untuk percobaan terakhir
+# ("terakhir") dan satu per nomor percobaan (1, 2, ...). Setiap papan
+# menyimpan nilai total dalam list terurut, sehingga peringkat & persentil
+# seorang user didapat dengan pencarian biner (O(log n)) dan perubahan nilai
+# satu user hanya menyisipkan / menghapus nilainya, tanpa mengurutkan ulang.
+LATEST = "terakhir"
+COMPONENTS = ("twk", "tiu", "tkp")
+
+
+def _to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def attempt_totals(scores):
+    """{nomor percobaan: total, ..., "terakhir": total} dari riwayat nilai seorang user."""
+    rows = sorted(scores, key=lambda s: str(s.get("created_at") or ""))
+    totals = {i: sum(_to_number(s.get(c)) for c in COMPONENTS) for i, s in enumerate(rows, start=1)}
+    if totals:
+        totals[LATEST] = totals[len(totals)]
+    return totals
+
+
+class _Board:
+    """Nilai satu papan peringkat: semua nilai (terurut) + nilai unik (untuk dense rank)."""
+
+    def __init__(self):
+        self.values = []
+        self.distinct = []
+        self.counts = defaultdict(int)
+
+    def add(self, value):
+        insort(self.values, value)
+        if self.counts[value] == 0:
+            insort(self.distinct, value)
+        self.counts[value] += 1
+
+    def remove(self, value):
+        del self.values[bisect_left(self.values, value)]
+        self.counts[value] -= 1
+        if self.counts[value] == 0:
+            del self.counts[value]
+            del self.distinct[bisect_left(self.distinct, value)]
+
+    def position(self, value):
+        n = len(self.values)
+        return {
+            "peringkat": len(self.distinct) - bisect_right(self.distinct, value) + 1,
+            "persentil": round(bisect_right(self.values, value) / n * 100, 1),
+            "jumlah": n,
+        }
+
+
+class CohortRanking:
+    """
+    Papan peringkat per (angkatan, percobaan), dipakai bersama semua sesi.
+    - build() memuat semua nilai sekali (kolom seperlunya saja); hanya satu
+      build berjalan pada satu waktu, sesi lain menunggu hasilnya.
+    - update_user() dipanggil setelah nilai / angkatan seorang user berubah:
+      hanya nilai user tersebut yang dihapus lalu disisipkan ulang.
+    - Perubahan dari luar aplikasi (mis. admin.py) terlihat setelah papan
+      disegarkan di thread latar belakang (ensure_built dengan max_age).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.building = False
+        self._dirty = set()  # user yang berubah selama build berjalan
+        self._generation = 0
+        self._reset()
+
+    def _reset(self):
+        self.built_at = None
+        self.entries = {}  # user_id -> (angkatan, {percobaan: total})
+        self.boards = defaultdict(_Board)
+
+    def invalidate(self):
+        with self._lock:
+            self._reset()
+            # Build yang sedang berjalan membaca data lama: hasilnya dibuang
+            self._generation += 1
+
+    @staticmethod
+    def _place_into(entries, boards, user_id, cohort, totals):
+        old = entries.pop(user_id, None)
+        if old is not None:
+            old_cohort, old_totals = old
+            for key, value in old_totals.items():
+                boards[(old_cohort, key)].remove(value)
+        if cohort is not None and totals:
+            entries[user_id] = (cohort, totals)
+            for key, value in totals.items():
+                boards[(cohort, key)].add(value)
+
+    def _place(self, user_id, cohort, totals):
+        self._place_into(self.entries, self.boards, user_id, cohort, totals)
+
+    def _build_locked(self):
+        """Bangun papan baru di luar _lock lalu tukar; pemanggil memegang _build_lock."""
+        with self._lock:
+            self.building = True
+            self._dirty.clear()
+            generation = self._generation
+        try:
+            # Dibaca per halaman: select tunggal terpotong di batas max-rows PostgREST
+            users = [u for rows in paginate("users", columns="id,role,tahun_aktif") for u in rows]
+            by_user = defaultdict(list)
+            for rows in paginate("scores", columns="user_id,twk,tiu,tkp,created_at", order=("id",)):
+                for s in rows:
+                    by_user[s["user_id"]].append(s)
+
+            entries, boards = {}, defaultdict(_Board)
+            for u in users:
+                if u.get("role", "user") == "user" and u["id"] in by_user:
+                    self._place_into(entries, boards, u["id"], u.get("tahun_aktif"), attempt_totals(by_user[u["id"]]))
+        finally:
+            with self._lock:
+                self.building = False
+                dirty = list(self._dirty)
+                self._dirty.clear()
+
+        with self._lock:
+            if self._generation != generation:
+                return
+            self.entries, self.boards = entries, boards
+            self.built_at = time.monotonic()
+        # Nilai yang berubah selama build mungkin belum terbaca: sisipkan ulang
+        for user_id in dirty:
+            self.update_user(user_id)
+
+    def build(self):
+        with self._build_lock:
+            self._build_locked()
+
+    def _refresh_in_background(self):
+        if not self._build_lock.acquire(blocking=False):
+            return  # build lain sedang berjalan
+
+        def run():
+            try:
+                self._build_locked()
+            except Exception:
+                # Papan lama tetap dipakai; dicoba lagi pada permintaan berikutnya
+                pass
+            finally:
+                self._build_lock.release()
+
+        threading.Thread(target=run, name="cohort-ranking-refresh", daemon=True).start()
+
+    def ensure_built(self, max_age=None):
+        """
+        Bangun papan jika belum ada (sesi yang datang bersamaan menunggu build
+        yang sama). Papan yang lebih tua dari `max_age` disegarkan di thread
+        latar belakang; sementara itu papan lama tetap dipakai.
+        """
+        if self.built_at is None:
+            with self._build_lock:
+                if self.built_at is None:
+                    self._build_locked()
+        elif max_age is not None and not self.building and time.monotonic() - self.built_at > max_age:
+            self._refresh_in_background()
+
+    def update_user(self, user_id):
+        """Perbarui posisi satu user (setelah input/edit/hapus nilai atau pindah angkatan)."""
+        with self._lock:
+            if self.building:
+                self._dirty.add(user_id)
+            if self.built_at is None:
+                return
+        user = supabase.table("users").select("id,role,tahun_aktif").eq("id", user_id).execute()
+        scores = [
+            s
+            for rows in paginate("scores", lambda q: q.eq("user_id", user_id), columns="twk,tiu,tkp,created_at")
+            for s in rows
+        ]
+        rows = getattr(user, "data", []) or []
+        ranked = rows and rows[0].get("role", "user") == "user"
+        cohort = rows[0].get("tahun_aktif") if ranked else None
+        totals = attempt_totals(scores) if ranked else {}
+        with self._lock:
+            self._place(user_id, cohort, totals)
+
+    def position(self, user_id, key=LATEST):
+        """Peringkat (dense), persentil, dan jumlah peserta user di angkatannya (None jika belum ada)."""
+        with self._lock:
+            entry = self.entries.get(user_id)
+            if entry is None or key not in entry[1]:
+                return None
+            cohort, totals = entry
+            return {
+                "angkatan": cohort,
+                "total": totals[key],
+                **self.boards[(cohort, key)].position(totals[key]),
+            }
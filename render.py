@@ -0,0 +1,795 @@
+import io
+import os
+import re
+import time
+import zipfile
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+# Paksa backend non-interaktif: render hanya ke file/buffer, tidak butuh display
+matplotlib.use("Agg", force=True)
+from matplotlib import font_manager
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.collections import LineCollection
+from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+from matplotlib.ticker import FuncFormatter, MaxNLocator
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+import numpy as np
+import pandas as pd
+
+from perf import timed
+from charts import (
+    COLOR_TWK,
+    COLOR_TIU,
+    COLOR_TKP,
+    COLOR_PRIMARY,
+    COLOR_MISSING,
+    SKD_COMPONENTS,
+    HEATMAP_MAX_NAME_TICKS,
+    CHART_MAX_POINTS,
+    downsample_scores,
+    chart_cols,
+)
+
+
+# Batas data per halaman A4 (sama dengan UI laporan individu)
+MAX_SKD_PER_REPORT = 15
+
+# Ukuran A4 Portrait (inch)
+FIGSIZE_A4 = (8.27, 11.69)
+
+# Opsi savefig yang sama dengan st.pyplot agar tampilan grafik dashboard tidak berubah
+DASHBOARD_SAVEFIG = {"format": "png", "dpi": 200, "bbox_inches": "tight"}
+
+
+# ======================
+# TEMPLATE FIGURE
+# ======================
+class _TemplatePool:
+    """
+    Pool template figure per proses. Artist statis (axes, legend, grid, judul)
+    dibuat sekali; setiap render hanya meminjam template, mengganti data, lalu
+    mengembalikannya. Aman dipakai bersamaan oleh beberapa sesi (thread).
+    """
+
+    def __init__(self, factory, max_idle=4):
+        self._factory = factory
+        self._max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self):
+        with self._lock:
+            tpl = self._idle.pop() if self._idle else None
+        if tpl is None:
+            tpl = self._factory()
+        try:
+            yield tpl
+        finally:
+            with self._lock:
+                if len(self._idle) < self._max_idle:
+                    self._idle.append(tpl)
+
+
+def _legend_handles(legend):
+    # matplotlib >= 3.7 memakai `legend_handles`, versi lama `legendHandles`
+    return getattr(legend, "legend_handles", None) or getattr(legend, "legendHandles", [])
+
+
+class _ReportChartsTemplate:
+    """Halaman A4 laporan berisi grafik komponen (atas) dan grafik total (bawah)."""
+
+    def __init__(self):
+        self.fig = Figure(figsize=FIGSIZE_A4, dpi=100)
+        self.ax_comp = self.fig.add_subplot(2, 1, 1)
+        self.ax_total = self.fig.add_subplot(2, 1, 2)
+
+        # Grafik Komponen
+        self.comp_lines = [
+            self.ax_comp.plot([], [], marker="o", label=label, color=color)[0]
+            for label, color in (("TWK", COLOR_TWK), ("TIU", COLOR_TIU), ("TKP", COLOR_TKP))
+        ]
+        self.ax_comp.set_ylabel("Nilai", color=COLOR_TWK, fontweight='bold')
+        self.ax_comp.set_title("Grafik Komponen Nilai SKD", fontsize=14, fontweight='bold', pad=10, color=COLOR_TWK)
+        self.comp_legend = self.ax_comp.legend(loc='upper left', bbox_to_anchor=(1, 1))
+        self.ax_comp.grid(True, linestyle='--', alpha=0.6)
+
+        # Grafik Total
+        self.total_line = self.ax_total.plot([], [], marker="o", color=COLOR_TWK, label="Total")[0]
+        self.ax_total.set_ylabel("Total Nilai", color=COLOR_TWK, fontweight='bold')
+        self.ax_total.set_title("Grafik Total Nilai SKD", fontsize=14, fontweight='bold', pad=10, color=COLOR_TWK)
+        self.total_legend = self.ax_total.legend(loc='upper left', bbox_to_anchor=(1, 1))
+        self.ax_total.grid(True, linestyle='--', alpha=0.6)
+
+        self.suptitle = self.fig.suptitle("", fontsize=16, fontweight='bold', y=0.98, color=COLOR_TWK)
+        self.fig.subplots_adjust(top=0.88, bottom=0.12, left=0.15, right=0.85, hspace=0.4)
+
+    def update(self, df, title):
+        # Marker size & line width dinamis agar tidak berantakan saat data banyak
+        num_pts = len(df)
+        msize = max(2, min(8, 250 // (num_pts + 10)))
+        lwidth = max(1, min(3, 100 // (num_pts + 10)))
+        tick_size = max(5, min(9, 400 // (num_pts + 10)))
+
+        x = np.arange(num_pts)
+        labels = df["label"].astype(str).tolist()
+        for line, col in zip(self.comp_lines, ("twk", "tiu", "tkp")):
+            line.set_data(x, df[col].to_numpy(dtype=float))
+            line.set_linewidth(lwidth)
+            line.set_markersize(msize)
+        self.total_line.set_data(x, df["total"].to_numpy(dtype=float))
+        self.total_line.set_linewidth(lwidth + 0.5)
+        self.total_line.set_markersize(msize)
+
+        # Handle legend adalah salinan garis, jadi ikut disesuaikan
+        for legend, width in ((self.comp_legend, lwidth), (self.total_legend, lwidth + 0.5)):
+            for handle in _legend_handles(legend):
+                handle.set_linewidth(width)
+                handle.set_markersize(msize)
+
+        for ax in (self.ax_comp, self.ax_total):
+            ax.set_xticks(x, labels)
+            ax.tick_params(axis='x', rotation=45, labelsize=tick_size)
+            ax.relim()
+            ax.autoscale_view()
+
+        self.suptitle.set_text(title + "\n(Halaman 2: Grafik Perkembangan)")
+
+
+class _DashboardChartTemplate:
+    """Grafik garis dashboard (komponen TWK/TIU/TKP atau total)."""
+
+    def __init__(self, is_component):
+        self.fig = Figure(figsize=(8, 5), dpi=100)
+        self.ax = self.fig.add_subplot(111)
+        ax = self.ax
+
+        if is_component:
+            self.lines = {
+                col: ax.plot([], [], marker="o", label=label, color=color, linewidth=3)[0]
+                for col, label, color in (
+                    ("twk", "TWK", COLOR_TWK), ("tiu", "TIU", COLOR_TIU), ("tkp", "TKP", COLOR_TKP)
+                )
+            }
+            ax.set_ylabel("Nilai", color=COLOR_TWK, fontweight='bold')
+        else:
+            self.lines = {"total": ax.plot([], [], marker="o", color=COLOR_TWK, linewidth=3.5, label="Total")[0]}
+            ax.set_ylabel("Total Nilai", color=COLOR_TWK, fontweight='bold')
+
+        self.title = ax.set_title("", fontsize=14, fontweight='bold', pad=15, color=COLOR_TWK)
+        ax.legend(loc='upper left', bbox_to_anchor=(1, 1))
+        ax.grid(True, linestyle='--', alpha=0.6)
+        ax.tick_params(axis='y', labelsize=9)
+
+    def update(self, df, title):
+        # Hitung figsize dinamis berdasarkan jumlah data
+        num_data = len(df)
+        self.fig.set_size_inches(max(8, num_data * 0.7), 5)
+
+        x = np.arange(num_data)
+        for col, line in self.lines.items():
+            line.set_data(x, df[col].to_numpy(dtype=float))
+
+        self.ax.set_xticks(x, df["label"].astype(str).tolist())
+        self.ax.tick_params(axis='x', rotation=45, labelsize=9)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.title.set_text(title)
+        self.fig.tight_layout()
+
+
+_charts_pool = _TemplatePool(_ReportChartsTemplate)
+_dashboard_pools = {
+    True: _TemplatePool(lambda: _DashboardChartTemplate(True)),
+    False: _TemplatePool(lambda: _DashboardChartTemplate(False)),
+}
+
+
+def _savefig_bytes(fig, **kwargs):
+    buf = io.BytesIO()
+    fig.savefig(buf, **kwargs)
+    return buf.getvalue()
+
+
+def warm_up():
+    """
+    Panaskan cache font & template sekali per proses (dipanggil saat startup
+    server dan sebagai initializer worker render).
+    """
+    for weight in ("normal", "bold"):
+        font_manager.findfont(font_manager.FontProperties(weight=weight))
+    with _charts_pool.acquire() as tpl:
+        tpl.fig.canvas.draw()
+
+
+# ======================
+# RENDER
+# ======================
+def render_skd_chart(df, title, is_component=True, max_points=None):
+    """
+    Render grafik SKD dengan gaya seragam dan responsif (Modern Theme).
+    Jika `max_points` diisi, riwayat panjang diperkecil dulu dengan LTTB.
+    Mengembalikan PNG (bytes) atau None jika data kosong.
+    """
+    if df.empty:
+        return None
+
+    if max_points:
+        df = downsample_scores(df, chart_cols(is_component), max_points)
+
+    with _dashboard_pools[bool(is_component)].acquire() as tpl:
+        tpl.update(df, title)
+        return _savefig_bytes(tpl.fig, **DASHBOARD_SAVEFIG)
+
+
+def _report_table_values(df):
+    """Siapkan header & isi tabel laporan dari DataFrame nilai."""
+    cols_to_show = ["skd_ke", "twk", "tiu", "tkp", "total"]
+    if "nama" in df.columns and len(df["nama"].unique()) > 1:
+        cols_to_show = ["nama"] + cols_to_show
+
+    table_data = df[cols_to_show].copy()
+
+    # Pastikan kolom numerik menjadi integer agar tidak ada .0 di tabel PNG
+    numeric_cols = ["skd_ke", "twk", "tiu", "tkp", "total"]
+    for col in numeric_cols:
+        if col in table_data.columns:
+            table_data[col] = pd.to_numeric(table_data[col], errors='coerce').fillna(0).astype(int)
+
+    rename_map = {"skd_ke": "SKD ke-", "twk": "TWK", "tiu": "TIU", "tkp": "TKP", "total": "Total", "nama": "Nama"}
+    table_data = table_data.rename(columns=rename_map)
+    return list(table_data.columns), table_data.values.tolist()
+
+
+@timed("render_report_page")
+def render_report_page(df, title, content_type="table", max_points=None, fmt="png"):
+    """
+    Render satu halaman laporan (Tabel atau Grafik) dengan ukuran A4 (approx 8.27x11.69 inch).
+    Fungsi murni (tanpa Streamlit) agar bisa dipanggil dari worker process.
+    `max_points` (opsional) membatasi jumlah titik grafik dengan LTTB.
+    """
+    data, _ = render_report_artifact(df, title, content_type, max_points, fmt)
+    return data
+
+
+def render_report_artifact(df, title, content_type="table", max_points=None, fmt="png"):
+    """
+    Seperti render_report_page, tetapi juga mengembalikan metrik
+    (format, ukuran, waktu render). Mengembalikan (bytes, metrics).
+    Rasterisasi Agg / penulisan vektor terjadi di dalam savefig, jadi waktu
+    gambar & encode dilaporkan sebagai satu angka `render_ms`.
+    """
+    if df.empty: return None, None
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Format laporan tidak dikenal: {fmt}")
+
+    t0 = time.perf_counter()
+    if content_type == "table":
+        columns, values = _report_table_values(df)
+        data = _encode_table(_table_layouts(columns, values, title), fmt)
+    else:
+        # Pastikan data terurut
+        if "skd_ke" in df.columns:
+            df = df.sort_values("skd_ke")
+
+        if max_points:
+            df = downsample_scores(df, ["twk", "tiu", "tkp", "total"], max_points)
+
+        with _charts_pool.acquire() as tpl:
+            tpl.update(df, title)
+            data = _encode_figure(tpl.fig, fmt)
+
+    metrics = {
+        "format": fmt,
+        "ukuran_kb": round(len(data) / 1024, 1),
+        "render_ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+    return data, metrics
+
+
+# ======================
+# FORMAT OUTPUT LAPORAN
+# ======================
+# PNG palet & WebP lossless untuk dibagikan (kecil), SVG & PDF vektor untuk
+# dicetak (tajam di ukuran berapa pun tanpa menaikkan DPI).
+REPORT_FORMATS = {
+    "png": {"label": "PNG (palet, teroptimasi)", "ext": "png", "mime": "image/png"},
+    "webp": {"label": "WebP (lossless)", "ext": "webp", "mime": "image/webp"},
+    "svg": {"label": "SVG (vektor)", "ext": "svg", "mime": "image/svg+xml"},
+    "pdf": {"label": "PDF (vektor)", "ext": "pdf", "mime": "application/pdf"},
+}
+REPORT_DPI = 100
+# Grafik memakai antialias -> palet adaptif; 128 warna tidak terlihat bedanya
+REPORT_PNG_COLORS = 128
+# Metadata tanggal dihapus agar file vektor deterministik (cache & diff ramah)
+_VECTOR_METADATA = {"svg": {"Date": None}, "pdf": {"CreationDate": None}}
+# Teks SVG disimpan sebagai <text> (bukan path per glyph): jauh lebih kecil & bisa dipilih
+_SVG_RC = {"svg.fonttype": "none"}
+
+
+def _savefig_vector(fig, fmt):
+    with matplotlib.rc_context(_SVG_RC if fmt == "svg" else {}):
+        return _savefig_bytes(fig, format=fmt, bbox_inches=None, metadata=_VECTOR_METADATA[fmt])
+
+
+def _encode_raster(img, fmt):
+    """Encode gambar Pillow ke PNG palet teroptimasi atau WebP lossless."""
+    buf = io.BytesIO()
+    if fmt == "png":
+        if img.mode != "P":
+            img = img.convert("RGB").quantize(
+                colors=REPORT_PNG_COLORS, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE
+            )
+        img.save(buf, format="PNG", optimize=True, dpi=(REPORT_DPI, REPORT_DPI))
+    else:
+        img.convert("RGB").save(buf, format="WEBP", lossless=True, method=4)
+    return buf.getvalue()
+
+
+def _encode_figure(fig, fmt):
+    """Encode figure matplotlib: vektor langsung, raster lewat buffer RGBA Agg."""
+    if fmt in ("svg", "pdf"):
+        return _savefig_vector(fig, fmt)
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    img = Image.fromarray(np.asarray(canvas.buffer_rgba()))
+    return _encode_raster(img, fmt)
+
+
+def _encode_table(layouts, fmt):
+    """
+    Encode halaman-halaman tabel: PDF berisi satu halaman A4 per layout;
+    PNG/WebP/SVG berisi halaman A4 yang disusun ke bawah dalam satu gambar.
+    """
+    if fmt == "pdf" and len(layouts) > 1:
+        buf = io.BytesIO()
+        with PdfPages(buf, metadata=_VECTOR_METADATA["pdf"]) as pdf:
+            for layout in layouts:
+                pdf.savefig(_draw_table_figure([layout]))
+        return buf.getvalue()
+    if fmt in ("svg", "pdf"):
+        return _savefig_vector(_draw_table_figure(layouts), fmt)
+    return _encode_raster(_draw_table_image(layouts), fmt)
+
+
+# ======================
+# TABEL (RASTER LANGSUNG / VEKTOR)
+# ======================
+# Tabel digambar langsung ke kanvas Pillow (tanpa ax.table matplotlib) dengan
+# tampilan yang sama: header gelap teks putih tebal, badan zebra, font dinamis.
+# Tata letak dihitung sekali lalu digambar ke Pillow (raster) atau ke Figure
+# matplotlib berisi primitif sederhana (SVG/PDF). Tabel panjang dipecah
+# menjadi beberapa halaman A4 (TABLE_ROWS_PER_PAGE baris per halaman).
+A4_PX = (827, 1169)  # A4 @ 100 dpi, sama dengan halaman grafik
+TABLE_TOP_PX = 194  # tepi atas tabel (setara posisi ax.table di halaman lama)
+TABLE_BOTTOM_PX = 1110
+TABLE_MIN_ROW_PX = 12  # di bawah ini teks sel tidak terbaca; sisa baris pindah ke halaman berikutnya
+TABLE_ROWS_PER_PAGE = (TABLE_BOTTOM_PX - TABLE_TOP_PX) // TABLE_MIN_ROW_PX - 1  # tanpa header
+TABLE_WIDTH_PX = 794  # lebar area tabel (0.8 lebar halaman x scale 1.2)
+TABLE_ZEBRA = ("#F8F9F9", "#FFFFFF")
+TABLE_BORDER = "#000000"
+
+
+def _pt_to_px(pt):
+    return int(round(pt * 100 / 72))
+
+
+@lru_cache(maxsize=1)
+def _table_palette():
+    """
+    Palet tetap untuk tabel: gradasi antialias antara setiap pasangan warna
+    latar/teks yang dipakai. Jauh lebih cepat dari kuantisasi adaptif.
+    """
+    pairs = [
+        ("#FFFFFF", TABLE_BORDER), (TABLE_ZEBRA[0], TABLE_BORDER),
+        (COLOR_PRIMARY, "#FFFFFF"), ("#FFFFFF", COLOR_PRIMARY),
+    ]
+    colors = []
+    for a, b in pairs:
+        a, b = ImageColor.getrgb(a), ImageColor.getrgb(b)
+        colors += [tuple(round(a[k] + (b[k] - a[k]) * i / 15) for k in range(3)) for i in range(16)]
+    pal = Image.new("P", (1, 1))
+    flat = [v for color in colors for v in color]
+    pal.putpalette(flat + [0] * (768 - len(flat)))
+    return pal
+
+
+@lru_cache(maxsize=32)
+def _font(size_px, bold=False):
+    """Font yang sama dengan matplotlib (DejaVu Sans), di-cache per ukuran."""
+    path = font_manager.findfont(font_manager.FontProperties(weight="bold" if bold else "normal"))
+    return ImageFont.truetype(path, size_px)
+
+
+def _table_layout(columns, rows, title):
+    """
+    Hitung posisi judul, sel, dan garis tabel (dalam piksel A4 @ 100 dpi).
+    Lebar kolom diukur dengan metrik font yang sama untuk raster & vektor.
+    """
+    num_rows = len(rows)
+    # Dinamis font & scale agar tidak overlap dan pas di A4
+    dyn_font = max(6, min(10, 500 // (num_rows + 20)))
+    dyn_scale = max(1.1, min(2.5, 60 // (num_rows + 15)))
+
+    # Judul (16pt tebal, rata tengah, di atas tabel)
+    title_px = _pt_to_px(16)
+    title_bottom = TABLE_TOP_PX - _pt_to_px(50)
+    line_h = int(title_px * 1.2)
+    lines = title.split("\n")
+    y = title_bottom - line_h * len(lines)
+    title_lines = [(line, y + i * line_h) for i, line in enumerate(lines)]
+
+    # Tinggi baris mengikuti ax.table (10pt x 1.2 x scale), dipadatkan jika melebihi halaman
+    # (minimal TABLE_MIN_ROW_PX karena baris per halaman dibatasi _table_layouts)
+    row_h = _pt_to_px(10) * 1.2 * dyn_scale
+    row_h = int(min(row_h, (TABLE_BOTTOM_PX - TABLE_TOP_PX) / (num_rows + 1)))
+    font_px = _pt_to_px(dyn_font)
+    body_font = _font(font_px)
+    head_font = _font(font_px, bold=True)
+
+    # Lebar kolom: proporsional terhadap teks terpanjang, sisa ruang dibagi rata
+    cells = [[str(c) for c in columns]] + [[str(v) for v in row] for row in rows]
+    pad = 8
+    natural = [
+        max((head_font if i == 0 else body_font).getlength(r[c]) for i, r in enumerate(cells)) + 2 * pad
+        for c in range(len(columns))
+    ]
+    extra = (TABLE_WIDTH_PX - sum(natural)) / len(columns)
+    widths = [max(1, w + extra) for w in natural] if extra >= 0 else [w * TABLE_WIDTH_PX / sum(natural) for w in natural]
+    x_edges = [(A4_PX[0] - TABLE_WIDTH_PX) / 2]
+    for w in widths:
+        x_edges.append(x_edges[-1] + w)
+
+    return {
+        "title_px": title_px,
+        "title_lines": title_lines,
+        "font_px": font_px,
+        "row_h": row_h,
+        "cells": cells,
+        "x_edges": x_edges,
+    }
+
+
+def _table_layouts(columns, rows, title):
+    """
+    Tata letak tabel laporan per halaman A4. Baris yang tidak muat
+    (lebih dari TABLE_ROWS_PER_PAGE) dilanjutkan ke halaman berikutnya,
+    masing-masing dengan header kolom sendiri.
+    """
+    # Baris dibagi rata antar halaman (76 baris -> 38 + 38, bukan 75 + 1)
+    pages = max(1, -(-len(rows) // TABLE_ROWS_PER_PAGE))
+    size = -(-len(rows) // pages) or 1
+    chunks = [rows[i:i + size] for i in range(0, len(rows), size)] or [rows]
+    if len(chunks) == 1:
+        return [_table_layout(columns, rows, title + "\n(Halaman 1: Tabel Nilai)")]
+    return [
+        _table_layout(columns, chunk, title + f"\n(Halaman 1: Tabel Nilai, bagian {i}/{len(chunks)})")
+        for i, chunk in enumerate(chunks, start=1)
+    ]
+
+
+def _table_rows(layout, top=TABLE_TOP_PX):
+    """Iterasi baris tabel: (y atas, warna latar, tebal?, warna teks, isi sel)."""
+    for r, row in enumerate(layout["cells"]):
+        y0 = top + r * layout["row_h"]
+        if r == 0:
+            yield y0, COLOR_PRIMARY, True, "white", row
+        else:
+            yield y0, TABLE_ZEBRA[(r - 1) % 2], False, "black", row
+
+
+def _draw_table_image(layouts):
+    """Gambar halaman-halaman tabel (disusun ke bawah) ke kanvas Pillow, dikuantisasi ke palet tetap (mode "P")."""
+    img = Image.new("RGB", (A4_PX[0], A4_PX[1] * len(layouts)), "white")
+    draw = ImageDraw.Draw(img)
+
+    for page, layout in enumerate(layouts):
+        offset = page * A4_PX[1]
+        top = TABLE_TOP_PX + offset
+        title_font = _font(layout["title_px"], bold=True)
+        for line, y in layout["title_lines"]:
+            draw.text((A4_PX[0] / 2, y + offset), line, font=title_font, fill=COLOR_PRIMARY, anchor="mt")
+
+        x_edges, row_h = layout["x_edges"], layout["row_h"]
+        for y0, fill, bold, color, row in _table_rows(layout, top):
+            font = _font(layout["font_px"], bold=bold)
+            draw.rectangle([x_edges[0], y0, x_edges[-1], y0 + row_h], fill=fill)
+            for c, text in enumerate(row):
+                draw.text(((x_edges[c] + x_edges[c + 1]) / 2, y0 + row_h / 2), text, font=font, fill=color, anchor="mm")
+
+        # Garis sel
+        y_end = top + len(layout["cells"]) * row_h
+        for r in range(len(layout["cells"]) + 1):
+            y0 = top + r * row_h
+            draw.line([(x_edges[0], y0), (x_edges[-1], y0)], fill=TABLE_BORDER, width=1)
+        for x in x_edges:
+            draw.line([(x, top), (x, y_end)], fill=TABLE_BORDER, width=1)
+
+    # Warna datar -> palet kecil cukup, PNG jauh lebih kecil dari RGBA
+    return img.quantize(palette=_table_palette(), dither=Image.Dither.NONE)
+
+
+def _draw_table_figure(layouts):
+    """Gambar halaman-halaman tabel (disusun ke bawah) sebagai primitif vektor (persegi, garis, teks)."""
+    fig = Figure(figsize=(FIGSIZE_A4[0], FIGSIZE_A4[1] * len(layouts)), dpi=REPORT_DPI)
+    ax = fig.add_axes((0, 0, 1, 1))
+    ax.set_xlim(0, A4_PX[0])
+    ax.set_ylim(A4_PX[1] * len(layouts), 0)
+    ax.axis("off")
+    px_to_pt = 72 / REPORT_DPI
+
+    segments = []
+    for page, layout in enumerate(layouts):
+        offset = page * A4_PX[1]
+        top = TABLE_TOP_PX + offset
+        for line, y in layout["title_lines"]:
+            ax.text(A4_PX[0] / 2, y + offset, line, ha="center", va="top", color=COLOR_PRIMARY,
+                    fontsize=layout["title_px"] * px_to_pt, fontweight="bold")
+
+        x_edges, row_h = layout["x_edges"], layout["row_h"]
+        for y0, fill, bold, color, row in _table_rows(layout, top):
+            ax.add_patch(Rectangle((x_edges[0], y0), x_edges[-1] - x_edges[0], row_h, facecolor=fill, edgecolor="none"))
+            for c, text in enumerate(row):
+                ax.text((x_edges[c] + x_edges[c + 1]) / 2, y0 + row_h / 2, text, ha="center", va="center_baseline",
+                        color=color, fontsize=layout["font_px"] * px_to_pt, fontweight="bold" if bold else "normal")
+
+        y_end = top + len(layout["cells"]) * row_h
+        segments += [
+            [(x_edges[0], top + r * row_h), (x_edges[-1], top + r * row_h)]
+            for r in range(len(layout["cells"]) + 1)
+        ] + [[(x, top), (x, y_end)] for x in x_edges]
+
+    # Garis sel dalam satu LineCollection
+    ax.add_collection(LineCollection(segments, colors=TABLE_BORDER, linewidths=0.75))
+    return fig
+
+
+# ======================
+# HEATMAP (SEMUA USER)
+# ======================
+# Untuk riwayat banyak user, satu label x per (user, percobaan) membuat gambar
+# raksasa. Heatmap user x percobaan ukurannya tetap, jadi biaya render
+# bergantung pada ukuran piksel, bukan jumlah baris.
+HEATMAP_SAVEFIG = {"format": "png", "dpi": 120, "bbox_inches": "tight"}
+
+
+def _score_matrix(df, value_col):
+    """Pivot nilai menjadi matriks user x percobaan (NaN jika belum ada)."""
+    return df.pivot_table(index="nama", columns="skd_ke", values=value_col, aggfunc="last").sort_index()
+
+
+def _heatmap_cmap(color):
+    cmap = LinearSegmentedColormap.from_list("skd", ["#FFFFFF", color])
+    cmap.set_bad(COLOR_MISSING)
+    return cmap
+
+
+def render_skd_heatmap(df, title, is_component=True):
+    """
+    Render heatmap user x percobaan (satu imshow per komponen, atau satu untuk total).
+    Mengembalikan PNG (bytes) atau None jika data kosong.
+    """
+    if df.empty:
+        return None
+
+    panels = SKD_COMPONENTS if is_component else (("total", "Total", COLOR_TWK),)
+    matrices = [_score_matrix(df, col) for col, _, _ in panels]
+    num_users, num_attempts = matrices[0].shape
+
+    # Ukuran tetap (dibatasi), tidak tumbuh per baris data
+    height = min(12, max(4, 1.5 + num_users * 0.12))
+    width = 14 if is_component else 10
+    fig = Figure(figsize=(width, height), dpi=100, layout="constrained")
+    axes = fig.subplots(1, len(panels), sharey=True, squeeze=False)[0]
+
+    for ax, matrix, (_, label, color) in zip(axes, matrices, panels):
+        im = ax.imshow(
+            np.ma.masked_invalid(matrix.to_numpy(dtype=float)),
+            aspect="auto",
+            interpolation="nearest",
+            cmap=_heatmap_cmap(color),
+        )
+        ax.set_title(label, fontsize=12, fontweight='bold', color=COLOR_TWK)
+        ax.set_xlabel("SKD ke-", color=COLOR_TWK)
+        ax.xaxis.set_major_locator(MaxNLocator(nbins=10, integer=True))
+        ax.xaxis.set_major_formatter(FuncFormatter(
+            lambda v, _pos, cols=matrix.columns: str(cols[int(v)]) if 0 <= int(v) < len(cols) else ""
+        ))
+        ax.tick_params(labelsize=8)
+        fig.colorbar(im, ax=ax, fraction=0.046, pad=0.02, shrink=0.8)
+
+    # Nama user hanya ditampilkan jika masih terbaca
+    if num_users <= HEATMAP_MAX_NAME_TICKS:
+        axes[0].set_yticks(np.arange(num_users), matrices[0].index.tolist())
+        axes[0].tick_params(axis='y', labelsize=max(5, min(9, 400 // (num_users + 10))))
+    else:
+        axes[0].set_yticks([])
+        axes[0].set_ylabel(f"{num_users} user", color=COLOR_TWK)
+
+    fig.suptitle(title, fontsize=14, fontweight='bold', color=COLOR_TWK)
+    return _savefig_bytes(fig, **HEATMAP_SAVEFIG)
+
+
+# ======================
+# LAPORAN MASSAL (BATCH)
+# ======================
+def build_individual_report_jobs(df_all, max_rows=MAX_SKD_PER_REPORT):
+    """
+    Siapkan daftar job laporan individu untuk setiap user di df_all.
+    Rentang default sama dengan UI laporan individu: `max_rows` SKD terakhir.
+    """
+    jobs = []
+    for nama, df_user in df_all.groupby("nama", sort=True):
+        df_user = df_user.sort_values("skd_ke")
+        max_skd = int(df_user["skd_ke"].max())
+        r_dari = max(1, max_skd - max_rows + 1)
+        report_df = df_user[df_user["skd_ke"] >= r_dari].copy()
+        report_df["label"] = "SKD ke-" + report_df["skd_ke"].astype(str)
+        # Kolom yang dibutuhkan saja agar pickling ke worker tetap ringan
+        report_df = report_df[["nama", "skd_ke", "twk", "tiu", "tkp", "total", "label"]]
+        jobs.append({
+            "nama": nama,
+            "df": report_df,
+            "title": f"Laporan Hasil SKD: {nama} (SKD {r_dari}-{max_skd})",
+            "filename_base": f"laporan_skd_{nama}_{r_dari}_{max_skd}".replace(" ", "_"),
+        })
+    return jobs
+
+
+def render_user_report_job(job):
+    """Render halaman tabel & grafik untuk satu user (dijalankan di worker process)."""
+    t0 = time.perf_counter()
+    table_png = render_report_page(job["df"], job["title"], "table")
+    t1 = time.perf_counter()
+    charts_png = render_report_page(job["df"], job["title"], "charts")
+    t2 = time.perf_counter()
+
+    files = []
+    if table_png:
+        files.append((f"{job['filename_base']}_tabel.png", table_png))
+    if charts_png:
+        files.append((f"{job['filename_base']}_grafik.png", charts_png))
+
+    return {
+        "nama": job["nama"],
+        "files": files,
+        "durasi_tabel_ms": (t1 - t0) * 1000,
+        "durasi_grafik_ms": (t2 - t1) * 1000,
+    }
+
+
+def new_render_pool(max_workers=None):
+    """
+    Process pool untuk render laporan. Matplotlib CPU-bound & terikat GIL,
+    jadi dipakai process (bukan thread). "spawn" agar aman dipakai dari
+    server Streamlit yang multi-thread.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx, initializer=warm_up)
+
+
+def iter_batch_reports(jobs, max_workers=None, pool=None):
+    """
+    Render semua job di process pool dan yield hasilnya sesuai urutan selesai.
+    Jika `pool` diberikan, pool tersebut dipakai (dan tidak ditutup).
+    """
+    if pool is not None:
+        futures = [pool.submit(render_user_report_job, job) for job in jobs]
+        for fut in as_completed(futures):
+            yield fut.result()
+        return
+
+    with new_render_pool(max_workers) as own_pool:
+        yield from iter_batch_reports(jobs, pool=own_pool)
+
+
+ZIP_TIMING_COLUMNS = ["nama", "render_tabel_ms", "render_grafik_ms", "tulis_zip_ms", "ukuran_kb"]
+
+
+def write_reports_zip(results, fileobj, on_progress=None, total=None):
+    """
+    Tulis hasil render ke ZIP secara bertahap (setiap hasil langsung masuk arsip,
+    tidak menunggu semua selesai). Mengembalikan DataFrame rincian waktu per user
+    (kolom ZIP_TIMING_COLUMNS, juga saat tidak ada user).
+    """
+    timings = []
+    # PNG sudah terkompresi, jadi ZIP_STORED cukup & lebih cepat
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_STORED) as zf:
+        for i, res in enumerate(results, start=1):
+            t0 = time.perf_counter()
+            size = 0
+            for name, data in res["files"]:
+                zf.writestr(name, data)
+                size += len(data)
+            timings.append({
+                "nama": res["nama"],
+                "render_tabel_ms": round(res["durasi_tabel_ms"], 1),
+                "render_grafik_ms": round(res["durasi_grafik_ms"], 1),
+                "tulis_zip_ms": round((time.perf_counter() - t0) * 1000, 1),
+                "ukuran_kb": round(size / 1024, 1),
+            })
+            if on_progress:
+                on_progress(i, total, res["nama"])
+    return pd.DataFrame(timings, columns=ZIP_TIMING_COLUMNS)
+
+
+# ======================
+# EKSPOR GRAFIK KE FILE (HEADLESS, lihat grafik.py)
+# ======================
+def _safe_filename(text):
+    return re.sub(r"[^0-9A-Za-z._-]+", "_", str(text)).strip("_") or "tanpa_nama"
+
+
+def build_chart_jobs(df, out_dir, per_user=True, max_points=CHART_MAX_POINTS):
+    """
+    Job ekspor grafik untuk data nilai `df` (kolom nama, tahun_aktif, skd_ke,
+    twk/tiu/tkp/total): per angkatan (rata-rata per percobaan + heatmap) dan,
+    jika `per_user`, grafik komponen & total setiap user.
+    """
+    jobs = []
+    for tahun, df_cohort in df.groupby("tahun_aktif", sort=True):
+        tahun = int(tahun)
+        cohort_dir = os.path.join(out_dir, f"angkatan_{tahun}")
+        mean = df_cohort.groupby("skd_ke", as_index=False)[["twk", "tiu", "tkp", "total"]].mean()
+        mean["label"] = "SKD ke-" + mean["skd_ke"].astype(str)
+        jobs.append({
+            "kind": "angkatan",
+            "nama": f"Angkatan {tahun}",
+            "dir": cohort_dir,
+            "df": mean,
+            "heatmap_df": df_cohort[["nama", "skd_ke", "twk", "tiu", "tkp", "total"]],
+            "title": f"Rata-rata Angkatan {tahun} ({df_cohort['nama'].nunique()} user)",
+            "max_points": max_points,
+        })
+        if not per_user:
+            continue
+        for nama, df_user in df_cohort.groupby("nama", sort=True):
+            df_user = df_user.sort_values("skd_ke")[["skd_ke", "twk", "tiu", "tkp", "total"]].copy()
+            df_user["label"] = "SKD ke-" + df_user["skd_ke"].astype(str)
+            jobs.append({
+                "kind": "user",
+                "nama": nama,
+                "dir": os.path.join(cohort_dir, "user"),
+                "df": df_user,
+                "title": f"Nilai SKD: {nama}",
+                "max_points": max_points,
+            })
+    return jobs
+
+
+def render_chart_job(job):
+    """Render & tulis file PNG satu job ekspor grafik (dijalankan di worker process)."""
+    t0 = time.perf_counter()
+    base = _safe_filename(job["nama"])
+    images = [
+        (f"{base}_komponen.png", render_skd_chart(job["df"], job["title"], True, job["max_points"])),
+        (f"{base}_total.png", render_skd_chart(job["df"], job["title"], False, job["max_points"])),
+    ]
+    if job["kind"] == "angkatan":
+        images.append((f"{base}_heatmap.png", render_skd_heatmap(job["heatmap_df"], job["title"])))
+
+    os.makedirs(job["dir"], exist_ok=True)
+    files = []
+    for name, data in images:
+        if data:
+            path = os.path.join(job["dir"], name)
+            with open(path, "wb") as f:
+                f.write(data)
+            files.append(path)
+    return {"kind": job["kind"], "nama": job["nama"], "files": files, "durasi_ms": (time.perf_counter() - t0) * 1000}
+
+
+def iter_chart_exports(jobs, max_workers=None):
+    """Jalankan job ekspor grafik di process pool; yield hasil sesuai urutan selesai."""
+    with new_render_pool(max_workers) as pool:
+        futures = [pool.submit(render_chart_job, job) for job in jobs]
+        for fut in as_completed(futures):
+            yield fut.result()
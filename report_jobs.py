@@ -0,0 +1,176 @@
+import os
+import io
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from render import (
+    render_report_artifact,
+    build_individual_report_jobs,
+    iter_batch_reports,
+    write_reports_zip,
+    new_render_pool,
+    MAX_SKD_PER_REPORT,
+)
+
+
+# Konfigurasi antrian (bisa diubah lewat environment / .env)
+CACHE_DIR = os.getenv(
+    "SKD_REPORT_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "laporan"),
+)
+CACHE_TTL = int(os.getenv("SKD_REPORT_CACHE_TTL", 6 * 60 * 60))  # detik
+MAX_WORKERS = int(os.getenv("SKD_REPORT_WORKERS", 2))
+MAX_JOBS = int(os.getenv("SKD_REPORT_MAX_JOBS", 4))
+
+
+def report_key(kind, df, *params):
+    """Kunci unik artefak laporan: isi data + parameter render."""
+    h = hashlib.sha256()
+    h.update(kind.encode("utf-8"))
+    h.update(json.dumps([str(p) for p in params]).encode("utf-8"))
+    h.update(json.dumps([str(c) for c in df.columns]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()[:32]
+
+
+def batch_zip_key(df_all):
+    return report_key("batch_zip", df_all, MAX_SKD_PER_REPORT)
+
+
+# ======================
+# JOB (dijalankan di thread koordinator, render di process pool)
+# ======================
+def _job_report_page(pool, progress, df, title, content_type, max_points, fmt):
+    progress(0, 1)
+    data, metrics = pool.submit(render_report_artifact, df, title, content_type, max_points, fmt).result()
+    progress(1, 1)
+    return data, {"metrics": metrics}
+
+
+def _job_batch_zip(pool, progress, df_all):
+    jobs = build_individual_report_jobs(df_all)
+    buf = io.BytesIO()
+    progress(0, len(jobs))
+    timings = write_reports_zip(
+        iter_batch_reports(jobs, pool=pool),
+        buf,
+        on_progress=lambda done, total, nama: progress(done, total),
+        total=len(jobs),
+    )
+    return buf.getvalue(), {"timings": timings.sort_values("nama").to_dict("records")}
+
+
+class ReportJobQueue:
+    """
+    Antrian render laporan di background.
+    - submit() langsung kembali; job dijalankan di pool koordinator yang dibatasi.
+    - Hasil ditulis ke cache di disk (dengan TTL), jadi permintaan laporan yang
+      sama cukup dilayani dari file yang sudah ada.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=CACHE_TTL, max_workers=MAX_WORKERS, max_jobs=MAX_JOBS):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        os.makedirs(cache_dir, exist_ok=True)
+        self._render_pool = new_render_pool(max_workers)
+        self._runner = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="report-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    # ---------- cache di disk ----------
+    def _path(self, key, suffix="bin"):
+        return os.path.join(self.cache_dir, f"{key}.{suffix}")
+
+    def _is_fresh(self, key):
+        try:
+            return time.time() - os.path.getmtime(self._path(key)) < self.ttl
+        except OSError:
+            return False
+
+    def _write(self, key, data, meta):
+        # Tulis ke file sementara lalu rename agar pembaca tidak melihat file setengah jadi
+        for suffix, payload, mode in (("json", json.dumps(meta), "w"), ("bin", data, "wb")):
+            tmp = self._path(key, suffix) + ".tmp"
+            with open(tmp, mode) as f:
+                f.write(payload)
+            os.replace(tmp, self._path(key, suffix))
+
+    def prune(self):
+        """Hapus artefak yang sudah melewati TTL."""
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if now - os.path.getmtime(path) >= self.ttl:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    # ---------- API antrian ----------
+    def submit(self, key, fn, *args):
+        """Daftarkan job. Tidak menunggu; job yang sama/sudah ada di cache tidak diulang."""
+        with self._lock:
+            self.prune()
+            if self._is_fresh(key):
+                return key
+            job = self._jobs.get(key)
+            if job and job["state"] in ("queued", "running"):
+                return key
+
+            job = {"state": "queued", "done": 0, "total": 0, "error": None, "submitted": time.time()}
+            self._jobs[key] = job
+
+        def progress(done, total):
+            job["done"], job["total"] = done, total
+
+        def run():
+            job["state"] = "running"
+            try:
+                data, meta = fn(self._render_pool, progress, *args)
+                meta["durasi_s"] = time.time() - job["submitted"]
+                if data is not None:
+                    self._write(key, data, meta)
+                job["state"] = "done"
+            except Exception as e:
+                job["state"] = "failed"
+                job["error"] = str(e)
+
+        self._runner.submit(run)
+        return key
+
+    def submit_report_page(self, df, title, content_type="table", max_points=None, fmt="png"):
+        key = report_key("page", df, title, content_type, max_points, fmt)
+        return self.submit(key, _job_report_page, df, title, content_type, max_points, fmt)
+
+    def submit_batch_zip(self, df_all):
+        return self.submit(batch_zip_key(df_all), _job_batch_zip, df_all)
+
+    def status(self, key):
+        """Status job: state ('done' / 'queued' / 'running' / 'failed' / 'missing') & progres."""
+        if self._is_fresh(key):
+            return {"state": "done", "done": 1, "total": 1, "error": None}
+        job = self._jobs.get(key)
+        if job is None:
+            return {"state": "missing", "done": 0, "total": 0, "error": None}
+        if job["state"] == "done":
+            # Sudah selesai tapi artefak kosong / kadaluarsa
+            return {"state": "missing", "done": 0, "total": 0, "error": None}
+        return dict(job)
+
+    def result(self, key):
+        """Baca artefak dari cache. Mengembalikan (bytes, meta) atau (None, None)."""
+        if not self._is_fresh(key):
+            return None, None
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+            with open(self._path(key, "json")) as f:
+                meta = json.load(f)
+            return data, meta
+        except OSError:
+            return None, None
@@ -0,0 +1,220 @@
+import io
+import re
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from database import supabase, paginate
+from weekly import APP_TIMEZONE, to_query_ts
+
+# Impor nilai massal dari CSV / XLSX (hasil tryout). Alur: baca file per
+# potongan -> cocokkan nama ke user_id lewat indeks -> validasi rentang &
+# hitung total secara vektor -> pratinjau (dry run) -> insert per batch.
+#
+# Kolom wajib: nama, twk, tiu, tkp. Opsional: total (dicek terhadap
+# twk+tiu+tkp) dan tanggal (waktu percobaan; default = saat impor).
+REQUIRED_COLUMNS = ("nama", "twk", "tiu", "tkp")
+SCORE_MAX = {"twk": 150, "tiu": 175, "tkp": 225}
+READ_CHUNK_ROWS = 1000
+INSERT_BATCH_SIZE = 100
+
+_COLUMN_ALIASES = {"name": "nama", "nama_user": "nama", "tanggal_tryout": "tanggal", "created_at": "tanggal"}
+_ISO_DATE_RE = re.compile(r"^\d{4}-\d{1,2}-\d{1,2}")
+
+
+def normalize_name(value):
+    """Kunci pencocokan nama: huruf kecil, spasi dirapikan."""
+    return re.sub(r"\s+", " ", str(value)).strip().casefold()
+
+
+def _normalize_columns(df):
+    df.columns = [_COLUMN_ALIASES.get(c, c) for c in (normalize_name(c).replace(" ", "_") for c in df.columns)]
+    return df
+
+
+def _iter_csv(data):
+    for chunk in pd.read_csv(io.BytesIO(data), chunksize=READ_CHUNK_ROWS, dtype=str, skipinitialspace=True):
+        yield chunk
+
+
+def _iter_xlsx(data):
+    # openpyxl mode read_only membaca baris secara streaming
+    from openpyxl import load_workbook
+
+    wb = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(h) if h is not None else "" for h in next(rows, [])]
+        batch = []
+        for row in rows:
+            if any(v is not None and str(v).strip() != "" for v in row):
+                # Sel tanggal tetap datetime (tidak diubah ke teks lalu ditebak ulang formatnya)
+                batch.append(["" if v is None else v if isinstance(v, datetime.date) else str(v) for v in row])
+            if len(batch) >= READ_CHUNK_ROWS:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        wb.close()
+
+
+def read_score_file(data, filename):
+    """Baca file CSV/XLSX (bytes) per potongan menjadi satu DataFrame berkolom ternormalisasi."""
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        chunks = _iter_xlsx(data)
+    elif filename.lower().endswith(".csv"):
+        chunks = _iter_csv(data)
+    else:
+        raise ValueError("Format file harus .csv atau .xlsx")
+
+    parts = [_normalize_columns(chunk) for chunk in chunks]
+    df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=list(REQUIRED_COLUMNS))
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ada: {', '.join(missing)}")
+    return df
+
+
+def parse_date(value):
+    """
+    Waktu percobaan dari kolom tanggal: sel datetime XLSX, teks ISO 8601
+    (YYYY-MM-DD[ HH:MM[:SS]][zona]) atau dd/mm/yyyy. Nilai tanpa zona waktu
+    dianggap APP_TIMEZONE; NaT jika tidak valid.
+    """
+    if isinstance(value, datetime.date):
+        ts = pd.Timestamp(value)
+    else:
+        text = str(value).strip()
+        try:
+            if _ISO_DATE_RE.match(text):
+                ts = pd.to_datetime(text, format="ISO8601")
+            else:
+                ts = pd.to_datetime(text, dayfirst=True)
+        except (ValueError, OverflowError):
+            return pd.NaT
+    if pd.isna(ts):
+        return pd.NaT
+    return ts.tz_localize(APP_TIMEZONE) if ts.tzinfo is None else ts
+
+
+def build_user_index(users):
+    """Indeks nama ternormalisasi -> daftar user (role user) dengan nama tersebut."""
+    index = {}
+    for u in users:
+        if u.get("role", "user") == "user":
+            index.setdefault(normalize_name(u["nama"]), []).append(u)
+    return index
+
+
+def existing_score_counts():
+    """Jumlah nilai per user_id di tabel scores (dibaca per halaman, hanya kolom user_id)."""
+    counts = {}
+    for rows in paginate("scores", order="id", columns="user_id"):
+        for r in rows:
+            counts[r["user_id"]] = counts.get(r["user_id"], 0) + 1
+    return counts
+
+
+def validate_scores(df, users, existing_counts=None):
+    """
+    Dry run impor: cocokkan nama, validasi nilai, hitung total & SKD ke- baru.
+    Mengembalikan DataFrame dengan kolom user_id, status ("Baru"/"Error") dan
+    keterangan per baris; tidak ada yang ditulis ke database.
+    """
+    existing_counts = existing_counts or {}
+    index = build_user_index(users)
+    out = pd.DataFrame({"baris": np.arange(len(df)) + 2, "nama": df["nama"].fillna("").astype(str).str.strip()})
+    errors = pd.Series("", index=df.index)
+
+    def flag(mask, message):
+        nonlocal errors
+        errors = errors.where(~mask, errors + np.where(errors == "", "", "; ") + message)
+
+    keys = out["nama"].map(normalize_name)
+    matches = keys.map(lambda k: index.get(k, []))
+    n_match = matches.map(len)
+    flag((out["nama"] == "").to_numpy(), "nama kosong")
+    flag(((n_match == 0) & (out["nama"] != "")).to_numpy(), "nama tidak ditemukan")
+    flag((n_match > 1).to_numpy(), "nama ganda di database")
+    out["user_id"] = matches.map(lambda m: m[0]["id"] if len(m) == 1 else None)
+    out["angkatan"] = matches.map(lambda m: m[0].get("tahun_aktif") if len(m) == 1 else None)
+
+    for col, max_value in SCORE_MAX.items():
+        raw = df[col].astype(str).str.strip().replace({"": None, "nan": None, "None": None})
+        values = pd.to_numeric(raw.str.replace(",", ".", regex=False), errors="coerce")
+        flag(values.isna().to_numpy(), f"{col.upper()} kosong/bukan angka")
+        flag(((values < 0) | (values > max_value)).to_numpy(), f"{col.upper()} di luar 0-{max_value}")
+        out[col] = values
+    out["total"] = out["twk"] + out["tiu"] + out["tkp"]
+
+    if "total" in df.columns:
+        given = pd.to_numeric(df["total"], errors="coerce")
+        flag((given.notna() & out["total"].notna() & (given != out["total"])).to_numpy(), "total tidak sama dengan TWK+TIU+TKP")
+
+    out["created_at"] = None
+    if "tanggal" in df.columns:
+        raw_dates = df["tanggal"].replace({"": None})
+        dates = raw_dates.map(parse_date, na_action="ignore")
+        flag((raw_dates.notna() & dates.isna()).to_numpy(), "tanggal tidak valid")
+        valid = dates.notna()
+        if valid.any():
+            out.loc[valid, "created_at"] = dates[valid].map(to_query_ts)
+
+    dup = out.duplicated(["user_id", "twk", "tiu", "tkp", "created_at"], keep="first") & out["user_id"].notna()
+    flag(dup.to_numpy(), "duplikat baris sebelumnya di file")
+
+    out["status"] = np.where(errors == "", "Baru", "Error")
+    out["keterangan"] = errors.to_numpy()
+
+    ok = out["status"] == "Baru"
+    out["skd_ke"] = None
+    if ok.any():
+        prior = out.loc[ok, "user_id"].map(lambda uid: existing_counts.get(uid, 0))
+        out.loc[ok, "skd_ke"] = prior + out[ok].groupby("user_id").cumcount() + 1
+    return out
+
+
+def _plain_number(value):
+    # Tipe numpy tidak bisa diserialisasi JSON oleh klien Supabase
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def import_rows(preview):
+    """Baris valid hasil validate_scores() dalam bentuk payload insert tabel scores."""
+    rows = []
+    for r in preview[preview["status"] == "Baru"].itertuples(index=False):
+        row = {"user_id": r.user_id, **{c: _plain_number(getattr(r, c)) for c in ("twk", "tiu", "tkp", "total")}}
+        if r.created_at:
+            row["created_at"] = r.created_at
+        rows.append(row)
+
+    # Insert multi-baris mensyaratkan kolom yang sama di setiap baris:
+    # baris tanpa tanggal diberi waktu impor (sama dengan default tabel)
+    if any("created_at" in row for row in rows):
+        now = to_query_ts(datetime.datetime.now(datetime.timezone.utc))
+        for row in rows:
+            row.setdefault("created_at", now)
+    return rows
+
+
+def insert_scores(rows, batch_size=INSERT_BATCH_SIZE, progress=None):
+    """
+    Insert multi-baris per batch. Kegagalan satu batch tidak menghentikan
+    batch berikutnya; hasil per batch: {"batch", "baris", "ok", "error"}.
+    """
+    results = []
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        result = {"batch": start // batch_size + 1, "baris": f"{start + 1}-{start + len(batch)}", "ok": 0, "error": None}
+        try:
+            supabase.table("scores").insert(batch).execute()
+            result["ok"] = len(batch)
+        except Exception as e:
+            result["error"] = str(e)
+        results.append(result)
+        if progress:
+            progress(min(start + batch_size, len(rows)), len(rows))
+    return results
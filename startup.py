@@ -0,0 +1,102 @@
+import os
+import sys
+import json
+import time
+import threading
+import datetime
+
+# Modul ringan (hanya stdlib): dipakai main.py sebelum login untuk mencatat
+# waktu startup, dan sebagai CLI laporan: `python startup.py [path_log]`.
+
+LOG_PATH = os.getenv(
+    "SKD_STARTUP_LOG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "startup.jsonl"),
+)
+
+_lock = threading.Lock()
+_process_runs = 0
+
+
+class RunTimer:
+    """
+    Stopwatch satu script run Streamlit. `mark()` mencatat waktu kumulatif (ms)
+    sejak awal run; `finish()` menulis satu baris JSON ke LOG_PATH.
+    """
+
+    def __init__(self, start=None):
+        global _process_runs
+        self.start = start if start is not None else time.perf_counter()
+        self.marks = {}
+        with _lock:
+            _process_runs += 1
+            # Run pertama di proses server = cold start (semua modul belum diimpor)
+            self.cold = _process_runs == 1
+
+    def mark(self, name):
+        self.marks[name] = round((time.perf_counter() - self.start) * 1000, 1)
+
+    def finish(self, kind, page):
+        """Simpan catatan run (kind: 'first_paint' / 'first_dashboard')."""
+        record = {
+            "ts": datetime.datetime.now().isoformat(timespec="seconds"),
+            "kind": kind,
+            "page": page,
+            "cold": self.cold,
+            "total_ms": round((time.perf_counter() - self.start) * 1000, 1),
+            "marks": self.marks,
+        }
+        try:
+            os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+            with _lock, open(LOG_PATH, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError:
+            # Log startup tidak boleh mengganggu aplikasi
+            pass
+        return record
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    idx = min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))
+    return values[idx]
+
+
+def startup_report(path=LOG_PATH):
+    """
+    Ringkasan waktu startup per jenis run (cold/warm): jumlah, p50, p95, maks
+    total waktu server hingga halaman terkirim, plus p50 tiap tahap.
+    """
+    groups = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                key = (rec["kind"], "cold" if rec["cold"] else "warm")
+                groups.setdefault(key, []).append(rec)
+    except OSError:
+        return f"Belum ada data startup di {path}."
+
+    lines = [f"Laporan startup ({path})", ""]
+    for (kind, temp), recs in sorted(groups.items()):
+        totals = [r["total_ms"] for r in recs]
+        lines.append(
+            f"{kind:<16}{temp:<6} n={len(recs):<5} "
+            f"p50={_percentile(totals, 50):>8.1f} ms  p95={_percentile(totals, 95):>8.1f} ms  "
+            f"maks={max(totals):>8.1f} ms"
+        )
+        stages = {}
+        for r in recs:
+            for name, ms in r["marks"].items():
+                stages.setdefault(name, []).append(ms)
+        for name, values in stages.items():
+            lines.append(f"    {name:<24} p50={_percentile(values, 50):>8.1f} ms")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(startup_report(sys.argv[1] if len(sys.argv) > 1 else LOG_PATH))
@@ -0,0 +1,111 @@
+import sys
+import datetime
+from collections import defaultdict
+
+from database import supabase, paginate
+
+# Tabel ringkasan per user (lihat user_stats.sql). Satu baris kecil per user
+# dibaca dashboard, sehingga jumlah percobaan & nilai terbaik tidak dihitung
+# ulang dari seluruh riwayat scores di setiap tampilan.
+#
+# Setiap penulisan nilai (app / CLI) memanggil refresh_user_stats(user_id):
+# fungsi Postgres refresh_user_stats (user_stats.sql) mengunci user tersebut,
+# menghitung ulang barisnya dari tabel scores lalu meng-upsert-nya. Refresh
+# yang berbarengan untuk user yang sama berjalan bergantian dan yang
+# terakhir selalu membaca data yang sudah di-commit, jadi hasilnya konsisten.
+STATS_TABLE = "user_stats"
+REFRESH_FUNCTION = "refresh_user_stats"
+ID_FILTER_BATCH = 200
+UPSERT_BATCH_SIZE = 500
+COMPONENTS = ("twk", "tiu", "tkp")
+
+
+def _to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def compute_user_stats(user_id, scores):
+    """Hitung baris user_stats dari daftar nilai seorang user (None jika kosong)."""
+    if not scores:
+        return None
+    rows = sorted(scores, key=lambda s: str(s.get("created_at") or ""))
+    comps = [{c: _to_number(s.get(c)) for c in COMPONENTS} for s in rows]
+    totals = [sum(c.values()) for c in comps]
+    return {
+        "user_id": user_id,
+        "attempt_count": len(rows),
+        "best_total": max(totals),
+        "last_total": totals[-1],
+        "mean_total": round(sum(totals) / len(totals), 2),
+        "best_twk": max(c["twk"] for c in comps),
+        "best_tiu": max(c["tiu"] for c in comps),
+        "best_tkp": max(c["tkp"] for c in comps),
+        "first_attempt_at": rows[0].get("created_at"),
+        "last_attempt_at": rows[-1].get("created_at"),
+        "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+
+
+def refresh_stats_for_users(user_ids, batch_size=ID_FILTER_BATCH):
+    """
+    Hitung ulang & simpan statistik user-user `user_ids` setelah nilai
+    ditulis (insert/edit/hapus/impor). Agregasi dan upsert dijalankan di
+    Postgres oleh fungsi refresh_user_stats (user_stats.sql) dengan kunci
+    per user, sehingga penulisan yang berbarengan tidak saling menimpa
+    dengan statistik usang. Mengembalikan jumlah baris yang ditulis.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    written = 0
+    for start in range(0, len(user_ids), batch_size):
+        response = supabase.rpc(REFRESH_FUNCTION, {"p_user_ids": user_ids[start:start + batch_size]}).execute()
+        written += getattr(response, "data", 0) or 0
+    return written
+
+
+def refresh_user_stats(user_id):
+    """Perbarui statistik satu user setelah insert/edit/hapus nilai."""
+    return refresh_stats_for_users([user_id])
+
+
+def clear_user_stats():
+    """Kosongkan user_stats (dipakai saat reset semua data)."""
+    supabase.table(STATS_TABLE).delete().gte("attempt_count", 0).execute()
+
+
+def fetch_user_stats(user_id=None):
+    """Ambil baris user_stats (satu user, atau semua per halaman)."""
+    if user_id is not None:
+        response = supabase.table(STATS_TABLE).select("*").eq("user_id", user_id).execute()
+        return getattr(response, "data", []) or []
+    return [row for rows in paginate(STATS_TABLE, order=("user_id",)) for row in rows]
+
+
+def rebuild_user_stats():
+    """
+    Bangun ulang seluruh user_stats dari tabel scores (perintah maintenance).
+    Mengembalikan (jumlah baris ditulis, jumlah baris usang dihapus).
+    """
+    by_user = defaultdict(list)
+    for rows in paginate("scores", columns="user_id,twk,tiu,tkp,created_at", order=("id",)):
+        for s in rows:
+            by_user[s["user_id"]].append(s)
+
+    rows = [compute_user_stats(uid, scores) for uid, scores in by_user.items()]
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        supabase.table(STATS_TABLE).upsert(rows[start:start + UPSERT_BATCH_SIZE], on_conflict="user_id").execute()
+
+    stale = [r["user_id"] for r in fetch_user_stats() if r["user_id"] not in by_user]
+    for start in range(0, len(stale), ID_FILTER_BATCH):
+        supabase.table(STATS_TABLE).delete().in_("user_id", stale[start:start + ID_FILTER_BATCH]).execute()
+    return len(rows), len(stale)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        print("Penggunaan: python stats.py rebuild")
+        sys.exit(2)
+    written, removed = rebuild_user_stats()
+    print(f"user_stats dibangun ulang: {written} user ditulis, {removed} baris usang dihapus.")
@@ -1,33 +1,47 @@
 from database import supabase
+from stats import refresh_user_stats
 
 def menu_user(user):
 
     while True:
         print("\n=== MENU USER ===")
         print("1. Lihat Nilai")
-        print("2. Update Nilai")
+        print("2. Tambah Nilai")
         print("3. Logout")
 
         pilih = input("Pilih: ")
 
         if pilih == "1":
-            print(user)
+            # Riwayat nilai dibaca dari tabel scores (sama dengan dashboard)
+            data = supabase.table("scores") \
+                .select("twk,tiu,tkp,created_at") \
+                .eq("user_id", user["id"]) \
+                .order("created_at") \
+                .execute().data or []
+
+            if not data:
+                print("Belum ada nilai")
+            for i, s in enumerate(data, start=1):
+                total = (s["twk"] or 0) + (s["tiu"] or 0) + (s["tkp"] or 0)
+                print(f"SKD ke-{i} ({s['created_at']}): TWK {s['twk']}, TIU {s['tiu']}, TKP {s['tkp']}, Total {total}")
 
         elif pilih == "2":
             twk = int(input("TWK: "))
             tiu = int(input("TIU: "))
             tkp = int(input("TKP: "))
 
-            supabase.table("users") \
-                .update({
+            supabase.table("scores") \
+                .insert({
+                    "user_id": user["id"],
                     "twk": twk,
                     "tiu": tiu,
-                    "tkp": tkp
+                    "tkp": tkp,
+                    "total": twk + tiu + tkp
                 }) \
-                .eq("id", user["id"]) \
                 .execute()
+            refresh_user_stats(user["id"])
 
-            print("Nilai berhasil diupdate")
+            print("Nilai berhasil disimpan")
 
         elif pilih == "3":
             break
@@ -0,0 +1,81 @@
+-- Tabel ringkasan nilai per user (dipelihara oleh stats.py saat nilai ditulis).
+-- Jalankan sekali di Supabase SQL Editor, lalu isi awal dengan:
+--   python stats.py rebuild
+create table if not exists user_stats (
+    user_id uuid primary key references users(id) on delete cascade,
+    attempt_count integer not null default 0,
+    best_total numeric not null default 0,
+    last_total numeric not null default 0,
+    mean_total numeric not null default 0,
+    best_twk numeric not null default 0,
+    best_tiu numeric not null default 0,
+    best_tkp numeric not null default 0,
+    first_attempt_at timestamptz,
+    last_attempt_at timestamptz,
+    updated_at timestamptz not null default now()
+);
+
+-- Hitung ulang baris user_stats untuk user-user tertentu (dipanggil aplikasi
+-- lewat RPC setiap kali nilai ditulis). Kunci advisory per user membuat
+-- refresh yang berbarengan berjalan bergantian; setiap pernyataan sesudahnya
+-- membaca data terbaru yang sudah di-commit, jadi statistik tidak pernah
+-- ditimpa hasil hitungan yang usang.
+create or replace function refresh_user_stats(p_user_ids uuid[])
+returns integer
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+    uid uuid;
+    written integer;
+begin
+    if coalesce(array_length(p_user_ids, 1), 0) = 0 then
+        return 0;
+    end if;
+
+    -- Urutan kunci tetap agar dua refresh massal tidak saling deadlock
+    for uid in select distinct u from unnest(p_user_ids) as u order by u loop
+        perform pg_advisory_xact_lock(hashtext('user_stats:' || uid::text));
+    end loop;
+
+    delete from user_stats s
+    where s.user_id = any(p_user_ids)
+      and not exists (select 1 from scores sc where sc.user_id = s.user_id);
+
+    insert into user_stats (
+        user_id, attempt_count, best_total, last_total, mean_total,
+        best_twk, best_tiu, best_tkp, first_attempt_at, last_attempt_at, updated_at
+    )
+    select
+        sc.user_id,
+        count(*),
+        max(coalesce(sc.twk, 0) + coalesce(sc.tiu, 0) + coalesce(sc.tkp, 0)),
+        (array_agg(coalesce(sc.twk, 0) + coalesce(sc.tiu, 0) + coalesce(sc.tkp, 0)
+                   order by sc.created_at desc nulls last))[1],
+        round(avg(coalesce(sc.twk, 0) + coalesce(sc.tiu, 0) + coalesce(sc.tkp, 0)), 2),
+        max(coalesce(sc.twk, 0)),
+        max(coalesce(sc.tiu, 0)),
+        max(coalesce(sc.tkp, 0)),
+        min(sc.created_at),
+        max(sc.created_at),
+        now()
+    from scores sc
+    where sc.user_id = any(p_user_ids)
+    group by sc.user_id
+    on conflict (user_id) do update set
+        attempt_count = excluded.attempt_count,
+        best_total = excluded.best_total,
+        last_total = excluded.last_total,
+        mean_total = excluded.mean_total,
+        best_twk = excluded.best_twk,
+        best_tiu = excluded.best_tiu,
+        best_tkp = excluded.best_tkp,
+        first_attempt_at = excluded.first_attempt_at,
+        last_attempt_at = excluded.last_attempt_at,
+        updated_at = excluded.updated_at;
+
+    get diagnostics written = row_count;
+    return written;
+end;
+$$;
@@ -0,0 +1,125 @@
+import os
+import datetime
+import threading
+from collections import Counter
+from zoneinfo import ZoneInfo
+
+from database import paginate
+
+
+# Zona waktu proyek: batas "Minggu Ini" (Senin 00:00) dihitung di zona ini,
+# bukan di zona waktu server / browser.
+APP_TIMEZONE = ZoneInfo(os.getenv("SKD_TIMEZONE", "Asia/Jakarta"))
+
+
+def now_local():
+    return datetime.datetime.now(APP_TIMEZONE)
+
+
+def week_start(now=None):
+    """Senin 00:00 minggu berjalan (aware, zona APP_TIMEZONE)."""
+    now = now or now_local()
+    monday = (now - datetime.timedelta(days=now.weekday())).date()
+    return datetime.datetime.combine(monday, datetime.time.min, tzinfo=APP_TIMEZONE)
+
+
+def to_query_ts(dt):
+    """Format timestamp untuk filter PostgREST (UTC, ISO 8601)."""
+    return dt.astimezone(datetime.timezone.utc).isoformat()
+
+
+def parse_ts(value):
+    """Parse created_at Supabase (timestamptz ISO); nilai tanpa zona dianggap UTC."""
+    ts = datetime.datetime.fromisoformat(str(value))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=datetime.timezone.utc)
+    return ts
+
+
+def _to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class WeeklySnapshot:
+    """
+    Snapshot "percobaan terakhir per user minggu ini", dipakai bersama semua sesi.
+    - Hanya baris sejak Senin yang diambil (filter gte di query, bukan di pandas).
+    - refresh() bersifat inkremental: hanya mengambil baris dengan created_at
+      >= baris terbaru yang sudah terlihat (nilai baru yang masuk).
+    - Jumlah percobaan sebelum minggu ini diambil sekali per minggu (kolom
+      user_id saja) untuk menghitung nomor "SKD ke-".
+    - invalidate() dipanggil setelah edit/hapus agar minggu ini dibangun ulang.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, start):
+        self.week_start = start
+        self.prior_counts = None
+        self.week_counts = Counter()
+        self.latest = {}
+        self.seen_ids = set()
+        self.last_seen = None
+
+    def invalidate(self):
+        with self._lock:
+            self._reset(None)
+
+    def _fetch_prior_counts(self, start):
+        # Dibaca per halaman (kolom user_id saja): riwayat lengkap, tidak terpotong max-rows
+        before = to_query_ts(start)
+        counts = Counter()
+        for rows in paginate("scores", lambda q: q.lt("created_at", before), order=("id",), columns="user_id"):
+            counts.update(r["user_id"] for r in rows)
+        return counts
+
+    def _fetch_since(self, since):
+        after = to_query_ts(since)
+        return [
+            row
+            for rows in paginate("scores", lambda q: q.gte("created_at", after), order=("created_at", "id"))
+            for row in rows
+        ]
+
+    def _apply(self, row):
+        if row.get("id") in self.seen_ids:
+            return
+        self.seen_ids.add(row.get("id"))
+
+        uid = row["user_id"]
+        ts = parse_ts(row["created_at"])
+        self.week_counts[uid] += 1
+        current = self.latest.get(uid)
+        if current is None or ts >= current["_ts"]:
+            twk, tiu, tkp = (_to_number(row.get(c)) for c in ("twk", "tiu", "tkp"))
+            self.latest[uid] = {
+                **row,
+                "twk": twk,
+                "tiu": tiu,
+                "tkp": tkp,
+                "total": twk + tiu + tkp,
+                "skd_ke": self.prior_counts[uid] + self.week_counts[uid],
+                "_ts": ts,
+            }
+        if self.last_seen is None or ts > self.last_seen:
+            self.last_seen = ts
+
+    def refresh(self):
+        """Ambil nilai baru sejak refresh terakhir; reset otomatis saat ganti minggu."""
+        with self._lock:
+            start = week_start()
+            if start != self.week_start:
+                self._reset(start)
+            if self.prior_counts is None:
+                self.prior_counts = self._fetch_prior_counts(start)
+            for row in self._fetch_since(self.last_seen or start):
+                self._apply(row)
+            return self.rows()
+
+    def rows(self):
+        return [{k: v for k, v in r.items() if k != "_ts"} for r in self.latest.values()]